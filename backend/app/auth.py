@@ -1,21 +1,39 @@
+import asyncio
 import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from . import models, schemas
-from .database import get_db
+from . import instrumentation, models, principal_cache, schemas
+from .config import get_settings
+from .database import get_db, is_async, run_db
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+settings = get_settings()
+
+# Pinning min/max to the configured cost makes hashes with any other cost
+# "need update", so they are rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+# Hash jobs queued or running; only touched from the event loop
+_hash_jobs_in_flight = 0
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 # Optional OAuth2 scheme that doesn't require authentication
 oauth2_scheme_optional = HTTPBearer(auto_error=False)
@@ -29,6 +47,33 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_hash_job(fn, *args):
+    """Run a bcrypt call on the dedicated pool, shedding load when it is saturated."""
+    global _hash_jobs_in_flight
+    if _hash_jobs_in_flight >= settings.password_hash_workers + settings.password_hash_max_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_jobs_in_flight += 1
+    try:
+        # Timed here: the executor thread does not see the request's context
+        with instrumentation.timed("bcrypt"):
+            return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_jobs_in_flight -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run_hash_job(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Return (verified, new_hash); new_hash is set when the stored cost is outdated."""
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -36,31 +81,88 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+def _get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _update_password_hash(db: Session, user: models.User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
+    user = await run_db(db, _get_user_by_email, email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        await run_db(db, _update_password_hash, user, new_hash)
     return user
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def admin_token_matches(supplied: str) -> bool:
+    """Whether `supplied` is the configured admin token; always False without one."""
+    return bool(settings.admin_token) and secrets.compare_digest(supplied.encode(), settings.admin_token.encode())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Admin endpoints: the X-Admin-Token header must match ADMIN_TOKEN."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not admin_token_matches(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+
+def require_admin_unless_dev(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Development tools: open when APP_ENV is a dev environment, admin-only otherwise."""
+    if not settings.is_dev:
+        require_admin(x_admin_token)
+
+
+def _decode_token(token: str) -> Optional[Tuple[int, Optional[int]]]:
+    """Return (user_id, exp) from a valid access token, or None."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: Optional[int] = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(user_id=int(user_id))
+            return None
+        return schemas.TokenData(user_id=int(user_id)).user_id, payload.get("exp")
     except (JWTError, ValueError):
-        raise credentials_exception
+        return None
+
+
+def _get_user(db: Session, user_id: int) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.id == user_id).first()
+
+
+async def _resolve_user(db: Session, token: str) -> Optional[models.User]:
+    cached = principal_cache.get(token)
+    if cached is not None:
+        # Attach the snapshot to this request's session without a SELECT
+        session = db.sync_session if is_async else db
+        return session.merge(cached, load=False)
+
+    decoded = _decode_token(token)
+    if decoded is None:
+        return None
+    user_id, exp = decoded
+
+    user = await run_db(db, _get_user, user_id)
+    if user is not None:
+        principal_cache.put(token, user, exp)
+    return user
+
 
-    user = db.query(models.User).filter(models.User.id == token_data.user_id).first()
+async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.User:
+    user = await _resolve_user(db, token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
@@ -71,16 +173,6 @@ async def get_current_user_optional(
     """Get current user but don't raise exception if not authenticated."""
     if not credentials:
         return None
-        
-    try:
-        # Extract the actual token from the credentials
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
-        return None
-    
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    return user
+
+    # Extract the actual token from the credentials
+    return await _resolve_user(db, credentials.credentials)
@@ -0,0 +1,210 @@
+"""In-memory prefix suggestions for landlord names and addresses.
+
+Each kind of suggestion has a `PrefixIndex`: a sorted array of lowercase
+search keys searched with `bisect`, pointing at entries that carry the
+display text and review count. A prefix lookup is two bisections; the
+matching range is scanned directly when it is small, and for short, popular
+prefixes ("1", "the") the top entries are computed once and then kept
+current as counts change, so no lookup scans more than `SCAN_LIMIT` keys.
+
+The indexes are loaded from the database at startup and updated in place by
+review submission (landlords) and background geocoding (addresses). They are
+per process: with several uvicorn workers, each sees its own submissions
+immediately and the others' after a restart.
+"""
+
+import bisect
+import heapq
+import re
+import sys
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .landlords import normalize_landlord_name
+
+SCAN_LIMIT = 256
+MAX_SUGGESTIONS = 20
+
+_SPACES = re.compile(r"\s+")
+# A leading house number ("1520 ") so "walnut" also finds "1520 Walnut St"
+_HOUSE_NUMBER = re.compile(r"^\d+[a-z]?\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def _unique(keys: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+class _Entry:
+    __slots__ = ("ref", "text", "keys", "count")
+
+    def __init__(self, ref: Hashable, text: str, keys: List[str], count: int):
+        self.ref = ref
+        self.text = text
+        self.keys = keys
+        self.count = count
+
+    def rank(self) -> Tuple[int, str]:
+        # Ascending order: most reviewed first, then alphabetical
+        return (-self.count, self.text)
+
+    def size(self) -> int:
+        """Bytes held by the entry, its text and its keys, each object counted once."""
+        objects = {id(obj): obj for obj in (self, self.ref, self.text, self.keys, *self.keys)}
+        return sum(sys.getsizeof(obj) for obj in objects.values())
+
+
+class PrefixIndex:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._keys: List[str] = []
+        self._targets: List[_Entry] = []
+        self._entries: Dict[Hashable, _Entry] = {}
+        # prefix -> best MAX_SUGGESTIONS entries, for prefixes over SCAN_LIMIT keys
+        self._top: Dict[str, List[_Entry]] = {}
+        # Running total of `_Entry.size()`, so `memory_bytes` does not walk the index
+        self._entry_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+    def load(self, rows: Iterable[Tuple[Hashable, str, List[str], int]]) -> None:
+        """Replace the contents with `(entry ref, text, search keys, count)` rows."""
+        entries: Dict[Hashable, _Entry] = {}
+        pairs: List[Tuple[str, _Entry]] = []
+        for ref, text, keys, count in rows:
+            entry = entries[ref] = _Entry(ref, text, _unique(keys), count)
+            pairs.extend((key, entry) for key in entry.keys)
+        pairs.sort(key=lambda pair: pair[0])
+        entry_bytes = sum(entry.size() for entry in entries.values())
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._targets = [entry for _, entry in pairs]
+            self._entries = entries
+            self._top = {}
+            self._entry_bytes = entry_bytes
+
+    def add(self, ref: Hashable, text: str, keys: List[str], delta: int = 1) -> None:
+        """Count `delta` more reviews for `ref`, indexing it under `keys` if it is new."""
+        with self._lock:
+            entry = self._entries.get(ref)
+            if entry is None:
+                entry = self._entries[ref] = _Entry(ref, text, _unique(keys), 0)
+                for key in entry.keys:
+                    i = bisect.bisect_right(self._keys, key)
+                    self._keys.insert(i, key)
+                    self._targets.insert(i, entry)
+                self._entry_bytes += entry.size()
+            entry.count += delta
+
+            # Only this entry's count grew, so the new top of each cached
+            # prefix it falls under is the old top plus this entry.
+            for key in entry.keys:
+                for end in range(1, len(key) + 1):
+                    top = self._top.get(key[:end])
+                    if top is None:
+                        continue
+                    if entry not in top:
+                        top.append(entry)
+                    top.sort(key=_Entry.rank)
+                    del top[MAX_SUGGESTIONS:]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def _best(self, lo: int, hi: int, k: int) -> List[_Entry]:
+        unique = {id(entry): entry for entry in self._targets[lo:hi]}
+        return heapq.nsmallest(k, unique.values(), key=_Entry.rank)
+
+    def suggest(self, q: str, limit: int) -> List[_Entry]:
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        with self._lock:
+            lo, hi = self._range(prefix)
+            if hi - lo <= SCAN_LIMIT:
+                return self._best(lo, hi, limit)
+            top = self._top.get(prefix)
+            if top is None:
+                top = self._top[prefix] = self._best(lo, hi, MAX_SUGGESTIONS)
+            return top[:limit]
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the index.
+
+        Entries are totalled as they are added; only the containers and the
+        few cached prefix tops are measured here.
+        """
+        with self._lock:
+            containers = sum(sys.getsizeof(obj) for obj in (self._keys, self._targets, self._entries, self._top))
+            tops = sum(sys.getsizeof(prefix) + sys.getsizeof(top) for prefix, top in self._top.items())
+            return self._entry_bytes + containers + tops
+
+
+landlord_index = PrefixIndex("landlord")
+address_index = PrefixIndex("address")
+
+
+def landlord_keys(name: str) -> List[str]:
+    # "The Drake" is found by "the dr" and by "drake"
+    return [normalize(name), normalize_landlord_name(name)]
+
+
+def address_keys(address: str) -> List[str]:
+    normalized = normalize(address)
+    return [normalized, _HOUSE_NUMBER.sub("", normalized)]
+
+
+def load(db: Session) -> None:
+    """Rebuild both indexes from the database."""
+    landlords = db.execute(
+        select(models.Landlord.id, models.Landlord.name, func.coalesce(models.LandlordStats.review_count, 0))
+        .outerjoin(models.LandlordStats, models.LandlordStats.landlord_id == models.Landlord.id)
+    )
+    landlord_index.load((lid, name, landlord_keys(name), count) for lid, name, count in landlords)
+
+    addresses = db.execute(
+        select(models.Review.formatted_address, func.count())
+        .where(models.Review.formatted_address.is_not(None))
+        .group_by(models.Review.formatted_address)
+    )
+    address_index.load((address, address, address_keys(address), count) for address, count in addresses)
+
+
+def record_landlord(landlord_id: int, name: str) -> None:
+    """Count one more review for a landlord; `name` is used if it is new."""
+    landlord_index.add(landlord_id, " ".join(name.split()), landlord_keys(name))
+
+
+def record_address(address: str) -> None:
+    address_index.add(address, address, address_keys(address))
+
+
+def suggest(q: str, kind: Optional[str] = None, limit: int = 10) -> List[Tuple[str, _Entry]]:
+    """Top `limit` `(kind, entry)` pairs whose text starts with `q`, most reviewed first."""
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    indexes = [index for index in (landlord_index, address_index) if kind in (None, index.kind)]
+    matches = [(index.kind, entry) for index in indexes for entry in index.suggest(q, limit)]
+    if len(indexes) > 1:
+        matches.sort(key=lambda match: match[1].rank())
+    return matches[:limit]
+
+
+def stats() -> dict:
+    return {
+        index.kind: {"keys": len(index), "entries": index.entry_count(), "memory_bytes": index.memory_bytes()}
+        for index in (landlord_index, address_index)
+    }
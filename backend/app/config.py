@@ -1,12 +1,94 @@
 from functools import lru_cache
+from typing import Literal, Optional
 
+from pydantic import NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     app_env: str = "prod"
-    rate_limit_window_seconds: int = 60
+    # Rates are validated here: the limiter policies divide by them. A review
+    # window of 0 turns the review limit off.
+    rate_limit_window_seconds: NonNegativeInt = 60
     disable_rate_limit: bool = False
+    # "memory" (per process), "database" (shared table) or "redis" (redis_url)
+    rate_limit_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    login_rate_limit_burst: PositiveInt = 10
+    login_rate_limit_per_minute: PositiveInt = 10
+    signup_rate_limit_per_hour: PositiveInt = 5
+    # Geocoding cache: entries expire after the TTL; least recently used
+    # entries are evicted once the table grows past the max size.
+    geocode_cache_ttl_seconds: int = 30 * 24 * 3600
+    geocode_cache_max_entries: int = 10000
+    # Background geocoding workers; failed lookups back off exponentially
+    # from the base delay until max attempts is reached.
+    geocode_workers: int = 2
+    geocode_batch_size: int = 20
+    geocode_poll_interval_seconds: float = 5.0
+    geocode_max_attempts: int = 5
+    geocode_retry_base_seconds: int = 30
+    geocode_lease_seconds: int = 120
+    # "google" geocodes remotely; "local" resolves from the address-point CSV
+    # at gazetteer_path first and only calls Google on a miss.
+    geocoder_backend: str = "google"
+    gazetteer_path: Optional[str] = None
+    # Password hashing: bcrypt cost factor, and a dedicated pool so hashing
+    # never runs on the event loop. Requests beyond workers + max queue get 503.
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+    # Authenticated-user cache; 0 disables it
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_entries: int = 10000
+    # Autocomplete indexes live in memory; a warning is logged at startup
+    # when they exceed this size.
+    autocomplete_memory_budget_mb: int = 64
+    # Rendered public feed responses kept per process, and how long browsers
+    # and CDNs may serve anonymous responses without revalidating.
+    response_cache_max_entries: int = 1000
+    public_cache_max_age_seconds: int = 10
+    # Per-request SQL/bcrypt/geocoding timings in a Server-Timing header and
+    # one JSON log line per request; latency histograms at GET /metrics, which
+    # requires "Authorization: Bearer <metrics_token>" when a token is set.
+    request_timing_enabled: bool = True
+    request_log_enabled: bool = True
+    metrics_token: Optional[str] = None
+    # Statements slower than slow_query_ms (0 disables) are logged with their
+    # EXPLAIN plan, and the latest are kept for GET /admin/slow-queries.
+    # Parameter values include emails and password hashes, so they are only
+    # logged when slow_query_log_parameters is turned on.
+    slow_query_ms: int = 250
+    slow_query_log_parameters: bool = False
+    slow_query_explain: bool = True
+    # Admin endpoints and the X-Profile-Token request header need this token;
+    # unset, both are disabled. Profiles sample stacks every interval.
+    admin_token: Optional[str] = None
+    profiler_interval_ms: float = 5.0
+    profiler_max_seconds: int = 300
+    # SQLite engine profile, applied to every new connection: WAL lets readers
+    # run alongside the single writer, and writers wait up to the busy timeout
+    # for the lock instead of failing with "database is locked". false keeps
+    # SQLite's defaults (rollback journal, one connection per async session).
+    # The modes are pasted into PRAGMA statements, and SQLite ignores values
+    # it does not know, so only its own keywords are accepted.
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: Literal["delete", "truncate", "persist", "memory", "wal", "off"] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    sqlite_mmap_size_mb: int = 256
+    sqlite_cache_size_mb: int = 64
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_pool_size: int = 8
+    sqlite_max_overflow: int = 16
+    # Connection pool for PostgreSQL; pre-ping replaces connections the server
+    # or a proxy closed while they sat idle.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    # Exports stop this far behind the clock, so reviews still being committed
+    # are picked up by the next incremental pull instead of being skipped.
+    export_safety_lag_seconds: NonNegativeInt = 30
     frontend_dev_origin: str = "http://localhost:3000"
     # Default production frontend origin (CORS)
     frontend_prod_origin: str = "https://rate-my-landlord-beryl.vercel.app"
@@ -1,20 +1,245 @@
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, List, Optional, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rate_my_landlord.db")
 
+# Async drivers and the sync driver used for the same database by background
+# workers, scripts and schema setup.
+_ASYNC_TO_SYNC_DRIVER = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
+_url = make_url(DATABASE_URL)
+# Upserts (dialect_insert), search and spatial indexes are written for these
+SUPPORTED_BACKENDS = ("sqlite", "postgresql")
+if _url.get_backend_name() not in SUPPORTED_BACKENDS:
+    raise RuntimeError(
+        f"DATABASE_URL must point to SQLite or PostgreSQL, not {_url.get_backend_name()!r}"
+    )
+is_async = _url.drivername in _ASYNC_TO_SYNC_DRIVER
+SYNC_DATABASE_URL = _url.set(drivername=_ASYNC_TO_SYNC_DRIVER[_url.drivername]) if is_async else _url
+
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, future=True)
+# In-memory databases keep SQLAlchemy's single-connection pools
+_sqlite_file = _url.get_backend_name() == "sqlite" and _url.database not in (None, "", ":memory:")
+_tuned_sqlite = _sqlite_file and settings.sqlite_tuning
+
+
+def _pool_options(async_driver: bool = False) -> dict:
+    """Pool sizing for the configured database; empty means SQLAlchemy's defaults."""
+    if _tuned_sqlite:
+        options = {"pool_size": settings.sqlite_pool_size, "max_overflow": settings.sqlite_max_overflow}
+        if async_driver:
+            # aiosqlite otherwise opens a connection, and runs the pragmas, per session
+            from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+            options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+    if _url.get_backend_name() == "postgresql":
+        return {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+        }
+    return {}
+
+
+def sqlite_pragmas() -> List[str]:
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 2**20}",
+        # Negative sizes are in KiB
+        f"PRAGMA cache_size={-settings.sqlite_cache_size_mb * 1024}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+engine = create_engine(SYNC_DATABASE_URL, connect_args=connect_args, future=True, **_pool_options())
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
+async_engine = None
+AsyncSessionLocal = None
+if is_async:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(DATABASE_URL, connect_args=connect_args, **_pool_options(async_driver=True))
+    # Objects outlive commits in request handlers; reloading them lazily
+    # outside `run_sync` is not possible with an async driver.
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if _tuned_sqlite:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
 Base = declarative_base()
 
+# Most recent slow statements, oldest first
+slow_queries: Deque[dict] = deque(maxlen=100)
+# Statement -> plan; one EXPLAIN per distinct statement while it is cached
+_plans: "OrderedDict[str, str]" = OrderedDict()
+_MAX_PLANS = 256
+_plans_lock = threading.Lock()
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """Plan of a statement that has just run, on the same DBAPI connection.
+
+    The raw cursor bypasses SQLAlchemy, so the EXPLAIN is not itself timed.
+    """
+    prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    with _plans_lock:
+        if statement in _plans:
+            _plans.move_to_end(statement)
+            return _plans[statement]
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    # SQLite rows are (id, parent, notused, detail); PostgreSQL rows are one line each
+    plan = "\n".join(str(row[-1]) for row in rows)
+    with _plans_lock:
+        _plans[statement] = plan
+        while len(_plans) > _MAX_PLANS:
+            _plans.popitem(last=False)
+    return plan
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+def _check_slow_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+    if elapsed_ms < settings.slow_query_ms:
+        return
+    plan = None
+    if settings.slow_query_explain and not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as exc:
+            plan = f"EXPLAIN failed: {exc}"
+    params = repr(parameters)[:2000] if settings.slow_query_log_parameters else None
+    slow_queries.append({
+        "at": datetime.utcnow(),
+        "duration_ms": round(elapsed_ms, 2),
+        "statement": statement,
+        "parameters": params,
+        "executemany": executemany,
+        "plan": plan,
+    })
+    logger.warning(
+        "Slow query (%.1f ms): %s\nparameters: %s\nplan:\n%s", elapsed_ms, statement, params, plan,
+    )
+
+
+def log_slow_queries(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(sync_engine, "after_cursor_execute", _check_slow_query)
+
+
+if settings.slow_query_ms > 0:
+    log_slow_queries(engine)
+    if async_engine is not None:
+        log_slow_queries(async_engine.sync_engine)
+
+T = TypeVar("T")
+
+
+def dialect_insert(db):
+    """`insert` construct with ON CONFLICT support for the session's database."""
+    # Other backends are rejected when DATABASE_URL is read
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+class OptionalIndex:
+    """An index the app can work without, and whether this process has it.
+
+    `create(conn)` issues the DDL and returns True when it indexed existing
+    rows. `ensure` runs it in a savepoint, so a database that cannot build
+    the index leaves the caller's transaction usable; the failure is logged
+    and `available` is False until a later `ensure` succeeds.
+    """
+
+    def __init__(self, name: str, fallback: str, create: Callable[[Connection], bool]):
+        self.name = name
+        self.fallback = fallback
+        self._create = create
+        self.available = True
+
+    def ensure(self, conn: Connection) -> bool:
+        """Create the index if it is missing; True when existing rows were indexed."""
+        try:
+            with conn.begin_nested():
+                indexed = self._create(conn)
+        except DBAPIError as exc:
+            logger.warning("%s unavailable, %s instead: %s", self.name, self.fallback, exc)
+            self.available = False
+            return False
+        self.available = True
+        return indexed
+
+
+async def get_db():
+    """Yield an AsyncSession when DATABASE_URL names an async driver, else a Session."""
+    if is_async:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
 
-def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def run_db(db, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run sync ORM code `fn(session, *args, **kwargs)` without blocking the event loop.
+
+    With an async driver the function runs on the loop through
+    `AsyncSession.run_sync`, so no thread is held while waiting on the
+    database. With a sync driver it runs in Starlette's threadpool.
+    """
+    if is_async:
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
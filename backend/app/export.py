@@ -0,0 +1,147 @@
+"""Streaming bulk export of reviews as NDJSON or CSV.
+
+Rows are read in `created_at, id` order with `yield_per`, which uses a
+server-side cursor on PostgreSQL, and written out one batch at a time, so
+memory stays flat however many reviews there are. Each export covers
+`since < created_at <= watermark`; passing the watermark back as `since`
+fetches only the reviews added afterwards.
+
+`created_at` is set by the application before the row is committed, so the
+newest visible `created_at` is not a safe watermark: a transaction still in
+flight can commit a row stamped earlier. The watermark is therefore held
+back to `export_safety_lag_seconds` before the export starts (or the newest
+`created_at`, if older). Chaining exports through the watermark returns
+every review exactly once, including reviews sharing a timestamp, as long
+as no review commits more than the lag after its `created_at`.
+
+Exports use their own session on the sync engine, because the response
+body is produced after the request's session has been closed.
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import fast_json, models
+from .config import get_settings
+from .database import SessionLocal
+
+settings = get_settings()
+
+Review = models.Review
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Everything public about a review; author emails and per-user flags stay out
+FIELDS = tuple(name for name in fast_json.FULL if name not in ("author_email", "is_bookmarked"))
+
+BATCH_SIZE = 1000
+
+
+def check_format(format: str) -> str:
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"format must be one of: {', '.join(FORMATS)}"
+        )
+    return format
+
+
+def normalize_since(since: Optional[datetime]) -> Optional[datetime]:
+    # created_at is stored as naive UTC
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def watermark(db: Session) -> Optional[datetime]:
+    """Upper bound of an export starting now: the newest `created_at`, at most now minus the safety lag."""
+    newest = db.execute(select(func.max(Review.created_at))).scalar_one_or_none()
+    if newest is None:
+        return None
+    return min(newest, datetime.utcnow() - timedelta(seconds=settings.export_safety_lag_seconds))
+
+
+def _documents(db: Session, since: Optional[datetime], until: datetime, batch_size: int) -> Iterator[list]:
+    stmt = select(*fast_json.review_columns(fields=FIELDS)).where(Review.created_at <= until)
+    if since is not None:
+        stmt = stmt.where(Review.created_at > since)
+    stmt = stmt.order_by(Review.created_at, Review.id).execution_options(yield_per=batch_size)
+    for rows in db.execute(stmt).partitions():
+        yield [fast_json.review_document(row, fields=FIELDS) for row in rows]
+
+
+def _ndjson(batches: Iterable[list]) -> Iterator[bytes]:
+    for docs in batches:
+        yield b"".join(fast_json.dumps(doc) + b"\n" for doc in docs)
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _csv(batches: Iterable[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    for docs in batches:
+        writer.writerows([_csv_value(doc[name]) for name in FIELDS] for doc in docs)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue().encode()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, i.e. gives it a q-value above 0.
+
+    An explicit `gzip` entry wins over `*`; `x-gzip` and other codings do not count.
+    """
+    wildcard = None
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        coding = coding.lower()
+        if coding == "gzip":
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return bool(wildcard)
+
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into one gzip member as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(
+    format: str, since: Optional[datetime], until: Optional[datetime], batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Body of an export of reviews created in (`since`, `until`]."""
+    db = SessionLocal()
+    try:
+        batches = _documents(db, since, until, batch_size) if until is not None else iter(())
+        yield from (_ndjson if format == "ndjson" else _csv)(batches)
+    finally:
+        db.close()
@@ -0,0 +1,153 @@
+"""Trusted-output JSON for list endpoints.
+
+List pages select plain column tuples and turn each row into a dict in the
+shape of `schemas.ReviewOut`, which is serialized straight to bytes. No ORM
+objects and no Pydantic models are built per row: the data comes from our
+own database, whose check constraints already bound the ratings, so
+re-validating it (and again through `response_model`) only costs time. The
+schemas stay the documented contract, and the output matches
+`ReviewOut.model_dump_json()` byte for byte.
+
+Pages can be narrowed to a projection (see `PROJECTIONS` and
+`parse_fields`): only the columns behind the requested fields are selected,
+so `review_text` is never read from disk for a map or summary view.
+
+orjson is used when installed; otherwise the standard library encoder
+produces the same JSON, more slowly.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column
+
+from . import models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+Review = models.Review
+
+# ReviewOut field order, so documents match the Pydantic output exactly
+_REVIEW_FIELDS = [
+    "landlord_name", "overall_rating", "maintenance_rating", "communication_rating", "respect_rating",
+    "rent_value_rating", "would_rent_again", "monthly_rent", "review_text", "property_address",
+    "is_anonymous", "move_in_date", "move_out_date", "id", "landlord_id", "created_at", "formatted_address",
+    "latitude", "longitude", "geocode_status",
+]
+_RATING_FIELDS = ("overall_rating", "maintenance_rating", "communication_rating", "respect_rating", "rent_value_rating")
+_DATE_FIELDS = ("move_in_date", "move_out_date", "created_at")
+
+# Every field of ReviewOut, in output order
+FULL = tuple(_REVIEW_FIELDS) + ("author_email", "is_bookmarked")
+
+# Named projections; documents keep the order of FULL
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "full": FULL,
+    # Review cards without the text: what a list view shows before expanding one
+    "summary": (
+        "landlord_name", *_RATING_FIELDS, "would_rent_again", "monthly_rent", "property_address",
+        "id", "landlord_id", "created_at", "formatted_address", "is_bookmarked",
+    ),
+    # Markers on a map
+    "map": ("landlord_name", "overall_rating", "id", "landlord_id", "latitude", "longitude"),
+}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(document: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(document)
+    return json.dumps(document, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def parse_fields(view: Optional[str] = None, fields: Optional[str] = None) -> Tuple[str, ...]:
+    """Fields of a page: a named `view`, or a comma-separated `fields` list.
+
+    `id` is always included. The result follows the order of `FULL`, so
+    equivalent requests share one tuple (and one cache entry).
+    """
+    if view is not None and fields is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pass either view or fields, not both")
+    if fields is None:
+        projection = PROJECTIONS.get(view or "full")
+        if projection is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"view must be one of: {', '.join(PROJECTIONS)}"
+            )
+        return projection
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"fields must name at least one of: {', '.join(FULL)}"
+        )
+    unknown = requested.difference(FULL)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Valid fields: {', '.join(FULL)}",
+        )
+    requested.add("id")
+    return tuple(name for name in FULL if name in requested)
+
+
+def _selected(fields: Tuple[str, ...]) -> List[str]:
+    """Review columns needed to render `fields`, plus the keyset sort key."""
+    needed = {"id", "created_at"}.union(name for name in fields if name in _REVIEW_FIELDS)
+    if "author_email" in fields:
+        needed.add("is_anonymous")
+    return [name for name in _REVIEW_FIELDS if name in needed]
+
+
+def review_columns(prefix: str = "", fields: Tuple[str, ...] = FULL) -> List[Column]:
+    """Columns for `review_document`, labelled `<prefix><field>`.
+
+    Join `users` when `fields` includes `author_email`; the prefix keeps them
+    apart from the columns of another entity selected alongside, such as a
+    bookmark.
+    """
+    columns = [getattr(Review, name).label(prefix + name) for name in _selected(fields)]
+    if "author_email" in fields:
+        columns.append(models.User.email.label(prefix + "author_email"))
+    return columns
+
+
+def _rating(value: Optional[float]) -> Optional[float]:
+    # Same clamp as the Pydantic path, for rows written before the check
+    # constraints existed
+    return None if value is None else max(0.0, min(float(value), 5.0))
+
+
+def _iso(value: Optional[Any]) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def review_document(
+    row, prefix: str = "", is_bookmarked: bool = False, fields: Tuple[str, ...] = FULL
+) -> Dict[str, Any]:
+    mapping = row._mapping
+    if fields is FULL:
+        doc = {name: mapping[prefix + name] for name in _REVIEW_FIELDS}
+    else:
+        doc = {name: mapping[prefix + name] for name in fields if name in _REVIEW_FIELDS}
+    for name in _RATING_FIELDS:
+        if name in doc:
+            doc[name] = _rating(doc[name])
+    for name in _DATE_FIELDS:
+        if name in doc:
+            doc[name] = _iso(doc[name])
+    if "author_email" in fields:
+        doc["author_email"] = None if mapping[prefix + "is_anonymous"] else mapping[prefix + "author_email"]
+    if "is_bookmarked" in fields:
+        doc["is_bookmarked"] = is_bookmarked
+    return doc
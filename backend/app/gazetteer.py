@@ -0,0 +1,197 @@
+"""Offline geocoding from a local address-point dataset.
+
+The product is Philadelphia-scoped, so most addresses can be resolved from
+the city's address points without calling Google. The dataset is a CSV with
+`house_number`, `street`, `zip_code`, `latitude` and `longitude` columns
+(extra columns are ignored), loaded once into an in-memory index keyed by
+normalized street name. Lookups are dictionary and bisect operations.
+
+When a house number is not in the dataset, the position is interpolated
+between the nearest known numbers on the same side of the street (same
+parity), as long as they are within `MAX_HOUSE_NUMBER_GAP`.
+"""
+
+import csv
+import logging
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import get_settings
+from .google_maps import geocode_address, is_configured as google_configured
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MAX_HOUSE_NUMBER_GAP = 100
+
+_DIRECTIONS = {"north": "n", "south": "s", "east": "e", "west": "w"}
+_SUFFIXES = {
+    "street": "st",
+    "avenue": "ave",
+    "av": "ave",
+    "boulevard": "blvd",
+    "parkway": "pkwy",
+    "road": "rd",
+    "drive": "dr",
+    "lane": "ln",
+    "place": "pl",
+    "terrace": "ter",
+    "court": "ct",
+    "square": "sq",
+}
+_ADDRESS = re.compile(r"^\s*(\d+)[a-z]?(?:-\d+)?\s+([^,]+)")
+# City, state, ZIP and country after the street when there are no commas
+_TAIL = re.compile(
+    r"(?:[\s,]+(?:philadelphia|phila))?(?:[\s,]+(?:pa|pennsylvania))?"
+    r"(?:[\s,]+\d{5}(?:-\d{4})?)?(?:[\s,]+(?:usa|us))?[\s,]*$"
+)
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_NON_WORD = re.compile(r"[^a-z0-9 ]")
+
+# (house_number, latitude, longitude, zip_code), sorted by house number
+Point = Tuple[int, float, float, str]
+# Points on one side of a street (even numbers, odd numbers)
+Sides = Tuple[List[Point], List[Point]]
+
+
+def normalize_street(street: str) -> str:
+    words = _NON_WORD.sub(" ", street.lower()).split()
+    return " ".join(_SUFFIXES.get(w, _DIRECTIONS.get(w, w)) for w in words)
+
+
+def parse_address(address: str) -> Optional[Tuple[int, str, Optional[str]]]:
+    """Split a free-form address into (house_number, street_key, zip_code).
+
+    "1234 Market St, Philadelphia, PA 19103" and "1234 Market St Philadelphia
+    PA 19103" both give (1234, "market st", "19103").
+    """
+    address = address.lower()
+    match = _ADDRESS.match(address)
+    if not match:
+        return None
+    street = _TAIL.sub("", match.group(2), count=1) or match.group(2)
+    zip_match = _ZIP.search(address, match.start(2) + len(street))
+    return int(match.group(1)), normalize_street(street), zip_match.group(1) if zip_match else None
+
+
+class Gazetteer:
+    def __init__(self):
+        # Keyed by (street_key, zip_code) and (street_key, None); street names
+        # repeat across the city and the ZIP code disambiguates them.
+        self._index: Dict[Tuple[str, Optional[str]], Sides] = {}
+        self._display_names: Dict[str, str] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Gazetteer":
+        gazetteer = cls()
+        index: Dict[Tuple[str, Optional[str]], Sides] = defaultdict(lambda: ([], []))
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    number = int(row["house_number"])
+                    zip_code = (row.get("zip_code") or "").strip()[:5]
+                    point = (number, float(row["latitude"]), float(row["longitude"]), zip_code)
+                    key = normalize_street(row["street"])
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    continue
+                index[(key, None)][number % 2].append(point)
+                if zip_code:
+                    index[(key, zip_code)][number % 2].append(point)
+                gazetteer._display_names.setdefault(key, row["street"].strip())
+                gazetteer._size += 1
+
+        for sides in index.values():
+            for points in sides:
+                points.sort()
+        gazetteer._index = dict(index)
+        return gazetteer
+
+    def lookup(self, address: str) -> Optional[dict]:
+        parsed = parse_address(address)
+        if not parsed:
+            return None
+        number, street_key, zip_code = parsed
+        # The ZIP code may have no points on this side of the street; the
+        # city-wide list for the street still does
+        points = None
+        for key in ((street_key, zip_code), (street_key, None)):
+            sides = self._index.get(key)
+            if sides and sides[number % 2]:
+                points = sides[number % 2]
+                break
+        if not points:
+            return None
+
+        match = self._locate(points, number)
+        if not match:
+            return None
+        latitude, longitude, matched_zip = match
+        zip_part = f" {matched_zip}" if matched_zip else ""
+        return {
+            "formatted_address": f"{number} {self._display_names[street_key]}, Philadelphia, PA{zip_part}",
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+
+    @staticmethod
+    def _locate(points: List[Point], number: int) -> Optional[Tuple[float, float, str]]:
+        idx = bisect_left(points, (number,))
+        if idx < len(points) and points[idx][0] == number:
+            return points[idx][1], points[idx][2], points[idx][3]
+
+        lower = points[idx - 1] if idx > 0 and number - points[idx - 1][0] <= MAX_HOUSE_NUMBER_GAP else None
+        upper = points[idx] if idx < len(points) and points[idx][0] - number <= MAX_HOUSE_NUMBER_GAP else None
+
+        if lower and upper:
+            t = (number - lower[0]) / (upper[0] - lower[0])
+            return (
+                lower[1] + t * (upper[1] - lower[1]),
+                lower[2] + t * (upper[2] - lower[2]),
+                lower[3],
+            )
+        nearest = lower or upper
+        if nearest:
+            return nearest[1], nearest[2], nearest[3]
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+_load_lock = Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Load the configured dataset on first use; None when not configured."""
+    global _gazetteer
+    if _gazetteer is None and settings.gazetteer_path:
+        with _load_lock:
+            if _gazetteer is None:
+                try:
+                    _gazetteer = Gazetteer.from_csv(settings.gazetteer_path)
+                    logger.info("Loaded %d address points from %s", len(_gazetteer), settings.gazetteer_path)
+                except OSError:
+                    logger.exception("Could not load gazetteer from %s", settings.gazetteer_path)
+                    _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+def geocode_local_first(address: str) -> Optional[dict]:
+    """Resolve from the local dataset, falling back to the remote API on a miss."""
+    gazetteer = get_gazetteer()
+    location = gazetteer.lookup(address) if gazetteer else None
+    return location or geocode_address(address)
+
+
+def get_geocoder() -> Optional[Callable[[str], Optional[dict]]]:
+    """The configured geocoder; None when no backend could resolve an address."""
+    if settings.geocoder_backend == "local" and settings.gazetteer_path:
+        return geocode_local_first
+    if google_configured():
+        return geocode_address
+    return None
@@ -0,0 +1,222 @@
+"""Spatial queries over geocoded reviews.
+
+Coordinates are indexed on whichever database `DATABASE_URL` selects:
+
+- SQLite: an R*Tree virtual table, `reviews_rtree`, with one point-sized box
+  per review. Triggers on `reviews` keep it in sync, including when
+  background geocoding fills in `latitude`/`longitude` after submission.
+- PostgreSQL: a GiST expression index on `point(longitude, latitude)`, using
+  the built-in geometric types, so PostGIS is not required.
+
+Both answer a bounding-box filter from the index; rows are then ordered by
+distance in SQL. Distances use the equirectangular approximation around the
+query point, which is within 0.1% of the great-circle distance at city
+scale. Boxes crossing the antimeridian are not supported.
+
+When the index cannot be created (SQLite built without R*Tree, a Postgres
+role that may not create indexes), a warning is logged and the same box
+filter runs as a plain scan of `reviews`: same results, slower.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .database import OptionalIndex
+from .pagination import decode_key, encode_key
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = EARTH_RADIUS_M * math.pi / 180
+MAX_RADIUS_M = 50_000
+
+BBox = Tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+
+_SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_rtree USING rtree(
+        id, min_lat, max_lat, min_lng, max_lng
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_rtree_ai AFTER INSERT ON reviews
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO reviews_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_rtree_ad AFTER DELETE ON reviews BEGIN
+        DELETE FROM reviews_rtree WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_rtree_au AFTER UPDATE OF latitude, longitude ON reviews BEGIN
+        DELETE FROM reviews_rtree WHERE id = old.id;
+        INSERT INTO reviews_rtree
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+]
+_SQLITE_BACKFILL = """
+    INSERT INTO reviews_rtree
+    SELECT id, latitude, latitude, longitude, longitude FROM reviews
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+_POSTGRES_SCHEMA = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_reviews_location ON reviews USING GIST (point(longitude, latitude))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """,
+]
+
+# Candidates inside the box, with squared distance in meters from (:lat, :lng).
+# The R*Tree stores 32-bit floats rounded outward, so the real columns are
+# checked against the box too.
+_DISTANCE = """
+    ((r.latitude - :lat) * :ky) * ((r.latitude - :lat) * :ky)
+    + ((r.longitude - :lng) * :kx) * ((r.longitude - :lng) * :kx)
+"""
+_IN_BOX = """
+    r.latitude BETWEEN :min_lat AND :max_lat AND r.longitude BETWEEN :min_lng AND :max_lng
+"""
+_SQLITE_CANDIDATES = f"""
+    SELECT r.id AS id, {_DISTANCE} AS d2
+    FROM reviews_rtree t JOIN reviews r ON r.id = t.id
+    WHERE t.max_lat >= :min_lat AND t.min_lat <= :max_lat
+      AND t.max_lng >= :min_lng AND t.min_lng <= :max_lng
+      AND {_IN_BOX}
+"""
+_POSTGRES_CANDIDATES = f"""
+    SELECT r.id AS id, {_DISTANCE} AS d2
+    FROM reviews r
+    WHERE r.latitude IS NOT NULL AND r.longitude IS NOT NULL
+      AND point(r.longitude, r.latitude) <@ box(point(:min_lng, :min_lat), point(:max_lng, :max_lat))
+      AND {_IN_BOX}
+"""
+_PLAIN_CANDIDATES = f"""
+    SELECT r.id AS id, {_DISTANCE} AS d2
+    FROM reviews r
+    WHERE r.latitude IS NOT NULL AND r.longitude IS NOT NULL AND {_IN_BOX}
+"""
+
+
+def _create_index(conn: Connection) -> bool:
+    if conn.dialect.name == "sqlite":
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reviews_rtree'")
+        ).first()
+        for statement in _SQLITE_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(_SQLITE_BACKFILL))
+        return not exists
+    for statement in _POSTGRES_SCHEMA:
+        conn.execute(text(statement))
+    return True
+
+
+_index = OptionalIndex("Spatial index", "scanning reviews for box queries", _create_index)
+
+
+def ensure_index(conn: Connection) -> bool:
+    """Create the spatial index and its sync triggers if they are missing.
+
+    Returns True when existing reviews were indexed as part of the call. If
+    the database cannot build the index, this process answers box queries
+    with plain scans and False is returned.
+    """
+    return _index.ensure(conn)
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _check_point(lat: float, lng: float) -> None:
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise _bad_request("lat must be within [-90, 90] and lng within [-180, 180]")
+
+
+def parse_bbox(raw: str) -> BBox:
+    """Parse `min_lng,min_lat,max_lng,max_lat` (GeoJSON order)."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in raw.split(","))
+    except ValueError:
+        raise _bad_request("bbox must be min_lng,min_lat,max_lng,max_lat")
+    _check_point(min_lat, min_lng)
+    _check_point(max_lat, max_lng)
+    if min_lat > max_lat or min_lng > max_lng:
+        raise _bad_request("bbox minimums must not exceed its maximums")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def radius_bbox(lat: float, lng: float, radius_m: float) -> BBox:
+    """Smallest box containing the circle of `radius_m` around the point."""
+    dlat = radius_m / METERS_PER_DEGREE
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    return max(-180.0, lng - dlng), max(-90.0, lat - dlat), min(180.0, lng + dlng), min(90.0, lat + dlat)
+
+
+def _ranked(
+    db: Session, bbox: BBox, lat: float, lng: float, radius_m: Optional[float], limit: int, cursor: Optional[str]
+) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+    min_lng, min_lat, max_lng, max_lat = bbox
+    params = {
+        "lat": lat, "lng": lng,
+        "ky": METERS_PER_DEGREE, "kx": METERS_PER_DEGREE * math.cos(math.radians(lat)),
+        "min_lat": min_lat, "max_lat": max_lat, "min_lng": min_lng, "max_lng": max_lng,
+        "limit": limit + 1,
+    }
+    filters = []
+    if radius_m is not None:
+        filters.append("d2 <= :r2")
+        params["r2"] = radius_m * radius_m
+    if cursor:
+        try:
+            d2, row_id = decode_key(cursor)
+            params.update(cursor_d2=float(d2), cursor_id=int(row_id))
+        except (ValueError, TypeError):
+            raise _bad_request("Invalid cursor")
+        filters.append("(d2, id) > (:cursor_d2, :cursor_id)")
+
+    if not _index.available:
+        candidates = _PLAIN_CANDIDATES
+    elif db.get_bind().dialect.name == "sqlite":
+        candidates = _SQLITE_CANDIDATES
+    else:
+        candidates = _POSTGRES_CANDIDATES
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    rows = db.execute(
+        text(f"SELECT id, d2 FROM ({candidates}) AS candidates {where} ORDER BY d2, id LIMIT :limit"),
+        params,
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_key([rows[-1].d2, rows[-1].id])
+    return [(row.id, math.sqrt(row.d2)) for row in rows], next_cursor
+
+
+def near(
+    db: Session, lat: float, lng: float, radius_m: float, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+    """`(review_id, distance_m)` within `radius_m` of the point, nearest first."""
+    _check_point(lat, lng)
+    if not 0 < radius_m <= MAX_RADIUS_M:
+        raise _bad_request(f"radius_m must be greater than 0 and at most {MAX_RADIUS_M}")
+    return _ranked(db, radius_bbox(lat, lng, radius_m), lat, lng, radius_m, limit, cursor)
+
+
+def within(
+    db: Session, bbox: BBox, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+    """`(review_id, distance_m)` inside `bbox`, nearest to its centre first."""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return _ranked(db, bbox, (min_lat + max_lat) / 2, (min_lng + max_lng) / 2, None, limit, cursor)
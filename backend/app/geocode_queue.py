@@ -0,0 +1,172 @@
+"""Background geocoding for submitted reviews.
+
+Reviews are stored with `geocode_status="pending"` and picked up here, so
+submission latency does not depend on the upstream geocoder. The queue lives
+in the `reviews` table itself, which makes it durable across restarts and safe
+to share between processes: a worker claims a row by pushing its
+`geocode_next_attempt_at` forward by a lease, and a crashed worker's rows
+become due again once the lease runs out.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import update
+
+from . import autocomplete, instrumentation, map_tiles, models, response_cache
+from .config import get_settings
+from .database import SessionLocal
+from .gazetteer import get_geocoder
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Geocoder = Callable[[str], Optional[dict]]
+
+_wakeup = threading.Event()
+_stopping = threading.Event()
+_threads: List[threading.Thread] = []
+
+
+def enabled() -> bool:
+    """Whether a geocoder is configured; without one, addresses are not queued."""
+    return get_geocoder() is not None
+
+
+def notify() -> None:
+    """Wake idle workers after new pending rows were committed."""
+    _wakeup.set()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.geocode_retry_base_seconds * (2 ** max(attempts - 1, 0)))
+
+
+def _claim_batch(db, now: datetime) -> List[models.Review]:
+    candidates = (
+        db.query(models.Review.id)
+        .filter(
+            models.Review.geocode_status == "pending",
+            models.Review.geocode_next_attempt_at <= now,
+        )
+        .order_by(models.Review.geocode_next_attempt_at)
+        .limit(settings.geocode_batch_size)
+        .all()
+    )
+
+    lease_until = now + timedelta(seconds=settings.geocode_lease_seconds)
+    claimed = []
+    for (review_id,) in candidates:
+        # Conditional update: only one worker can move the row past `now`
+        result = db.execute(
+            update(models.Review)
+            .where(
+                models.Review.id == review_id,
+                models.Review.geocode_status == "pending",
+                models.Review.geocode_next_attempt_at <= now,
+            )
+            .values(geocode_next_attempt_at=lease_until)
+        )
+        if result.rowcount:
+            claimed.append(review_id)
+    db.commit()
+
+    if not claimed:
+        return []
+    return db.query(models.Review).filter(models.Review.id.in_(claimed)).all()
+
+
+def process_batch(geocoder: Optional[Geocoder] = None) -> int:
+    """Geocode one batch of due reviews. Returns the number of rows processed."""
+    geocoder = geocoder or get_geocoder()
+    if geocoder is None:
+        # Rows stay pending, without spending attempts, until one is configured
+        return 0
+    db = SessionLocal()
+    try:
+        reviews = _claim_batch(db, datetime.utcnow())
+        resolved: List[str] = []
+        finished = False
+        for review in reviews:
+            try:
+                with instrumentation.timed("geocode"):
+                    location = geocoder(review.property_address)
+            except Exception:
+                logger.exception("Geocoding review %s failed", review.id)
+                location = None
+
+            review.geocode_attempts += 1
+            if location:
+                review.formatted_address = location.get("formatted_address")
+                review.latitude = location.get("latitude")
+                review.longitude = location.get("longitude")
+                review.geocode_status = "done"
+                review.geocode_next_attempt_at = None
+                finished = True
+                if review.formatted_address:
+                    resolved.append(review.formatted_address)
+                if review.latitude is not None and review.longitude is not None:
+                    # Committed together with the coordinates below
+                    map_tiles.apply_location(db, review.latitude, review.longitude, review.overall_rating)
+            elif review.geocode_attempts >= settings.geocode_max_attempts:
+                review.geocode_status = "failed"
+                review.geocode_next_attempt_at = None
+                finished = True
+            else:
+                review.geocode_next_attempt_at = datetime.utcnow() + _retry_delay(review.geocode_attempts)
+        if finished:
+            # Addresses, coordinates and statuses appear in the cached feeds;
+            # a retry being rescheduled changes none of them
+            response_cache.bump(db)
+        db.commit()
+        for address in resolved:
+            autocomplete.record_address(address)
+        return len(reviews)
+    finally:
+        db.close()
+
+
+def drain(geocoder: Optional[Geocoder] = None) -> int:
+    """Process batches until nothing is due. Returns the total rows processed."""
+    total = 0
+    while True:
+        processed = process_batch(geocoder)
+        if not processed:
+            return total
+        total += processed
+
+
+def _run(geocoder: Optional[Geocoder]) -> None:
+    while not _stopping.is_set():
+        try:
+            processed = process_batch(geocoder)
+        except Exception:
+            logger.exception("Geocoding worker batch failed")
+            processed = 0
+        if not processed:
+            _wakeup.wait(settings.geocode_poll_interval_seconds)
+            _wakeup.clear()
+
+
+def start_workers(geocoder: Optional[Geocoder] = None, count: Optional[int] = None) -> None:
+    count = settings.geocode_workers if count is None else count
+    if _threads or count <= 0:
+        return
+    if geocoder is None and not enabled():
+        logger.info("No geocoder configured (GOOGLE_MAPS_API_KEY or GAZETTEER_PATH); reviews will not be geocoded")
+        return
+    _stopping.clear()
+    for i in range(count):
+        thread = threading.Thread(target=_run, args=(geocoder,), name=f"geocode-worker-{i}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_workers(timeout: float = 5.0) -> None:
+    _stopping.set()
+    _wakeup.set()
+    for thread in _threads:
+        thread.join(timeout)
+    _threads.clear()
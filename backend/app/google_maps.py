@@ -1,27 +1,88 @@
+import logging
 import os
-from typing import Optional
+import re
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Optional
 
 import requests
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
 
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
-def geocode_address(address: str) -> Optional[dict]:
-    if not GOOGLE_MAPS_API_KEY:
-        # Without an API key we cannot make the request; callers should degrade gracefully.
-        return None
+# HTTP layer used for upstream calls; replace with a stub in tests
+http_get = requests.get
+
+_stats = {"hits": 0, "misses": 0, "upstream_calls": 0, "coalesced": 0, "evictions": 0}
+_stats_lock = Lock()
+
+# Single-flight: one in-progress upstream lookup per normalized address
+_inflight: Dict[str, Future] = {}
+_inflight_lock = Lock()
+
+# Hits refresh `last_used_at` at most this often, so most reads do not write
+_TOUCH_INTERVAL = timedelta(hours=1)
+# The table is counted for eviction once per this many cache writes, so it
+# may run over `geocode_cache_max_entries` by up to this many rows per worker
+_EVICT_EVERY = 100
+_puts_since_evict = 0
+
+_PUNCTUATION = re.compile(r"[.,#]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class GeocodeUpstreamError(requests.RequestException):
+    """The API answered with a status that says nothing about the address.
+
+    OVER_QUERY_LIMIT, REQUEST_DENIED, INVALID_REQUEST and UNKNOWN_ERROR are
+    treated like transport errors: not cached, so a later attempt retries.
+    """
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
 
+
+def cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def normalize_address(address: str) -> str:
+    """Canonical cache key: case, punctuation and spacing differences collapse."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", address.lower())).strip()
+
+
+def _request_geocode(address: str) -> Optional[dict]:
+    """Call the Google Geocoding API; None when the address has no match.
+
+    Raises requests.RequestException on transport errors and on any status
+    other than OK or ZERO_RESULTS.
+    """
     params = {"address": address, "key": GOOGLE_MAPS_API_KEY}
-    try:
-        response = requests.get(GEOCODE_URL, params=params, timeout=5)
-        response.raise_for_status()
-    except requests.RequestException:
-        return None
+    _count("upstream_calls")
+    response = http_get(GEOCODE_URL, params=params, timeout=5)
+    response.raise_for_status()
 
     payload = response.json()
-    if payload.get("status") != "OK":
+    status = payload.get("status")
+    if status == "ZERO_RESULTS":
         return None
+    if status != "OK":
+        raise GeocodeUpstreamError(f"Geocoding API returned {status}: {payload.get('error_message', '')}")
 
     first_result = payload.get("results", [{}])[0]
     geometry = first_result.get("geometry", {}).get("location", {})
@@ -31,3 +92,134 @@ def geocode_address(address: str) -> Optional[dict]:
         "latitude": geometry.get("lat"),
         "longitude": geometry.get("lng"),
     }
+
+
+def _entry_to_result(entry: models.GeocodeCacheEntry) -> Optional[dict]:
+    if not entry.found:
+        return None
+    return {
+        "formatted_address": entry.formatted_address,
+        "latitude": entry.latitude,
+        "longitude": entry.longitude,
+    }
+
+
+def _cache_get(db, key: str):
+    """Return (hit, result) for a fresh cache entry and bump its LRU timestamp.
+
+    The timestamp only needs hour precision for eviction, so it is written
+    when it is older than `_TOUCH_INTERVAL` rather than on every hit.
+    """
+    entry = db.get(models.GeocodeCacheEntry, key)
+    now = datetime.utcnow()
+    if entry is None or now - entry.created_at > timedelta(seconds=settings.geocode_cache_ttl_seconds):
+        return False, None
+    if now - entry.last_used_at > _TOUCH_INTERVAL:
+        entry.last_used_at = now
+        db.commit()
+    return True, _entry_to_result(entry)
+
+
+def _cache_put(db, key: str, result: Optional[dict]) -> Optional[dict]:
+    """Cache `result` for `key` and return the cached answer."""
+    now = datetime.utcnow()
+    entry = db.get(models.GeocodeCacheEntry, key) or models.GeocodeCacheEntry(address_key=key)
+    entry.found = result is not None
+    entry.formatted_address = result.get("formatted_address") if result else None
+    entry.latitude = result.get("latitude") if result else None
+    entry.longitude = result.get("longitude") if result else None
+    entry.created_at = now
+    entry.last_used_at = now
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker cached the same address first; its row is as fresh as ours
+        db.rollback()
+        existing = db.get(models.GeocodeCacheEntry, key)
+        if existing is not None:
+            result = _entry_to_result(existing)
+
+    global _puts_since_evict
+    with _stats_lock:
+        _puts_since_evict += 1
+        due = _puts_since_evict >= _EVICT_EVERY
+        if due:
+            _puts_since_evict = 0
+    if due:
+        _evict_lru(db)
+    return result
+
+
+def _evict_lru(db) -> None:
+    excess = db.query(models.GeocodeCacheEntry).count() - settings.geocode_cache_max_entries
+    if excess <= 0:
+        return
+    oldest = (
+        db.query(models.GeocodeCacheEntry.address_key)
+        .order_by(models.GeocodeCacheEntry.last_used_at.asc())
+        .limit(excess)
+        .subquery()
+    )
+    deleted = (
+        db.query(models.GeocodeCacheEntry)
+        .filter(models.GeocodeCacheEntry.address_key.in_(oldest.select()))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    _count("evictions", deleted)
+
+
+def _lookup(key: str, address: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        hit, result = _cache_get(db, key)
+        if hit:
+            _count("hits")
+            return result
+
+        _count("misses")
+        return _cache_put(db, key, _request_geocode(address))
+    finally:
+        db.close()
+
+
+def is_configured() -> bool:
+    return bool(GOOGLE_MAPS_API_KEY)
+
+
+def geocode_address(address: str) -> Optional[dict]:
+    if not GOOGLE_MAPS_API_KEY:
+        # Without an API key we cannot make the request; callers should degrade gracefully.
+        return None
+
+    key = normalize_address(address)
+    if not key:
+        return None
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        # Another request is already resolving this address; share its answer
+        _count("coalesced")
+        return future.result()
+
+    try:
+        try:
+            result = _lookup(key, address)
+        except requests.RequestException as exc:
+            # Transport and quota errors are not cached so the next attempt retries
+            logger.warning("Geocoding %r failed: %s", address, exc)
+            result = None
+        future.set_result(result)
+        return result
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
@@ -0,0 +1,303 @@
+"""Per-request timing breakdown and Prometheus-text metrics.
+
+`TimingMiddleware` gives each HTTP request a `RequestTimings` through a
+context variable. Cursor event listeners on the sync and async engines add
+every SQL statement's count and duration to it, and `timed()` blocks add
+bcrypt and geocoding time. When the response starts, the breakdown goes out
+in a `Server-Timing` header; when it ends, the request is logged as one
+JSON line and its latency is observed in a per-route histogram, rendered by
+`render_metrics()` for `GET /metrics`.
+
+The per-request cost is a few `perf_counter()` calls per statement and one
+lock acquisition per request, so it is meant to stay on in production.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import autocomplete, google_maps, principal_cache, response_cache
+from .database import async_engine, engine
+
+logger = logging.getLogger("uvicorn.requests")
+
+# Latency histogram upper bounds in seconds; +Inf is implied
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMPONENTS = ("bcrypt", "geocode")
+# Requests that matched no route share one label, so scanners cannot grow the series
+UNMATCHED_ROUTE = "unmatched"
+# Cache figures that only grow are `cache_<stat>_total` counters and sizes are
+# `cache_<stat>` gauges; hit rates are left to `rate()` over the counters
+CACHE_COUNTERS = {
+    "hits": "Lookups answered from the cache.",
+    "misses": "Lookups the cache could not answer.",
+    "not_modified": "Conditional requests answered with 304 Not Modified.",
+    "upstream_calls": "Requests sent to the upstream service.",
+    "coalesced": "Lookups that waited for an identical lookup already in flight.",
+    "evictions": "Entries removed to stay under the size limit.",
+    "invalidations": "Explicit invalidations.",
+}
+CACHE_GAUGES = {"size": "Entries currently cached."}
+AUTOCOMPLETE_GAUGES = {
+    "keys": "Search keys in the autocomplete index.",
+    "entries": "Suggestions in the autocomplete index.",
+    "memory_bytes": "Approximate memory used by the autocomplete index.",
+}
+
+
+class RequestTimings:
+    __slots__ = ("sql_count", "sql_seconds", "bcrypt_seconds", "geocode_seconds")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+        self.geocode_seconds = 0.0
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} queries"']
+        for component in COMPONENTS:
+            seconds = getattr(self, f"{component}_seconds")
+            if seconds:
+                parts.append(f"{component};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+# (method, route) -> latency histogram
+_latency: Dict[Tuple[str, str], _Histogram] = {}
+# (method, route, status) -> request count
+_responses: Dict[Tuple[str, str, int], int] = {}
+# (method, route) -> [SQL statements, SQL seconds]
+_sql: Dict[Tuple[str, str], List[float]] = {}
+# component -> duration histogram, including work done outside requests
+_components: Dict[str, _Histogram] = {component: _Histogram() for component in COMPONENTS}
+
+
+def current() -> Optional[RequestTimings]:
+    """Timings of the request being handled, None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def timed(component: str) -> Iterator[None]:
+    """Time a block as `component` work, for the current request if there is one."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = _current.get()
+        if timings is not None:
+            setattr(timings, f"{component}_seconds", getattr(timings, f"{component}_seconds") + elapsed)
+        with _lock:
+            _components[component].observe(elapsed)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_timing_started", None)
+    timings = _current.get()
+    if started is None or timings is None:
+        return
+    timings.sql_count += 1
+    timings.sql_seconds += time.perf_counter() - started
+
+
+def instrument(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+instrument(engine)
+if async_engine is not None:
+    instrument(async_engine.sync_engine)
+
+
+def _route(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _record(method: str, route: str, status: int, elapsed: float, timings: RequestTimings) -> None:
+    with _lock:
+        histogram = _latency.get((method, route))
+        if histogram is None:
+            histogram = _latency[(method, route)] = _Histogram()
+        histogram.observe(elapsed)
+        key = (method, route, status)
+        _responses[key] = _responses.get(key, 0) + 1
+        sql = _sql.get((method, route))
+        if sql is None:
+            sql = _sql[(method, route)] = [0, 0.0]
+        sql[0] += timings.sql_count
+        sql[1] += timings.sql_seconds
+
+
+class TimingMiddleware:
+    """Attach a `RequestTimings` to each HTTP request and report it.
+
+    A plain ASGI middleware rather than `BaseHTTPMiddleware`, so streamed
+    responses pass through untouched; the header is added to the response
+    start message.
+    """
+
+    def __init__(self, app: ASGIApp, log_requests: bool = True):
+        self.app = app
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            method, route = scope["method"], _route(scope)
+            _record(method, route, status, elapsed, timings)
+            if self.log_requests and logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps({
+                    "method": method,
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "sql_count": timings.sql_count,
+                    "sql_ms": round(timings.sql_seconds * 1000, 2),
+                    "bcrypt_ms": round(timings.bcrypt_seconds * 1000, 2),
+                    "geocode_ms": round(timings.geocode_seconds * 1000, 2),
+                }))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _copy(histogram: _Histogram) -> _Histogram:
+    snapshot = _Histogram()
+    snapshot.counts = list(histogram.counts)
+    snapshot.sum, snapshot.count = histogram.sum, histogram.count
+    return snapshot
+
+
+def _histogram_lines(name: str, histogram: _Histogram, **labels) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum!r}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def _cache_stats() -> Dict[str, dict]:
+    return {
+        "geocode": google_maps.cache_stats(),
+        "principal": principal_cache.stats(),
+        "response": response_cache.stats(),
+    }
+
+
+def render_metrics() -> str:
+    """All metrics of this process in the Prometheus text exposition format."""
+    with _lock:
+        latency = {key: _copy(histogram) for key, histogram in _latency.items()}
+        responses = dict(_responses)
+        sql = {key: tuple(value) for key, value in _sql.items()}
+        components = {key: _copy(histogram) for key, histogram in _components.items()}
+
+    lines = [
+        "# HELP http_request_duration_seconds Time from receiving a request to finishing its response.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(latency.items()):
+        lines += _histogram_lines("http_request_duration_seconds", histogram, method=method, route=route)
+
+    lines += ["# HELP http_requests_total Responses sent.", "# TYPE http_requests_total counter"]
+    for (method, route, status), count in sorted(responses.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += ["# HELP http_request_sql_queries_total SQL statements run by requests.", "# TYPE http_request_sql_queries_total counter"]
+    for (method, route), (count, _seconds) in sorted(sql.items()):
+        lines.append(f"http_request_sql_queries_total{_labels(method=method, route=route)} {int(count)}")
+    lines += ["# HELP http_request_sql_seconds_total Time spent in SQL statements by requests.", "# TYPE http_request_sql_seconds_total counter"]
+    for (method, route), (_count, seconds) in sorted(sql.items()):
+        lines.append(f"http_request_sql_seconds_total{_labels(method=method, route=route)} {seconds!r}")
+
+    for component, histogram in components.items():
+        name = f"{component}_duration_seconds"
+        lines += [f"# HELP {name} Duration of {component} calls, in and out of requests.", f"# TYPE {name} histogram"]
+        lines += _histogram_lines(name, histogram)
+
+    caches = _cache_stats()
+    for kind, suffix, stats in (("counter", "_total", CACHE_COUNTERS), ("gauge", "", CACHE_GAUGES)):
+        for stat, description in stats.items():
+            name = f"cache_{stat}{suffix}"
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+            for cache, values in caches.items():
+                if stat in values:
+                    lines.append(f"{name}{_labels(cache=cache)} {values[stat]!r}")
+
+    indexes = autocomplete.stats()
+    for stat, description in AUTOCOMPLETE_GAUGES.items():
+        name = f"autocomplete_index_{stat}"
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+        for kind, values in indexes.items():
+            lines.append(f"{name}{_labels(index=kind)} {values[stat]}")
+    return "\n".join(lines) + "\n"
+
@@ -0,0 +1,187 @@
+"""Per-landlord aggregates kept in `landlord_stats`.
+
+`apply_review` adds one review to its landlord's row with a single upsert
+whose SET clause only adds deltas, so concurrent submissions for the same
+landlord cannot overwrite each other; `remove_review` subtracts one the same
+way, for deletes and, followed by `apply_review`, for edits. `rebuild`
+recomputes everything in one streaming pass over `reviews` and reports rows
+that drifted.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .database import dialect_insert
+
+Stats = models.LandlordStats
+
+# (column prefix, Review attribute) for the optional rating dimensions
+_RATING_DIMENSIONS = [
+    ("maintenance", "maintenance_rating"),
+    ("communication", "communication_rating"),
+    ("respect", "respect_rating"),
+    ("rent_value", "rent_value_rating"),
+]
+_COUNTER_COLUMNS = [
+    "review_count",
+    "overall_sum",
+    "would_rent_again_count",
+    "rent_count",
+    "rent_sum",
+] + [f"{prefix}_{suffix}" for prefix, _ in _RATING_DIMENSIONS for suffix in ("sum", "count")]
+
+
+def _deltas(review) -> Dict[str, float]:
+    """Counter increments contributed by one review."""
+    deltas = {
+        "review_count": 1,
+        "overall_sum": review.overall_rating or 0.0,
+        "would_rent_again_count": 1 if review.would_rent_again else 0,
+        "rent_count": 1 if review.monthly_rent is not None else 0,
+        "rent_sum": review.monthly_rent or 0,
+    }
+    for prefix, attr in _RATING_DIMENSIONS:
+        value = getattr(review, attr)
+        deltas[f"{prefix}_sum"] = value or 0.0
+        deltas[f"{prefix}_count"] = 1 if value is not None else 0
+    return deltas
+
+
+def apply_review(db: Session, review: models.Review) -> None:
+    """Add `review` to its landlord's aggregates; the caller commits."""
+    deltas = _deltas(review)
+    rent = review.monthly_rent
+    table = Stats.__table__
+
+    stmt = dialect_insert(db)(table).values(
+        landlord_id=review.landlord_id,
+        rent_min=rent,
+        rent_max=rent,
+        **deltas,
+    )
+    updates = {name: table.c[name] + stmt.excluded[name] for name in _COUNTER_COLUMNS}
+    if rent is not None:
+        updates["rent_min"] = case(
+            (table.c.rent_min.is_(None), rent), (table.c.rent_min > rent, rent), else_=table.c.rent_min
+        )
+        updates["rent_max"] = case(
+            (table.c.rent_max.is_(None), rent), (table.c.rent_max < rent, rent), else_=table.c.rent_max
+        )
+    db.execute(stmt.on_conflict_do_update(index_elements=[table.c.landlord_id], set_=updates))
+
+
+def remove_review(db: Session, review: models.Review) -> None:
+    """Take `review` out of its landlord's aggregates; the caller commits.
+
+    Call it before deleting the review, or before editing its ratings, rent
+    or landlord and then calling `apply_review`. Rent bounds cannot be
+    decremented, so they are recomputed from the landlord's other reviews.
+    """
+    if review.landlord_id is None:
+        return
+    deltas = _deltas(review)
+    table = Stats.__table__
+    row = table.c.landlord_id == review.landlord_id
+    db.execute(update(table).where(row).values({table.c[name]: table.c[name] - deltas[name] for name in _COUNTER_COLUMNS}))
+    if review.monthly_rent is not None:
+        others = select(models.Review.monthly_rent).where(
+            models.Review.landlord_id == review.landlord_id, models.Review.id != review.id
+        ).subquery()
+        db.execute(update(table).where(row).values(
+            rent_min=select(func.min(others.c.monthly_rent)).scalar_subquery(),
+            rent_max=select(func.max(others.c.monthly_rent)).scalar_subquery(),
+        ))
+    db.execute(delete(table).where(row, table.c.review_count <= 0))
+
+
+def _mean(total: float, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+
+def to_schema(row: models.LandlordStats, landlord: models.Landlord) -> schemas.LandlordStatsOut:
+    return schemas.LandlordStatsOut(
+        landlord_id=landlord.id,
+        landlord_name=landlord.name,
+        review_count=row.review_count,
+        average_overall_rating=_mean(row.overall_sum, row.review_count),
+        average_maintenance_rating=_mean(row.maintenance_sum, row.maintenance_count),
+        average_communication_rating=_mean(row.communication_sum, row.communication_count),
+        average_respect_rating=_mean(row.respect_sum, row.respect_count),
+        average_rent_value_rating=_mean(row.rent_value_sum, row.rent_value_count),
+        would_rent_again_ratio=_mean(row.would_rent_again_count, row.review_count),
+        rent_min=row.rent_min,
+        rent_max=row.rent_max,
+        rent_mean=_mean(row.rent_sum, row.rent_count),
+    )
+
+
+def aggregate(reviews: Iterable) -> Dict[int, dict]:
+    """Fold review rows into aggregate dicts keyed by landlord id."""
+    totals: Dict[int, dict] = {}
+    for review in reviews:
+        entry = totals.get(review.landlord_id)
+        if entry is None:
+            entry = totals[review.landlord_id] = dict.fromkeys(_COUNTER_COLUMNS, 0)
+            entry.update(rent_min=None, rent_max=None)
+        for name, delta in _deltas(review).items():
+            entry[name] += delta
+        rent = review.monthly_rent
+        if rent is not None:
+            entry["rent_min"] = rent if entry["rent_min"] is None else min(entry["rent_min"], rent)
+            entry["rent_max"] = rent if entry["rent_max"] is None else max(entry["rent_max"], rent)
+    return totals
+
+
+def _differs(row: models.LandlordStats, expected: dict) -> bool:
+    for name in _COUNTER_COLUMNS + ["rent_min", "rent_max"]:
+        actual, wanted = getattr(row, name), expected[name]
+        if isinstance(wanted, float) or isinstance(actual, float):
+            if abs((actual or 0.0) - (wanted or 0.0)) > 1e-6:
+                return True
+        elif actual != wanted:
+            return True
+    return False
+
+
+def rebuild(db: Session, apply: bool = True, batch_size: int = 1000) -> List[int]:
+    """Recompute all aggregates in one streaming pass over `reviews`.
+
+    Returns the landlord ids whose stored row was missing, stale or orphaned.
+    With `apply`, the table is rewritten to match and the caller commits.
+    Reviews not yet linked to a landlord are skipped.
+    """
+    columns = [
+        models.Review.landlord_id,
+        models.Review.overall_rating,
+        models.Review.would_rent_again,
+        models.Review.monthly_rent,
+    ] + [getattr(models.Review, attr) for _, attr in _RATING_DIMENSIONS]
+    rows = db.execute(
+        select(*columns)
+        .where(models.Review.landlord_id.is_not(None))
+        .execution_options(yield_per=batch_size)
+    )
+    expected = aggregate(rows)
+
+    stored = {row.landlord_id: row for row in db.query(Stats)}
+    drifted = sorted(
+        [lid for lid, values in expected.items() if lid not in stored or _differs(stored[lid], values)]
+        + [lid for lid in stored if lid not in expected]
+    )
+
+    if apply:
+        for landlord_id in drifted:
+            row = stored.get(landlord_id)
+            values = expected.get(landlord_id)
+            if values is None:
+                db.delete(row)
+                continue
+            if row is None:
+                row = Stats(landlord_id=landlord_id)
+                db.add(row)
+            for name, value in values.items():
+                setattr(row, name, value)
+    return drifted
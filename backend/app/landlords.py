@@ -0,0 +1,209 @@
+"""Landlord entity resolution.
+
+Free-text landlord names are reduced to a canonical `normalized_key` ("The
+Drake", "the drake " and "The Drake, LLC" all become "the drake"). Only case,
+punctuation, spacing and trailing legal suffixes are dropped; words such as
+"Realty" or "Homes" often are the name. A submission is linked to the
+landlord with the same key, or to the one an alias of that key points at;
+failing that, to the closest landlord sharing its `blocking_key` if the names
+are similar enough; and otherwise a new landlord is created. The blocking key
+keeps the fuzzy step to a handful of indexed candidates instead of every
+landlord.
+
+Every fuzzy merge is stored as a `LandlordAlias`, so a wrong one can be found
+and undone with `unmerge` (scripts/unmerge_landlord.py).
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import dialect_insert
+
+# Similarity (0..1) between normalized keys above which names are merged
+FUZZY_MATCH_THRESHOLD = 0.88
+BLOCKING_KEY_LENGTH = 4
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+# Legal forms of the same business; only stripped from the end of a name
+_LEGAL_SUFFIXES = frozenset({"llc", "inc", "co", "corp", "ltd", "lp", "llp"})
+
+
+def normalize_landlord_name(name: str) -> str:
+    """Canonical key for `name`; empty when it has no letters or digits."""
+    tokens = _NON_WORD.sub(" ", name.lower().replace("&", " and ")).split()
+    # "Smith Realty LLC" -> "smith realty", but "Drake LLC" stays two words
+    while len(tokens) > 2 and tokens[-1] in _LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def blocking_key(normalized: str) -> str:
+    return normalized.replace(" ", "")[:BLOCKING_KEY_LENGTH]
+
+
+def _similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _best_match(normalized: str, candidates: Iterable[Tuple[int, str]]) -> Optional[Tuple[int, float]]:
+    best, best_score = None, FUZZY_MATCH_THRESHOLD
+    for landlord_id, key in candidates:
+        score = _similarity(normalized, key)
+        if score >= best_score:
+            best, best_score = (landlord_id, score), score
+    return best
+
+
+def _record_alias(db: Session, normalized: str, landlord_id: int, similarity: float) -> int:
+    """Link `normalized` to `landlord_id`; returns the landlord the key ends up linked to."""
+    # ON CONFLICT DO NOTHING: a concurrent submission may have linked it first
+    table = models.LandlordAlias.__table__
+    db.execute(
+        dialect_insert(db)(table)
+        .values(normalized_key=normalized, landlord_id=landlord_id, similarity=similarity)
+        .on_conflict_do_nothing(index_elements=[table.c.normalized_key])
+    )
+    return db.execute(
+        select(models.LandlordAlias.landlord_id).where(models.LandlordAlias.normalized_key == normalized)
+    ).scalar_one()
+
+
+def _create_landlord(db: Session, name: str, normalized: str) -> int:
+    # ON CONFLICT DO NOTHING: a concurrent submission may have created it first
+    table = models.Landlord.__table__
+    db.execute(
+        dialect_insert(db)(table)
+        .values(name=" ".join(name.split()), normalized_key=normalized, blocking_key=blocking_key(normalized))
+        .on_conflict_do_nothing(index_elements=[table.c.normalized_key])
+    )
+    return db.execute(
+        select(models.Landlord.id).where(models.Landlord.normalized_key == normalized)
+    ).scalar_one()
+
+
+def resolve_landlord(db: Session, name: str) -> Optional[int]:
+    """Return the id of the landlord `name` refers to, creating it if needed.
+
+    None when the name normalizes to nothing (punctuation only); such names
+    are neither matched nor turned into a landlord.
+    """
+    normalized = normalize_landlord_name(name)
+    if not normalized:
+        return None
+    existing = db.execute(
+        select(models.Landlord.id).where(models.Landlord.normalized_key == normalized)
+    ).scalar_one_or_none()
+    if existing is None:
+        existing = db.execute(
+            select(models.LandlordAlias.landlord_id).where(models.LandlordAlias.normalized_key == normalized)
+        ).scalar_one_or_none()
+    if existing is not None:
+        return existing
+
+    candidates = db.execute(
+        select(models.Landlord.id, models.Landlord.normalized_key)
+        .where(models.Landlord.blocking_key == blocking_key(normalized))
+    ).all()
+    match = _best_match(normalized, candidates)
+    if match is not None:
+        return _record_alias(db, normalized, *match)
+    return _create_landlord(db, name, normalized)
+
+
+def unmerge(db: Session, alias_id: int) -> Tuple[int, int]:
+    """Undo a fuzzy merge: give the alias key its own landlord and move its reviews there.
+
+    Returns (landlord_id, reviews moved). The caller rebuilds landlord stats
+    and commits.
+    """
+    alias = db.get(models.LandlordAlias, alias_id)
+    if alias is None:
+        raise LookupError(f"no landlord alias {alias_id}")
+    merged_into, key = alias.landlord_id, alias.normalized_key
+    reviews = [
+        (review_id, name)
+        for review_id, name in db.execute(
+            select(models.Review.id, models.Review.landlord_name)
+            .where(models.Review.landlord_id == merged_into)
+            .order_by(models.Review.id)
+        )
+        if normalize_landlord_name(name) == key
+    ]
+    db.delete(alias)
+    db.flush()
+
+    landlord_id = _create_landlord(db, reviews[0][1] if reviews else key, key)
+    if reviews:
+        db.execute(
+            update(models.Review)
+            .where(models.Review.id.in_([review_id for review_id, _ in reviews]))
+            .values(landlord_id=landlord_id)
+            .execution_options(synchronize_session=False)
+        )
+    return landlord_id, len(reviews)
+
+
+def cluster_names(names: Iterable[Tuple[str, int]]) -> List[List[str]]:
+    """Group raw landlord names that refer to the same landlord.
+
+    `names` are (name, review_count) pairs; within each cluster the most
+    reviewed spelling comes first and becomes the display name.
+    """
+    by_key: Dict[str, List[Tuple[str, int]]] = {}
+    for name, count in names:
+        by_key.setdefault(normalize_landlord_name(name), []).append((name, count))
+
+    # Merge fuzzy matches within each block, most-reviewed key first
+    blocks: Dict[str, List[str]] = {}
+    for key in sorted(by_key, key=lambda k: -sum(c for _, c in by_key[k])):
+        blocks.setdefault(blocking_key(key), []).append(key)
+
+    clusters: List[List[str]] = []
+    for keys in blocks.values():
+        heads: List[Tuple[str, List[Tuple[str, int]]]] = []
+        for key in keys:
+            target = next((members for head, members in heads if _similarity(key, head) >= FUZZY_MATCH_THRESHOLD), None)
+            if target is None:
+                heads.append((key, list(by_key[key])))
+            else:
+                target.extend(by_key[key])
+        for _, members in heads:
+            members.sort(key=lambda m: -m[1])
+            clusters.append([name for name, _ in members])
+    return clusters
+
+
+def backfill(db: Session) -> int:
+    """Link every review without a landlord; returns the number of reviews linked.
+
+    Distinct names are clustered first, so each cluster costs one landlord
+    lookup and one bulk UPDATE rather than work per review.
+    """
+    names = db.execute(
+        select(models.Review.landlord_name, func.count())
+        .where(models.Review.landlord_id.is_(None))
+        .group_by(models.Review.landlord_name)
+    ).all()
+
+    linked = 0
+    for cluster in cluster_names(names):
+        landlord_id = resolve_landlord(db, cluster[0])
+        if landlord_id is None:
+            # Punctuation-only names stay unlinked
+            continue
+        head = normalize_landlord_name(cluster[0])
+        for key in {normalize_landlord_name(name) for name in cluster[1:]} - {head}:
+            _record_alias(db, key, landlord_id, _similarity(key, head))
+        result = db.execute(
+            update(models.Review)
+            .where(models.Review.landlord_id.is_(None), models.Review.landlord_name.in_(cluster))
+            .values(landlord_id=landlord_id)
+            .execution_options(synchronize_session=False)
+        )
+        linked += result.rowcount
+    return linked
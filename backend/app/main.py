@@ -1,20 +1,26 @@
 import os
 import logging
-import subprocess
-import sys
-from datetime import timedelta
-from typing import List
-
-from fastapi import Depends, FastAPI, HTTPException, Request, status
-from sqlalchemy import text
+import math
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, defer, joinedload
 
-from . import auth, models, schemas
+from . import (
+    auth, autocomplete, database, export, fast_json, geo, geocode_queue, instrumentation, landlord_stats, landlords, map_tiles,
+    models, profiler, response_cache, schemas, search, seeding,
+)
 from .config import get_settings
-from .database import Base, engine, get_db
-from .google_maps import geocode_address
-from .rate_limiter import ensure_can_submit, note_submission
+from .database import Base, SessionLocal, engine, get_db, run_db
+from .pagination import DEFAULT_PAGE_SIZE, clamp_limit, keyset_page
+from .rate_limiter import ensure_can_submit, login_limiter, release_submission, signup_limiter
 
 settings = get_settings()
 Base.metadata.create_all(bind=engine)
@@ -23,7 +29,8 @@ Base.metadata.create_all(bind=engine)
 def _ensure_optional_columns():
     """Ensure optional columns added after initial release exist (SQLite-safe).
 
-    Currently adds `contact_email` to `reviews` if missing.
+    Currently adds `contact_email`, the background geocoding columns and
+    `landlord_id` to `reviews` if missing.
     """
     try:
         with engine.begin() as conn:
@@ -31,6 +38,15 @@ def _ensure_optional_columns():
             cols = [row[1] for row in conn.execute(text("PRAGMA table_info(reviews)"))]
             if "contact_email" not in cols:
                 conn.execute(text("ALTER TABLE reviews ADD COLUMN contact_email VARCHAR(255)"))
+            if "geocode_status" not in cols:
+                # Older rows were geocoded synchronously at submission time
+                conn.execute(text("ALTER TABLE reviews ADD COLUMN geocode_status VARCHAR(16) NOT NULL DEFAULT 'done'"))
+            if "geocode_attempts" not in cols:
+                conn.execute(text("ALTER TABLE reviews ADD COLUMN geocode_attempts INTEGER NOT NULL DEFAULT 0"))
+            if "geocode_next_attempt_at" not in cols:
+                conn.execute(text("ALTER TABLE reviews ADD COLUMN geocode_next_attempt_at DATETIME"))
+            if "landlord_id" not in cols:
+                conn.execute(text("ALTER TABLE reviews ADD COLUMN landlord_id INTEGER REFERENCES landlords(id)"))
     except Exception:
         # Non-fatal; app still runs even if migration failed
         pass
@@ -38,6 +54,98 @@ def _ensure_optional_columns():
 
 _ensure_optional_columns()
 
+
+def _ensure_indexes():
+    """Create indexes added after initial release on existing databases.
+
+    `create_all` only creates indexes together with new tables. Each index is
+    created on its own, so one that cannot be built does not hold back the
+    rest; the unique bookmark index needs duplicate bookmarks removed first
+    with `scripts/dedupe_bookmarks.py`, which is never done at startup.
+    """
+    logger = logging.getLogger("uvicorn.error")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with engine.begin() as conn:
+                    index.create(bind=conn, checkfirst=True)
+            except Exception as exc:
+                # Non-fatal; queries still work without the index, only slower
+                logger.warning("Could not create index %s: %s", index.name, exc)
+
+
+_ensure_indexes()
+
+
+def _ensure_landlords():
+    """Link reviews created before landlord entities existed, then backfill stats."""
+    stats_columns = {col["name"] for col in inspect(engine).get_columns("landlord_stats")}
+    if "landlord_key" in stats_columns:
+        # Stats were first keyed by landlord name; they are derived, so rebuild
+        models.LandlordStats.__table__.drop(bind=engine)
+        models.LandlordStats.__table__.create(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if landlords.backfill(db):
+            landlord_stats.rebuild(db)
+            response_cache.bump(db)
+        elif db.query(models.LandlordStats).first() is None and db.query(models.Review.id).first() is not None:
+            landlord_stats.rebuild(db)
+        db.commit()
+    except Exception:
+        # Non-fatal; run scripts/backfill_landlords.py to backfill manually
+        db.rollback()
+    finally:
+        db.close()
+
+
+_ensure_landlords()
+
+
+def _ensure_search_index():
+    """Create the full-text index over reviews and index existing rows."""
+    try:
+        with engine.begin() as conn:
+            search.ensure_index(conn)
+    except Exception:
+        # Non-fatal; only /reviews/search depends on it
+        pass
+
+
+_ensure_search_index()
+
+
+def _ensure_spatial_index():
+    """Create the spatial index over review coordinates and index existing rows."""
+    try:
+        with engine.begin() as conn:
+            geo.ensure_index(conn)
+    except Exception:
+        # Non-fatal; only /reviews/near and /reviews/within depend on it
+        pass
+
+
+_ensure_spatial_index()
+
+
+def _ensure_map_cells():
+    """Build the map clustering grids if reviews were geocoded before they existed."""
+    db = SessionLocal()
+    try:
+        if map_tiles.is_stale(db):
+            map_tiles.rebuild(db)
+            response_cache.bump(db)
+            db.commit()
+    except Exception:
+        # Non-fatal; run scripts/rebuild_map_tiles.py to build them manually
+        db.rollback()
+    finally:
+        db.close()
+
+
+_ensure_map_cells()
+
 app = FastAPI(title="RateMyLandlord API", version="0.1.0")
 
 # Configure CORS using environment-driven allowed origins
@@ -55,6 +163,11 @@ app.add_middleware(
     ],
     expose_headers=["Content-Type", "Authorization"],
 )
+if settings.request_timing_enabled:
+    # Added last so it is outermost and times CORS handling too
+    app.add_middleware(instrumentation.TimingMiddleware, log_requests=settings.request_log_enabled)
+if settings.admin_token:
+    app.add_middleware(profiler.ProfilerMiddleware)
 
 
 @app.on_event("startup")
@@ -63,23 +176,90 @@ async def _log_cors_origins():
     logger.info("Allowed CORS origins: %s", settings.allowed_cors_origins)
 
 
+def _load_autocomplete():
+    logger = logging.getLogger("uvicorn.error")
+    db = SessionLocal()
+    try:
+        autocomplete.load(db)
+    except Exception:
+        # Non-fatal; suggestions fill in as reviews are submitted
+        logger.exception("Loading autocomplete indexes failed")
+        return
+    finally:
+        db.close()
+
+    sizes = autocomplete.stats()
+    total_mb = sum(index["memory_bytes"] for index in sizes.values()) / 2**20
+    logger.info("Autocomplete indexes loaded: %s (%.1f MiB)", sizes, total_mb)
+    if total_mb > settings.autocomplete_memory_budget_mb:
+        logger.warning(
+            "Autocomplete indexes use %.1f MiB, over the %d MiB budget",
+            total_mb, settings.autocomplete_memory_budget_mb,
+        )
+
+
+@app.on_event("startup")
+async def _start_autocomplete():
+    await run_in_threadpool(_load_autocomplete)
+
+
+@app.on_event("startup")
+async def _start_geocode_workers():
+    geocode_queue.start_workers()
+
+
+@app.on_event("shutdown")
+async def _stop_geocode_workers():
+    geocode_queue.stop_workers()
+
+
 @app.get("/health")
-def health():
+async def health():
     return {"ok": True}
 
 
-@app.post("/signup", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def signup(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """This process's latency histograms and cache statistics in Prometheus text format."""
+    if settings.metrics_token:
+        supplied = request.headers.get("authorization", "")
+        if not secrets.compare_digest(supplied.encode(), f"Bearer {settings.metrics_token}".encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-    hashed_password = auth.get_password_hash(user_in.password)
-    user = models.User(email=user_in.email, hashed_password=hashed_password)
+
+def _email_registered(db: Session, email: str) -> bool:
+    return db.query(models.User.id).filter(models.User.email == email).first() is not None
+
+
+def _create_user(db: Session, email: str, hashed_password: str) -> schemas.UserOut:
+    user = models.User(email=email, hashed_password=hashed_password)
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     db.refresh(user)
-    return user
+    return schemas.UserOut.model_validate(user)
+
+
+def _client_address(request: Request) -> str:
+    # Behind a proxy this is the right-most X-Forwarded-For entry outside
+    # FORWARDED_ALLOW_IPS, set by uvicorn's --proxy-headers (see the Procfile)
+    return request.client.host if request.client else "unknown"
+
+
+@app.post("/signup", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
+async def signup(user_in: schemas.UserCreate, request: Request, db: Session = Depends(get_db)):
+    await signup_limiter.hit(_client_address(request))
+
+    # Checked before hashing so duplicate sign-ups do not spend bcrypt time
+    if await run_db(db, _email_registered, user_in.email):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+
+    hashed_password = await auth.hash_password(user_in.password)
+    return await run_db(db, _create_user, user_in.email, hashed_password)
 
 
 @app.post("/login", response_model=schemas.Token)
@@ -89,6 +269,8 @@ async def login(request: Request, db: Session = Depends(get_db)):
     - Form: fields `username` (email) and `password` (OAuth2 style)
     - JSON: fields `email` (or `username`) and `password`
     """
+    await login_limiter.hit(_client_address(request))
+
     email = None
     password = None
 
@@ -122,7 +304,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
     if not email or not password:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Missing email/username or password")
 
-    user = auth.authenticate_user(db=db, email=email, password=password)
+    user = await auth.authenticate_user(db=db, email=email, password=password)
     if not user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect email or password")
 
@@ -142,21 +324,28 @@ def _clamp_rating(value):
         return None
 
 
-def _serialize_review(review: models.Review, current_user: models.User = None, db: Session = None) -> schemas.ReviewOut:
-    author_email = None if review.is_anonymous else (review.author.email if review.author else None)
-    
-    # Check if user has bookmarked this review
-    is_bookmarked = False
-    if current_user and db:
-        bookmark = db.query(models.Bookmark).filter(
+def _bookmarked_review_ids(db: Session, current_user: models.User, review_ids: List[int]) -> Set[int]:
+    """Return the subset of `review_ids` bookmarked by `current_user` in a single query."""
+    if not current_user or not review_ids:
+        return set()
+    rows = (
+        db.query(models.Bookmark.review_id)
+        .filter(
             models.Bookmark.user_id == current_user.id,
-            models.Bookmark.review_id == review.id
-        ).first()
-        is_bookmarked = bookmark is not None
-    
+            models.Bookmark.review_id.in_(review_ids),
+        )
+        .all()
+    )
+    return {review_id for (review_id,) in rows}
+
+
+def _serialize_review(review: models.Review, is_bookmarked: bool = False) -> schemas.ReviewOut:
+    author_email = None if review.is_anonymous else (review.author.email if review.author else None)
+
     return schemas.ReviewOut(
         id=review.id,
         landlord_name=review.landlord_name,
+        landlord_id=review.landlord_id,
         overall_rating=_clamp_rating(review.overall_rating),
         maintenance_rating=_clamp_rating(review.maintenance_rating),
         communication_rating=_clamp_rating(review.communication_rating),
@@ -172,47 +361,211 @@ def _serialize_review(review: models.Review, current_user: models.User = None, d
         formatted_address=review.formatted_address,
         latitude=review.latitude,
         longitude=review.longitude,
+        geocode_status=review.geocode_status,
         created_at=review.created_at,
         author_email=author_email,
         is_bookmarked=is_bookmarked,
     )
 
 
-@app.get("/reviews", response_model=List[schemas.ReviewOut])
-def list_reviews(
-    limit: int = 20,
+def _serialize_reviews(
+    reviews: List[models.Review], current_user: Optional[models.User] = None, db: Optional[Session] = None
+) -> List[schemas.ReviewOut]:
+    """Serialize a page of reviews with one bookmark lookup for the whole page.
+
+    Callers should load `Review.author` eagerly (see `_reviews_query`) so that
+    serialization itself never issues per-row queries.
+    """
+    bookmarked = _bookmarked_review_ids(db, current_user, [r.id for r in reviews]) if db else set()
+    return [_serialize_review(review, review.id in bookmarked) for review in reviews]
+
+
+def _reviews_query(db: Session):
+    # contact_email is never returned, so it is not loaded
+    return db.query(models.Review).options(joinedload(models.Review.author), defer(models.Review.contact_email))
+
+
+def _review_rows(db: Session, fields: Tuple[str, ...] = fast_json.FULL):
+    """Column query for list pages: only the columns `fields` needs, no ORM objects."""
+    query = db.query(*fast_json.review_columns(fields=fields))
+    if "author_email" in fields:
+        query = query.outerjoin(models.User, models.User.id == models.Review.user_id)
+    return query
+
+
+def _review_documents(
+    db: Session, rows, current_user: Optional[models.User], fields: Tuple[str, ...] = fast_json.FULL
+) -> List[dict]:
+    if "is_bookmarked" in fields:
+        bookmarked = _bookmarked_review_ids(db, current_user, [row.id for row in rows])
+    else:
+        bookmarked = set()
+    return [fast_json.review_document(row, is_bookmarked=row.id in bookmarked, fields=fields) for row in rows]
+
+
+def _list_reviews(
+    db: Session,
+    limit: int,
+    cursor: Optional[str],
+    current_user: Optional[models.User],
+    fields: Tuple[str, ...] = fast_json.FULL,
+) -> dict:
+    """One `ReviewPage`-shaped page, built without per-row models (see fast_json)."""
+    rows, next_cursor = keyset_page(_review_rows(db, fields), models.Review.created_at, models.Review.id, limit, cursor)
+    return {"items": _review_documents(db, rows, current_user, fields), "next_cursor": next_cursor}
+
+
+def _cached_review_page(
+    db: Session,
+    limit: int,
+    cursor: Optional[str],
+    current_user: Optional[models.User],
+    fields: Tuple[str, ...] = fast_json.FULL,
+) -> Tuple[bytes, str]:
+    """Body and ETag of a `/reviews` page, rendered at most once per content version.
+
+    The cached page is the anonymous one; signed-in users get it with their
+    own bookmarks overlaid, which costs one bookmark query.
+    """
+    version = response_cache.current_version(db)
+    key = ("reviews", limit, cursor, fields)
+    cached = response_cache.get(key, version)
+    if cached is None:
+        page = _list_reviews(db, limit, cursor, None, fields)
+        cached = response_cache.put(key, version, page, fast_json.dumps(page))
+    if current_user is None or "is_bookmarked" not in fields:
+        return cached.body, cached.etag
+
+    page = cached.payload
+    bookmarked = _bookmarked_review_ids(db, current_user, [item["id"] for item in page["items"]])
+    if not bookmarked:
+        return cached.body, cached.etag
+    body = fast_json.dumps({
+        "items": [dict(item, is_bookmarked=True) if item["id"] in bookmarked else item for item in page["items"]],
+        "next_cursor": page["next_cursor"],
+    })
+    return body, response_cache.make_etag(body)
+
+
+@app.get("/reviews", response_model=Union[schemas.ReviewPage, schemas.ReviewSummaryPage, schemas.ReviewMapPage])
+async def list_reviews(
+    request: Request,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user_optional),
 ):
-    limit = max(1, min(limit, 100))
-    reviews = (
-        db.query(models.Review)
-        .order_by(models.Review.created_at.desc())
-        .limit(limit)
-        .all()
+    """Newest reviews first. `view` (`full`, `summary` or `map`) or a comma-separated
+    `fields` list selects the fields returned; only their columns are read."""
+    selected = fast_json.parse_fields(view, fields)
+    body, etag = await run_db(db, _cached_review_page, clamp_limit(limit), cursor, current_user, selected)
+    return response_cache.respond(request, body, etag, public=current_user is None)
+
+
+def _reviews_by_id(db: Session, review_ids: List[int], current_user: Optional[models.User]) -> Dict[int, schemas.ReviewOut]:
+    """Serialize the given reviews, keyed by id; ids deleted meanwhile are absent."""
+    reviews = _reviews_query(db).filter(models.Review.id.in_(review_ids)).all() if review_ids else []
+    return {review.id: review for review in _serialize_reviews(reviews, current_user, db)}
+
+
+def _search_reviews(
+    db: Session, q: str, limit: int, cursor: Optional[str], current_user: Optional[models.User]
+) -> schemas.ReviewSearchPage:
+    hits, next_cursor = search.search(db, q, limit, cursor)
+    by_id = _reviews_by_id(db, [review_id for review_id, _, _ in hits], current_user)
+    return schemas.ReviewSearchPage(
+        items=[
+            schemas.ReviewSearchHit(review=by_id[review_id], relevance=relevance, snippet=snippet)
+            for review_id, relevance, snippet in hits
+            if review_id in by_id
+        ],
+        next_cursor=next_cursor,
     )
-    return [_serialize_review(review, current_user, db) for review in reviews]
 
 
-@app.post("/reviews", response_model=schemas.ReviewOut, status_code=status.HTTP_201_CREATED)
-def submit_review(
-    review_in: schemas.ReviewCreate,
-    current_user: models.User = Depends(auth.get_current_user),
+@app.get("/reviews/search", response_model=schemas.ReviewSearchPage)
+async def search_reviews(
+    q: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user_optional),
+):
+    """Reviews matching every word of `q` in the text, landlord name or address, best match first."""
+    return await run_db(db, _search_reviews, q, clamp_limit(limit), cursor, current_user)
+
+
+def _geo_page(db: Session, hits, next_cursor: Optional[str], current_user: Optional[models.User]) -> schemas.ReviewGeoPage:
+    by_id = _reviews_by_id(db, [review_id for review_id, _ in hits], current_user)
+    return schemas.ReviewGeoPage(
+        items=[
+            schemas.ReviewGeoHit(review=by_id[review_id], distance_m=round(distance, 1))
+            for review_id, distance in hits
+            if review_id in by_id
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+def _reviews_near(
+    db: Session, lat: float, lng: float, radius_m: float, limit: int, cursor: Optional[str],
+    current_user: Optional[models.User],
+) -> schemas.ReviewGeoPage:
+    hits, next_cursor = geo.near(db, lat, lng, radius_m, limit, cursor)
+    return _geo_page(db, hits, next_cursor, current_user)
+
+
+@app.get("/reviews/near", response_model=schemas.ReviewGeoPage)
+async def reviews_near(
+    lat: float,
+    lng: float,
+    radius_m: float = 1000,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user_optional),
 ):
-    ensure_can_submit(current_user.id)
+    """Geocoded reviews within `radius_m` meters of (`lat`, `lng`), nearest first."""
+    return await run_db(db, _reviews_near, lat, lng, radius_m, clamp_limit(limit), cursor, current_user)
 
-    location_data = None
-    if review_in.property_address:
-        location_data = geocode_address(review_in.property_address)
 
+def _reviews_within(
+    db: Session, bbox: geo.BBox, limit: int, cursor: Optional[str], current_user: Optional[models.User]
+) -> schemas.ReviewGeoPage:
+    hits, next_cursor = geo.within(db, bbox, limit, cursor)
+    return _geo_page(db, hits, next_cursor, current_user)
+
+
+@app.get("/reviews/within", response_model=schemas.ReviewGeoPage)
+async def reviews_within(
+    bbox: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user_optional),
+):
+    """Geocoded reviews inside `bbox` (`min_lng,min_lat,max_lng,max_lat`), nearest to its centre first."""
+    return await run_db(db, _reviews_within, geo.parse_bbox(bbox), clamp_limit(limit), cursor, current_user)
+
+
+def _submit_review(db: Session, review_in: schemas.ReviewCreate, current_user: models.User) -> schemas.ReviewOut:
+    landlord_id = landlords.resolve_landlord(db, review_in.landlord_name)
+    if landlord_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Landlord name must contain letters or digits")
+
+    # Geocoding happens in the background (see geocode_queue) so submission
+    # latency does not depend on the upstream API. Without a geocoder the
+    # address is stored as given and not queued.
+    queued = bool(review_in.property_address) and geocode_queue.enabled()
     review = models.Review(
         user_id=current_user.id,
         landlord_name=review_in.landlord_name,
+        landlord_id=landlord_id,
         property_address=review_in.property_address,
-        formatted_address=location_data.get("formatted_address") if location_data else None,
-        latitude=location_data.get("latitude") if location_data else None,
-        longitude=location_data.get("longitude") if location_data else None,
+        geocode_status="pending" if queued else "none",
+        geocode_next_attempt_at=datetime.utcnow() if queued else None,
         overall_rating=_clamp_rating(review_in.overall_rating),
         maintenance_rating=_clamp_rating(review_in.maintenance_rating),
         communication_rating=_clamp_rating(review_in.communication_rating),
@@ -229,55 +582,95 @@ def submit_review(
 
     db.add(review)
     try:
+        # Aggregates are updated in the same transaction as the review itself
+        landlord_stats.apply_review(db, review)
+        response_cache.bump(db)
         db.commit()
     except Exception:
         db.rollback()
         raise
     db.refresh(review)
+    autocomplete.record_landlord(review.landlord_id, review.landlord_name)
 
-    note_submission(current_user.id)
-
-    return _serialize_review(review, current_user, db)
+    # A freshly created review cannot be bookmarked yet, and its author is the
+    # current user already held in this session's identity map.
+    return _serialize_review(review)
 
 
-# Bookmark endpoints
-@app.post("/bookmarks", response_model=schemas.BookmarkOut, status_code=status.HTTP_201_CREATED)
-def create_bookmark(
-    bookmark_in: schemas.BookmarkCreate,
+@app.post("/reviews", response_model=schemas.ReviewOut, status_code=status.HTTP_201_CREATED)
+async def submit_review(
+    review_in: schemas.ReviewCreate,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
+    await ensure_can_submit(current_user.id)
+
+    try:
+        review_out = await run_db(db, _submit_review, review_in, current_user)
+    except Exception:
+        # A submission that was not saved does not count against the limit
+        await release_submission(current_user.id)
+        raise
+
+    if review_out.geocode_status == "pending":
+        geocode_queue.notify()
+
+    return review_out
+
+
+@app.get("/autocomplete", response_model=List[schemas.Suggestion])
+async def autocomplete_suggestions(q: str, kind: Optional[str] = None, limit: int = 10):
+    """Landlord names and addresses starting with `q`, most reviewed first.
+
+    `kind` restricts suggestions to "landlord" or "address". Served from
+    memory without touching the database.
+    """
+    if kind not in (None, "landlord", "address"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="kind must be 'landlord' or 'address'")
+    return [
+        schemas.Suggestion(
+            kind=entry_kind,
+            text=entry.text,
+            review_count=entry.count,
+            landlord_id=entry.ref if entry_kind == "landlord" else None,
+        )
+        for entry_kind, entry in autocomplete.suggest(q, kind, limit)
+    ]
+
+
+# Bookmark endpoints
+def _create_bookmark(db: Session, bookmark_in: schemas.BookmarkCreate, current_user: models.User) -> schemas.BookmarkOut:
     # Check if review exists
     review = db.query(models.Review).filter(models.Review.id == bookmark_in.review_id).first()
     if not review:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
     
-    # Check if bookmark already exists
-    existing = db.query(models.Bookmark).filter(
-        models.Bookmark.user_id == current_user.id,
-        models.Bookmark.review_id == bookmark_in.review_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Review already bookmarked")
-    
-    # Create bookmark
+    # The unique (user_id, review_id) index rejects duplicates atomically
     bookmark = models.Bookmark(
         user_id=current_user.id,
         review_id=bookmark_in.review_id
     )
     db.add(bookmark)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Review already bookmarked")
     db.refresh(bookmark)
     
-    return bookmark
+    return schemas.BookmarkOut.model_validate(bookmark)
 
 
-@app.delete("/bookmarks/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_bookmark(
-    review_id: int,
+@app.post("/bookmarks", response_model=schemas.BookmarkOut, status_code=status.HTTP_201_CREATED)
+async def create_bookmark(
+    bookmark_in: schemas.BookmarkCreate,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
+    return await run_db(db, _create_bookmark, bookmark_in, current_user)
+
+
+def _remove_bookmark(db: Session, review_id: int, current_user: models.User) -> None:
     bookmark = db.query(models.Bookmark).filter(
         models.Bookmark.user_id == current_user.id,
         models.Bookmark.review_id == review_id
@@ -290,93 +683,252 @@ def remove_bookmark(
     db.commit()
 
 
-@app.get("/bookmarks", response_model=List[schemas.BookmarkOut])
-def list_bookmarks(
+@app.delete("/bookmarks/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_bookmark(
+    review_id: int,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
-    bookmarks = (
-        db.query(models.Bookmark)
+    await run_db(db, _remove_bookmark, review_id, current_user)
+
+
+def _list_bookmarks(db: Session, limit: int, cursor: Optional[str], current_user: models.User) -> dict:
+    """One `BookmarkPage`-shaped page, built without per-row models (see fast_json)."""
+    query = (
+        db.query(
+            models.Bookmark.review_id,
+            models.Bookmark.id,
+            models.Bookmark.user_id,
+            models.Bookmark.created_at,
+            *fast_json.review_columns(prefix="review_"),
+        )
+        .join(models.Review, models.Review.id == models.Bookmark.review_id)
+        .outerjoin(models.User, models.User.id == models.Review.user_id)
         .filter(models.Bookmark.user_id == current_user.id)
-        .join(models.Review)
-        .order_by(models.Bookmark.created_at.desc())
-        .all()
     )
-    return bookmarks
+    rows, next_cursor = keyset_page(query, models.Bookmark.created_at, models.Bookmark.id, limit, cursor)
+    items = [
+        {
+            "review_id": row.review_id,
+            "id": row.id,
+            "user_id": row.user_id,
+            "created_at": row.created_at.isoformat(),
+            "review": fast_json.review_document(row, prefix="review_", is_bookmarked=True),
+        }
+        for row in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
-@app.get("/my-reviews", response_model=List[schemas.ReviewOut])
-def list_my_reviews(
+@app.get("/bookmarks", response_model=schemas.BookmarkPage)
+async def list_bookmarks(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
-    reviews = (
-        db.query(models.Review)
-        .filter(models.Review.user_id == current_user.id)
-        .order_by(models.Review.created_at.desc())
-        .all()
+    page = await run_db(db, _list_bookmarks, clamp_limit(limit), cursor, current_user)
+    return Response(content=fast_json.dumps(page), media_type="application/json")
+
+
+def _list_my_reviews(
+    db: Session, limit: int, cursor: Optional[str], current_user: models.User, fields: Tuple[str, ...]
+) -> dict:
+    query = _review_rows(db, fields).filter(models.Review.user_id == current_user.id)
+    rows, next_cursor = keyset_page(query, models.Review.created_at, models.Review.id, limit, cursor)
+    return {"items": _review_documents(db, rows, current_user, fields), "next_cursor": next_cursor}
+
+
+@app.get("/my-reviews", response_model=Union[schemas.ReviewPage, schemas.ReviewSummaryPage, schemas.ReviewMapPage])
+async def list_my_reviews(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """The current user's reviews, newest first; `view` and `fields` work as on `/reviews`."""
+    selected = fast_json.parse_fields(view, fields)
+    page = await run_db(db, _list_my_reviews, clamp_limit(limit), cursor, current_user, selected)
+    return Response(content=fast_json.dumps(page), media_type="application/json")
+
+
+def _get_landlord_stats(db: Session, landlord_id: int) -> schemas.LandlordStatsOut:
+    row = (
+        db.query(models.LandlordStats, models.Landlord)
+        .join(models.Landlord, models.Landlord.id == models.LandlordStats.landlord_id)
+        .filter(models.LandlordStats.landlord_id == landlord_id)
+        .first()
     )
-    return [_serialize_review(review, current_user, db) for review in reviews]
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Landlord not found")
+    return landlord_stats.to_schema(*row)
+
+
+@app.get("/landlords/{landlord_id}/stats", response_model=schemas.LandlordStatsOut)
+async def get_landlord_stats(landlord_id: int, db: Session = Depends(get_db)):
+    return await run_db(db, _get_landlord_stats, landlord_id)
+
+
+def _cached_map_tile(db: Session, z: int, x: int, y: int) -> Tuple[bytes, str]:
+    version = response_cache.current_version(db)
+    key = ("tile", z, x, y)
+    cached = response_cache.get(key, version)
+    if cached is None:
+        tile = schemas.MapTile(z=z, x=x, y=y, fields=map_tiles.CLUSTER_FIELDS, clusters=map_tiles.tile(db, z, x, y))
+        cached = response_cache.put(key, version, tile, tile.model_dump_json().encode())
+    return cached.body, cached.etag
 
 
-@app.post("/seed-database")
-def seed_database(
-    force: bool = False,
+@app.get("/map/tiles/{z}/{x}/{y}", response_model=schemas.MapTile)
+async def get_map_tile(z: int, x: int, y: int, request: Request, db: Session = Depends(get_db)):
+    """Review clusters in web-mercator tile (`z`, `x`, `y`), as packed rows described by `fields`."""
+    if not (0 <= z <= map_tiles.MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found")
+    body, etag = await run_db(db, _cached_map_tile, z, x, y)
+    return response_cache.respond(request, body, etag, public=True)
+
+
+@app.get("/export/reviews", response_class=StreamingResponse)
+async def export_reviews(
+    request: Request,
+    format: str = "ndjson",
+    since: Optional[datetime] = None,
+    current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
+    """Stream every review created after `since` (all of them by default), oldest first.
+
+    `X-Export-Watermark` holds the `since` to pass for the next incremental
+    pull; reviews from the last `EXPORT_SAFETY_LAG_SECONDS` are left to that
+    pull (see `export`). The body is gzip-compressed when the client accepts it.
     """
-    Endpoint to trigger the seed script programmatically.
-    Available for development and testing purposes.
+    export.check_format(format)
+    since = export.normalize_since(since)
+    until = await run_db(db, export.watermark)
+    if until is not None and since is not None and until <= since:
+        until = None
+    next_since = until or since
+
+    headers = {"Content-Disposition": f'attachment; filename="reviews.{format}"', "Vary": "Accept-Encoding"}
+    if next_since is not None:
+        headers["X-Export-Watermark"] = next_since.isoformat()
+    body = export.stream(format, since, until)
+    if export.accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        body = export.gzipped(body)
+    return StreamingResponse(body, media_type=export.FORMATS[format], headers=headers)
+
+
+def _seed_job_out(job: seeding.SeedJob) -> schemas.SeedJobOut:
+    return schemas.SeedJobOut(
+        job_id=job.id,
+        status=job.status,
+        force=job.force,
+        target_reviews=job.target,
+        inserted=job.inserted,
+        total=job.total,
+        deleted=job.deleted,
+        message=job.message,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@app.post(
+    "/seed-database",
+    response_model=schemas.SeedJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(auth.require_admin_unless_dev)],
+)
+async def seed_database(force: bool = False, seed_in: Optional[schemas.SeedRequest] = None):
     """
-    try:
-        # Get the path to the seed script
-        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        script_path = os.path.join(script_dir, "scripts", "seed_reviews.py")
-        
-        if not os.path.exists(script_path):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Seed script not found"
-            )
-        
-        # Build command to run the script
-        cmd = [sys.executable, script_path]
-        if force:
-            cmd.append("--force")
-        
-        # Run the script
-        result = subprocess.run(
-            cmd,
-            cwd=script_dir,
-            capture_output=True,
-            text=True,
-            timeout=60  # 60 second timeout
-        )
-        
-        if result.returncode != 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Seed script failed: {result.stderr}"
-            )
-        
-        return {
-            "success": True,
-            "message": "Database seeded successfully",
-            "output": result.stdout.strip(),
-            "force_mode": force
-        }
-        
-    except subprocess.TimeoutExpired:
+    Start seeding sample reviews in the background and return the job to poll.
+    Available for development and testing purposes: open in dev environments,
+    and needing the `X-Admin-Token` header anywhere else.
+
+    `force` (query or JSON body) replaces existing sample reviews; `reviews`
+    sets how many there should be.
+
+    Jobs live in the memory of the process that started them: one job runs at
+    a time per process (409 otherwise), and with several workers the poll
+    must reach the same worker. Separate workers can each run a job.
+    """
+    seed_in = seed_in or schemas.SeedRequest()
+    job = seeding.start_job(force=force or seed_in.force, target=seed_in.reviews)
+    if job is None:
+        running = seeding.running_job()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Seed script timed out"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Seed job {running.id} is already running" if running else "A seed job is already running",
         )
-    except Exception as e:
+    return _seed_job_out(job)
+
+
+@app.get(
+    "/seed-database/{job_id}",
+    response_model=schemas.SeedJobOut,
+    dependencies=[Depends(auth.require_admin_unless_dev)],
+)
+async def get_seed_job(job_id: str):
+    """Progress of a seed job started by this process."""
+    job = seeding.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seed job not found")
+    return _seed_job_out(job)
+
+
+def _profile_out(profile: profiler.Profile) -> schemas.ProfileOut:
+    return schemas.ProfileOut(
+        profile_id=profile.id,
+        kind=profile.kind,
+        label=profile.label,
+        status=profile.status,
+        sample_count=profile.sample_count,
+        created_at=profile.created_at,
+        finished_at=profile.finished_at,
+    )
+
+
+@app.post(
+    "/admin/profiler",
+    response_model=schemas.ProfileOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(auth.require_admin)],
+)
+async def start_profiler(seconds: float = 30):
+    """Sample every thread of this process for `seconds` (capped by PROFILER_MAX_SECONDS)."""
+    # NaN passes a `<= 0` check and would never expire, blocking later profiles
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="seconds must be a positive number")
+    profile = profiler.start(seconds)
+    if profile is None:
+        running = profiler.running_global()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to run seed script: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Profile {running.id} is already running" if running else "A profile is already running",
         )
+    return _profile_out(profile)
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(auth.require_admin)])
+async def get_profile(profile_id: str):
+    """Collapsed stacks of a profile taken by this process, so far if it is still running."""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"X-Profile-Status": profile.status, "X-Profile-Samples": str(profile.sample_count)},
+    )
+
 
+@app.get("/admin/slow-queries", response_model=List[schemas.SlowQueryOut], dependencies=[Depends(auth.require_admin)])
+async def slow_queries():
+    """Statements slower than SLOW_QUERY_MS seen by this process, newest first."""
+    return [schemas.SlowQueryOut(**entry) for entry in reversed(list(database.slow_queries))]
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,153 @@
+"""Clustered map tiles built from review coordinates.
+
+Every geocoded review is counted in one `map_cells` row per clustering
+level: the web-mercator tile containing it at zoom `level`. A map tile at
+zoom `z` is drawn from the cells at level `z + CELL_BITS` inside it, so it
+carries at most an 8x8 grid of clusters, each with its review count, the
+centroid of its reviews and their mean `overall_rating`.
+
+`apply_location` adds a review to all of its cells with one additive upsert
+per level, in the same transaction that stores its coordinates, so the grids
+never need recomputing; `remove_location` subtracts one the same way. Past
+the deepest level a tile shows the clusters whose centroid falls inside it.
+"""
+
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import dialect_insert
+
+Cell = models.MapCell
+
+# Each tile holds a 2^CELL_BITS x 2^CELL_BITS grid of clusters
+CELL_BITS = 3
+MAX_ZOOM = 22
+# Deepest grid kept; its cells are about 75 m across at the equator
+MAX_LEVEL = 19
+LEVELS = range(CELL_BITS, MAX_LEVEL + 1)
+MAX_LATITUDE = 85.05112878
+
+CLUSTER_FIELDS = ["latitude", "longitude", "count", "mean_overall_rating"]
+
+
+def _world_position(lat: float, lng: float) -> Tuple[float, float]:
+    """Web-mercator position in [0, 1) x [0, 1), origin at the top left."""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lng + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1 - 1e-12), min(max(y, 0.0), 1 - 1e-12)
+
+
+def cells_for(lat: float, lng: float) -> List[Tuple[int, int, int]]:
+    """`(level, cell_x, cell_y)` of every cell containing the point."""
+    x, y = _world_position(lat, lng)
+    return [(level, int(x * (1 << level)), int(y * (1 << level))) for level in LEVELS]
+
+
+def apply_location(db: Session, lat: float, lng: float, overall_rating: float, weight: int = 1) -> None:
+    """Add one review at (`lat`, `lng`) to every grid; the caller commits.
+
+    A `weight` of -1 takes it back out, so moving a review is a
+    `remove_location` of the old point and an `apply_location` of the new.
+    """
+    table = Cell.__table__
+    insert = dialect_insert(db)
+    for level, cell_x, cell_y in cells_for(lat, lng):
+        stmt = insert(table).values(
+            level=level, cell_x=cell_x, cell_y=cell_y, review_count=weight,
+            latitude_sum=weight * lat, longitude_sum=weight * lng, overall_sum=weight * (overall_rating or 0.0),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.level, table.c.cell_x, table.c.cell_y],
+            set_={
+                name: table.c[name] + stmt.excluded[name]
+                for name in ("review_count", "latitude_sum", "longitude_sum", "overall_sum")
+            },
+        ))
+
+
+def remove_location(db: Session, lat: float, lng: float, overall_rating: float) -> None:
+    """Take one review at (`lat`, `lng`) out of every grid; the caller commits."""
+    apply_location(db, lat, lng, overall_rating, weight=-1)
+
+
+def tile(db: Session, z: int, x: int, y: int) -> List[Tuple[float, float, int, float]]:
+    """Clusters of tile (`z`, `x`, `y`) as `[latitude, longitude, count, mean rating]` rows."""
+    level = min(z + CELL_BITS, MAX_LEVEL)
+    shift = level - z
+    if shift >= 0:
+        x_range = (x << shift, ((x + 1) << shift) - 1)
+        y_range = (y << shift, ((y + 1) << shift) - 1)
+    else:
+        # The tile lies inside a single cell
+        x_range = (x >> -shift,) * 2
+        y_range = (y >> -shift,) * 2
+
+    rows = db.execute(
+        select(Cell.review_count, Cell.latitude_sum, Cell.longitude_sum, Cell.overall_sum)
+        .where(
+            Cell.level == level,
+            Cell.cell_x.between(*x_range),
+            Cell.cell_y.between(*y_range),
+            Cell.review_count > 0,
+        )
+    ).all()
+
+    scale = 1 << z
+    clusters = []
+    for count, lat_sum, lng_sum, overall_sum in rows:
+        lat, lng = lat_sum / count, lng_sum / count
+        if shift < 0:
+            # Show a cluster only in the tile holding its centroid
+            px, py = _world_position(lat, lng)
+            if int(px * scale) != x or int(py * scale) != y:
+                continue
+        clusters.append((round(lat, 6), round(lng, 6), count, round(overall_sum / count, 2)))
+    return clusters
+
+
+def aggregate(points: Iterable[Tuple[float, float, float]]) -> Dict[Tuple[int, int, int], List[float]]:
+    """Fold `(lat, lng, overall_rating)` points into cell sums."""
+    cells: Dict[Tuple[int, int, int], List[float]] = {}
+    for lat, lng, rating in points:
+        for key in cells_for(lat, lng):
+            sums = cells.get(key)
+            if sums is None:
+                sums = cells[key] = [0, 0.0, 0.0, 0.0]
+            sums[0] += 1
+            sums[1] += lat
+            sums[2] += lng
+            sums[3] += rating or 0.0
+    return cells
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """Recompute every grid from `reviews`; returns the number of cells. The caller commits."""
+    points = db.execute(
+        select(models.Review.latitude, models.Review.longitude, models.Review.overall_rating)
+        .where(models.Review.latitude.is_not(None), models.Review.longitude.is_not(None))
+        .execution_options(yield_per=batch_size)
+    )
+    cells = aggregate(points)
+
+    db.query(Cell).delete(synchronize_session=False)
+    rows = [
+        {"level": level, "cell_x": cx, "cell_y": cy, "review_count": count,
+         "latitude_sum": lat_sum, "longitude_sum": lng_sum, "overall_sum": overall_sum}
+        for (level, cx, cy), (count, lat_sum, lng_sum, overall_sum) in cells.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.execute(Cell.__table__.insert(), rows[start:start + batch_size])
+    return len(rows)
+
+
+def is_stale(db: Session) -> bool:
+    """True when no cells exist although some reviews have coordinates."""
+    if db.query(Cell.level).first() is not None:
+        return False
+    return db.query(models.Review.id).filter(models.Review.latitude.is_not(None)).first() is not None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, String, Text, CheckConstraint
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, CheckConstraint
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -25,16 +25,31 @@ class Review(Base):
         CheckConstraint("communication_rating IS NULL OR (communication_rating >= 0 AND communication_rating <= 5)", name="ck_reviews_communication_rating_range"),
         CheckConstraint("respect_rating IS NULL OR (respect_rating >= 0 AND respect_rating <= 5)", name="ck_reviews_respect_rating_range"),
         CheckConstraint("rent_value_rating IS NULL OR (rent_value_rating >= 0 AND rent_value_rating <= 5)", name="ck_reviews_rent_value_rating_range"),
+        # Recent feed: ORDER BY created_at DESC, id DESC with keyset pagination
+        Index("ix_reviews_created_at_id", "created_at", "id"),
+        # My reviews: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_reviews_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Reviews for one landlord, newest first
+        Index("ix_reviews_landlord_id_created_at_id", "landlord_id", "created_at", "id"),
+        # Geocoding queue: WHERE geocode_status = 'pending' AND geocode_next_attempt_at <= ?
+        Index("ix_reviews_geocode_status_next_attempt", "geocode_status", "geocode_next_attempt_at"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     landlord_name = Column(String(255), nullable=False)
+    # Canonical landlord entity; NULL only for rows not yet backfilled
+    landlord_id = Column(Integer, ForeignKey("landlords.id"))
     property_address = Column(String(512))
     formatted_address = Column(String(512))
     latitude = Column(Float)
     longitude = Column(Float)
+    # Background geocoding state: "none" (no address, or no geocoder configured),
+    # "pending", "done" or "failed"
+    geocode_status = Column(String(16), default="none", nullable=False)
+    geocode_attempts = Column(Integer, default=0, nullable=False)
+    geocode_next_attempt_at = Column(DateTime)
 
     overall_rating = Column(Float, nullable=False)
     maintenance_rating = Column(Float)
@@ -58,11 +73,46 @@ class Review(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     author = relationship("User", back_populates="reviews")
+    landlord = relationship("Landlord", back_populates="reviews")
     bookmarks = relationship("Bookmark", back_populates="review", cascade="all,delete-orphan")
 
 
+class Landlord(Base):
+    __tablename__ = "landlords"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Display name, taken from the first review that mentioned this landlord
+    name = Column(String(255), nullable=False)
+    # Canonical form (see landlords.normalize_landlord_name); one row per key
+    normalized_key = Column(String(255), unique=True, index=True, nullable=False)
+    # Coarse prefix used to find fuzzy-match candidates without a full scan
+    blocking_key = Column(String(16), index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    reviews = relationship("Review", back_populates="landlord")
+
+
+class LandlordAlias(Base):
+    """A name key merged into a landlord by fuzzy matching (see landlords.unmerge)."""
+
+    __tablename__ = "landlord_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_key = Column(String(255), unique=True, index=True, nullable=False)
+    landlord_id = Column(Integer, ForeignKey("landlords.id"), index=True, nullable=False)
+    # Name similarity that justified the merge
+    similarity = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class Bookmark(Base):
     __tablename__ = "bookmarks"
+    __table_args__ = (
+        # One bookmark per (user, review); also serves the is_bookmarked lookup
+        Index("uq_bookmarks_user_id_review_id", "user_id", "review_id", unique=True),
+        # Saved reviews list: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_bookmarks_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -71,3 +121,91 @@ class Bookmark(Base):
 
     user = relationship("User", back_populates="bookmarks")
     review = relationship("Review", back_populates="bookmarks")
+
+
+class GeocodeCacheEntry(Base):
+    __tablename__ = "geocode_cache"
+    __table_args__ = (
+        Index("ix_geocode_cache_last_used_at", "last_used_at"),
+    )
+
+    # Normalized address (see google_maps.normalize_address)
+    address_key = Column(String(512), primary_key=True)
+    # False when the upstream API had no result, so misses are not retried every time
+    found = Column(Boolean, default=True, nullable=False)
+    formatted_address = Column(String(512))
+    latitude = Column(Float)
+    longitude = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # "<limiter>:<subject>", e.g. "rl:reviews:42"
+    key = Column(String(255), primary_key=True)
+    # Policy state as JSON (token bucket or sliding window counters)
+    state = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class LandlordStats(Base):
+    """Running aggregates per landlord, updated in the same transaction as each review.
+
+    Rating sums have their own counts because only `overall_rating` is required.
+    """
+
+    __tablename__ = "landlord_stats"
+
+    landlord_id = Column(Integer, ForeignKey("landlords.id"), primary_key=True)
+
+    review_count = Column(Integer, default=0, nullable=False)
+    overall_sum = Column(Float, default=0.0, nullable=False)
+    maintenance_sum = Column(Float, default=0.0, nullable=False)
+    maintenance_count = Column(Integer, default=0, nullable=False)
+    communication_sum = Column(Float, default=0.0, nullable=False)
+    communication_count = Column(Integer, default=0, nullable=False)
+    respect_sum = Column(Float, default=0.0, nullable=False)
+    respect_count = Column(Integer, default=0, nullable=False)
+    rent_value_sum = Column(Float, default=0.0, nullable=False)
+    rent_value_count = Column(Integer, default=0, nullable=False)
+    would_rent_again_count = Column(Integer, default=0, nullable=False)
+
+    rent_count = Column(Integer, default=0, nullable=False)
+    rent_sum = Column(Integer, default=0, nullable=False)
+    rent_min = Column(Integer)
+    rent_max = Column(Integer)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class MapCell(Base):
+    """Running review aggregates per cell of the map clustering grids.
+
+    A cell at `level` is the web-mercator tile (`cell_x`, `cell_y`) at zoom
+    `level`; see `map_tiles` for how map tiles are drawn from them.
+    """
+
+    __tablename__ = "map_cells"
+
+    level = Column(Integer, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    review_count = Column(Integer, default=0, nullable=False)
+    latitude_sum = Column(Float, default=0.0, nullable=False)
+    longitude_sum = Column(Float, default=0.0, nullable=False)
+    overall_sum = Column(Float, default=0.0, nullable=False)
+
+
+class ContentVersion(Base):
+    """Counter bumped whenever the content behind a cached feed changes.
+
+    Cached responses are keyed on the current version, so bumping it in the
+    same transaction as a write invalidates them in every process at once.
+    """
+
+    __tablename__ = "content_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
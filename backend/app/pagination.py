@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_key(values: List[Any]) -> str:
+    """Opaque cursor for a JSON-serializable sort key."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_key(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return encode_key([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, row_id = decode_key(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_page(query, created_col, id_col, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of `query` ordered newest-first on `(created_col, id_col)`.
+
+    The cursor encodes the sort key of the last row returned, so every page is
+    an index range scan starting right after it rather than an OFFSET scan.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
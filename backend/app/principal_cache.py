@@ -0,0 +1,122 @@
+"""Short-lived cache of authenticated users keyed by access token.
+
+A hit skips both the JWT decode and the `SELECT ... FROM users` that every
+authenticated request would otherwise run. Entries expire after
+`principal_cache_ttl_seconds` or when the token itself expires, whichever is
+sooner, and the least recently used entries are dropped past
+`principal_cache_max_entries`.
+
+Deleting a user or changing their password through the ORM drops their
+entries automatically (see the mapper events below); code that bypasses the
+ORM, such as bulk `query.delete()`, must call `invalidate_user` itself.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from . import models
+from .config import get_settings
+
+settings = get_settings()
+
+# token -> (detached user snapshot, expires at on the monotonic clock)
+_entries: "OrderedDict[str, Tuple[models.User, float]]" = OrderedDict()
+_tokens_by_user: Dict[int, Set[str]] = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_lock = Lock()
+
+
+def _enabled() -> bool:
+    return settings.principal_cache_ttl_seconds > 0 and settings.principal_cache_max_entries > 0
+
+
+def _snapshot(user: models.User) -> models.User:
+    """Copy of `user` that is not bound to any session and never expires.
+
+    The password hash is left out; it loads on access if anything needs it.
+    """
+    copy = models.User(id=user.id, email=user.email, created_at=user.created_at)
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _drop(token: str) -> None:
+    user, _ = _entries.pop(token)
+    tokens = _tokens_by_user.get(user.id)
+    if tokens:
+        tokens.discard(token)
+        if not tokens:
+            del _tokens_by_user[user.id]
+
+
+def get(token: str) -> Optional[models.User]:
+    """Return a detached snapshot of the cached user, or None on a miss."""
+    if not _enabled():
+        return None
+    with _lock:
+        entry = _entries.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                _drop(token)
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(token)
+        _stats["hits"] += 1
+        return entry[0]
+
+
+def put(token: str, user: models.User, token_exp: Optional[int] = None) -> None:
+    """Cache `user` for `token`; `token_exp` is the JWT `exp` claim (epoch seconds)."""
+    if not _enabled():
+        return
+    ttl = settings.principal_cache_ttl_seconds
+    if token_exp is not None:
+        ttl = min(ttl, token_exp - time.time())
+    if ttl <= 0:
+        return
+
+    snapshot = _snapshot(user)
+    with _lock:
+        if token in _entries:
+            _drop(token)
+        _entries[token] = (snapshot, time.monotonic() + ttl)
+        _tokens_by_user.setdefault(snapshot.id, set()).add(token)
+        while len(_entries) > settings.principal_cache_max_entries:
+            _drop(next(iter(_entries)))
+
+
+def invalidate_user(user_id: int) -> None:
+    with _lock:
+        for token in list(_tokens_by_user.get(user_id, ())):
+            _drop(token)
+        _stats["invalidations"] += 1
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _tokens_by_user.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        result = dict(_stats, size=len(_entries))
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = result["hits"] / lookups if lookups else 0.0
+    return result
+
+
+@event.listens_for(models.User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+@event.listens_for(models.User.hashed_password, "set")
+def _password_changed(target, value, oldvalue, initiator):
+    if target.id is not None:
+        invalidate_user(target.id)
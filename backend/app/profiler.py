@@ -0,0 +1,195 @@
+"""Opt-in sampling profiler producing collapsed stacks for flamegraphs.
+
+A `Profile` is filled by one sampler thread, which runs only while some
+profile is active: every `profiler_interval_ms` it reads the stack of every
+busy thread with `sys._current_frames()` and counts it, root first, in the
+`thread;function (file:line);...` form that flamegraph.pl and speedscope read.
+Threads parked waiting for work are skipped.
+
+Profiles are started per request, by sending the admin token in an
+`X-Profile-Token` header (the response names the profile in `X-Profile-Id`),
+or for the whole process for N seconds through `POST /admin/profiler`.
+Samples are taken from every thread, so a request profile also catches
+whatever else the worker was doing at the time. Profiles are kept in
+memory by the process that took them.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .auth import admin_token_matches
+from .config import get_settings
+
+settings = get_settings()
+
+PROFILE_HEADER = b"x-profile-token"
+
+# Leaf frames of threads waiting for work: idle pool workers and the event loop's poll
+_IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+# Paths are shown relative to the longest sys.path entry containing them
+_PATH_ROOTS = sorted((os.path.abspath(path) + os.sep for path in sys.path if path), key=len, reverse=True)
+
+
+class Profile:
+    """Collapsed-stack sample counts; `status` is running or finished."""
+
+    def __init__(self, kind: str, label: str, seconds: Optional[float] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.label = label
+        self.status = "running"
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._deadline = time.monotonic() + seconds if seconds else None
+
+    def collapsed(self) -> str:
+        with _lock:
+            samples = list(self.samples.items())
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(samples))
+
+    def _finish(self) -> None:
+        self.status = "finished"
+        self.finished_at = datetime.utcnow()
+
+
+# Most recent profiles, oldest first
+_profiles: "OrderedDict[str, Profile]" = OrderedDict()
+_MAX_PROFILES = 50
+_active: List[Profile] = []
+_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+# code object -> frame label
+_labels: Dict[object, str] = {}
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename
+        for root in _PATH_ROOTS:
+            if path.startswith(root):
+                path = path[len(root):]
+                break
+        label = _labels[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+    return label
+
+
+def _stack(frame) -> Optional[str]:
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def _sample_forever() -> None:
+    global _sampler
+    me = threading.get_ident()
+    interval = settings.profiler_interval_ms / 1000
+    while True:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = _stack(frame)
+            if stack is not None:
+                stacks.append(f"{names.get(ident, ident)};{stack}")
+        now = time.monotonic()
+        with _lock:
+            for profile in list(_active):
+                if profile._deadline is not None and now >= profile._deadline:
+                    _active.remove(profile)
+                    profile._finish()
+                    continue
+                profile.samples.update(stacks)
+                profile.sample_count += 1
+            if not _active:
+                _sampler = None
+                return
+        time.sleep(interval)
+
+
+def _activate(profile: Profile) -> None:
+    # Called with _lock held
+    global _sampler
+    _profiles[profile.id] = profile
+    while len(_profiles) > _MAX_PROFILES:
+        _profiles.popitem(last=False)
+    _active.append(profile)
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample_forever, name="profiler", daemon=True)
+        _sampler.start()
+
+
+def start(seconds: float) -> Optional[Profile]:
+    """Profile the whole process for `seconds`; None while another such profile runs."""
+    seconds = min(seconds, settings.profiler_max_seconds)
+    with _lock:
+        if any(profile.kind == "global" for profile in _active):
+            return None
+        profile = Profile("global", f"{seconds:g}s", seconds)
+        _activate(profile)
+    return profile
+
+
+def stop(profile: Profile) -> None:
+    with _lock:
+        if profile in _active:
+            _active.remove(profile)
+            profile._finish()
+
+
+def get(profile_id: str) -> Optional[Profile]:
+    with _lock:
+        return _profiles.get(profile_id)
+
+
+def running_global() -> Optional[Profile]:
+    with _lock:
+        return next((profile for profile in _active if profile.kind == "global"), None)
+
+
+class ProfilerMiddleware:
+    """Profile requests that carry the admin token in `X-Profile-Token`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        supplied = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if supplied is None or not admin_token_matches(supplied.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile("request", f"{scope['method']} {scope['path']}")
+        with _lock:
+            _activate(profile)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            stop(profile)
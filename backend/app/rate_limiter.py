@@ -1,48 +1,372 @@
+"""Rate limiting with pluggable policies and shared stores.
+
+A limiter pairs a policy (token bucket or sliding window) with a store that
+holds one small JSON state per key. Stores expose a single atomic
+read-modify-write, `update(key, fn, ttl)`, so the same policy code is
+correct whether the state lives in this process, in the database, or in a
+Redis-compatible server shared by every uvicorn worker:
+
+- `memory`: process-local dict; expired keys are swept periodically.
+- `database`: `rate_limit_buckets` table, compare-and-set on the state column.
+- `redis`: WATCH/MULTI/EXEC over a minimal RESP client (no extra dependency).
+"""
+
+import json
+import logging
+import math
+import socket
+import threading
+import time
 from datetime import datetime, timedelta
-from threading import Lock
-from typing import Dict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
+from . import models
 from .config import get_settings
+from .database import SessionLocal
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
-_RATE_LIMIT_WINDOW = timedelta(seconds=settings.rate_limit_window_seconds)
-_rate_limit_disabled = settings.rate_limit_disabled
 
-_last_submission: Dict[int, datetime] = {}
-_lock = Lock()
+State = Any
+# fn(old_state) -> (new_state, result); new_state None leaves the key unchanged
+Updater = Callable[[Optional[State]], Tuple[Optional[State], Any]]
 
 
-def _should_limit() -> bool:
-    return not _rate_limit_disabled and _RATE_LIMIT_WINDOW.total_seconds() > 0
+# Policies
+class TokenBucket:
+    """Allow bursts of `capacity`, refilled continuously at `rate` tokens per second."""
 
+    def __init__(self, capacity: float, rate: float):
+        if capacity < 1 or rate <= 0:
+            raise ValueError("token bucket needs a capacity of at least 1 and a positive rate")
+        self.capacity = capacity
+        self.rate = rate
 
-def ensure_can_submit(user_id: int) -> None:
-    if not _should_limit():
-        return
+    @property
+    def ttl(self) -> float:
+        return self.capacity / self.rate
+
+    def consume(self, state: Optional[State], now: float) -> Tuple[Optional[State], float]:
+        tokens, last = state if state else (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            return None, (1 - tokens) / self.rate
+        return [tokens - 1, now], 0.0
+
+    def refund(self, state: Optional[State], now: float) -> Tuple[Optional[State], None]:
+        if not state:
+            return None, None
+        tokens, last = state
+        return [min(self.capacity, tokens + (now - last) * self.rate + 1), now], None
+
+
+class SlidingWindow:
+    """At most `limit` events per `window` seconds (sliding window counter).
+
+    The count of the previous fixed window is weighted by how much of it still
+    overlaps the sliding window, which keeps state to two counters per key.
+    """
+
+    def __init__(self, limit: int, window: float):
+        if limit < 1 or window <= 0:
+            raise ValueError("sliding window needs a limit of at least 1 and a positive window")
+        self.limit = limit
+        self.window = window
+
+    @property
+    def ttl(self) -> float:
+        return 2 * self.window
+
+    def consume(self, state: Optional[State], now: float) -> Tuple[Optional[State], float]:
+        start = math.floor(now / self.window) * self.window
+        prev_count, count = 0, 0
+        if state:
+            state_start, state_prev, state_count = state
+            if state_start == start:
+                prev_count, count = state_prev, state_count
+            elif state_start == start - self.window:
+                prev_count = state_count
+
+        elapsed = now - start
+        weight = (self.window - elapsed) / self.window
+        if prev_count * weight + count + 1 <= self.limit:
+            return [start, prev_count, count + 1], 0.0
+
+        if count + 1 > self.limit:
+            retry_after = self.window - elapsed
+        else:
+            # Wait until enough of the previous window has slid out
+            retry_after = (prev_count * weight - (self.limit - count - 1)) * self.window / prev_count
+        return None, retry_after
+
+    def refund(self, state: Optional[State], now: float) -> Tuple[Optional[State], None]:
+        start = math.floor(now / self.window) * self.window
+        if not state or state[0] != start or state[2] < 1:
+            return None, None
+        return [start, state[1], state[2] - 1], None
+
+
+# Stores
+class MemoryStore:
+    blocking = False
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._data: Dict[str, Tuple[State, float]] = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def update(self, key: str, fn: Updater, ttl: float) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            entry = self._data.get(key)
+            state = entry[0] if entry and entry[1] > now else None
+            new_state, result = fn(state)
+            if new_state is not None:
+                self._data[key] = (new_state, now + ttl)
+            return result
+
+    def _sweep(self, now: float) -> None:
+        for key in [k for k, (_, expires) in self._data.items() if expires <= now]:
+            del self._data[key]
+        self._next_sweep = now + self._sweep_interval
+
+
+class DatabaseStore:
+    blocking = True
+
+    def __init__(self, session_factory=SessionLocal, max_retries: int = 10, sweep_every: int = 1000):
+        self._session_factory = session_factory
+        self._max_retries = max_retries
+        self._sweep_every = sweep_every
+        self._calls = 0
+
+    def update(self, key: str, fn: Updater, ttl: float) -> Any:
+        db = self._session_factory()
+        try:
+            self._calls += 1
+            if self._calls % self._sweep_every == 0:
+                db.query(models.RateLimitBucket).filter(
+                    models.RateLimitBucket.expires_at < datetime.utcnow()
+                ).delete(synchronize_session=False)
+                db.commit()
 
-    now = datetime.utcnow()
-    with _lock:
-        last = _last_submission.get(user_id)
-        if not last:
+            for _ in range(self._max_retries):
+                now = datetime.utcnow()
+                row = db.get(models.RateLimitBucket, key)
+                raw = row.state if row and row.expires_at > now else None
+                new_state, result = fn(json.loads(raw) if raw else None)
+                if new_state is None:
+                    db.rollback()
+                    return result
+
+                encoded = json.dumps(new_state)
+                expires_at = now + timedelta(seconds=ttl)
+                if row is None:
+                    db.add(models.RateLimitBucket(key=key, state=encoded, expires_at=expires_at))
+                    try:
+                        db.commit()
+                        return result
+                    except IntegrityError:
+                        db.rollback()
+                        continue
+
+                # Compare-and-set: lose the race if another worker wrote first
+                updated = (
+                    db.query(models.RateLimitBucket)
+                    .filter(models.RateLimitBucket.key == key, models.RateLimitBucket.state == row.state)
+                    .update({"state": encoded, "expires_at": expires_at}, synchronize_session=False)
+                )
+                db.commit()
+                if updated:
+                    return result
+                db.expire_all()
+            raise RuntimeError(f"rate limit state for {key!r} is too contended")
+        finally:
+            db.close()
+
+
+class RedisStore:
+    """Talks RESP to any Redis-compatible server (Redis, Valkey, a local stand-in)."""
+
+    blocking = True
+
+    def __init__(self, url: str, max_retries: int = 10, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self._address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._password = parsed.password
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(self._address, timeout=self._timeout)
+        self._reader = self._sock.makefile("rb")
+        if self._password:
+            self._command("AUTH", self._password)
+        if self._db:
+            self._command("SELECT", str(self._db))
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def _command(self, *args: str) -> Any:
+        payload = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)[:-2]
+            return data.decode()
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"unexpected reply {line!r}")
+
+    def update(self, key: str, fn: Updater, ttl: float) -> Any:
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._update(key, fn, ttl)
+            except Exception:
+                # The connection may be mid-reply or left in WATCH/MULTI; start over
+                self._close()
+                raise
+
+    def _update(self, key: str, fn: Updater, ttl: float) -> Any:
+        for _ in range(self._max_retries):
+            self._command("WATCH", key)
+            raw = self._command("GET", key)
+            new_state, result = fn(json.loads(raw) if raw else None)
+            if new_state is None:
+                self._command("UNWATCH")
+                return result
+
+            self._command("MULTI")
+            self._command("SET", key, json.dumps(new_state), "PX", str(max(1, int(ttl * 1000))))
+            # EXEC returns nil when the watched key changed in the meantime
+            if self._command("EXEC") is not None:
+                return result
+        raise RuntimeError(f"rate limit state for {key!r} is too contended")
+
+
+def _make_store():
+    backend = settings.rate_limit_backend.lower()
+    if backend == "database":
+        return DatabaseStore()
+    if backend == "redis":
+        return RedisStore(settings.redis_url)
+    return MemoryStore()
+
+
+class RateLimiter:
+    def __init__(self, name: str, policy, store, message: str = "Too many requests. Try again in {seconds} seconds."):
+        self.name = name
+        self.policy = policy
+        self.store = store
+        self.message = message
+
+    def _apply(self, action: str, key: str) -> Any:
+        now = time.time()
+        step = getattr(self.policy, action)
+        return self.store.update(f"rl:{self.name}:{key}", lambda state: step(state, now), self.policy.ttl)
+
+    async def _run(self, action: str, key: Any) -> Any:
+        try:
+            if self.store.blocking:
+                return await run_in_threadpool(self._apply, action, str(key))
+            return self._apply(action, str(key))
+        except Exception as exc:
+            # Fail open: an unreachable store must not take login and signup down with it
+            logger.warning("Rate limiter %s could not %s: %r; allowing the request", self.name, action, exc)
+            return None
+
+    async def hit(self, key: Any) -> None:
+        """Consume one unit for `key`, raising 429 when over the limit."""
+        if settings.rate_limit_disabled:
             return
+        retry_after = await self._run("consume", key)
+        if retry_after:
+            seconds_left = int(retry_after) + 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=self.message.format(seconds=seconds_left),
+                headers={"Retry-After": str(seconds_left)},
+            )
 
-        elapsed = now - last
-        if elapsed >= _RATE_LIMIT_WINDOW:
+    async def refund(self, key: Any) -> None:
+        """Give back the unit taken by `hit`, when the limited action did not happen."""
+        if settings.rate_limit_disabled:
             return
+        await self._run("refund", key)
+
 
-        seconds_left = int((_RATE_LIMIT_WINDOW - elapsed).total_seconds()) + 1
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Review submissions limited to one per minute. Try again in {seconds_left} seconds.",
-        )
+store = _make_store()
 
+# One review per window per user
+review_limiter = RateLimiter(
+    "reviews",
+    TokenBucket(capacity=1, rate=1 / max(settings.rate_limit_window_seconds, 1)),
+    store,
+    message="Review submissions limited to one per minute. Try again in {seconds} seconds.",
+)
+# Per client address; bursts allowed, then a steady rate
+login_limiter = RateLimiter(
+    "login",
+    TokenBucket(capacity=settings.login_rate_limit_burst, rate=settings.login_rate_limit_per_minute / 60),
+    store,
+)
+signup_limiter = RateLimiter(
+    "signup",
+    SlidingWindow(limit=settings.signup_rate_limit_per_hour, window=3600),
+    store,
+)
 
-def note_submission(user_id: int) -> None:
-    if not _should_limit():
+
+async def ensure_can_submit(user_id: int) -> None:
+    if settings.rate_limit_window_seconds <= 0:
         return
+    await review_limiter.hit(user_id)
+
 
-    now = datetime.utcnow()
-    with _lock:
-        _last_submission[user_id] = now
+async def release_submission(user_id: int) -> None:
+    """Return the slot taken by `ensure_can_submit` when the review was not saved."""
+    if settings.rate_limit_window_seconds <= 0:
+        return
+    await review_limiter.refund(user_id)
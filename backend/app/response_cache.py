@@ -0,0 +1,129 @@
+"""Rendered responses for public feeds, with ETags and conditional GET.
+
+Feeds are cached per process, keyed on their query parameters and the
+current `reviews` content version. Every write that changes what a feed
+shows (a submission, a geocoding result, a landlord backfill) calls `bump`
+in its own transaction, so the next request in any process reads a new
+version and renders afresh. Checking the version costs one primary-key
+lookup instead of the feed's query and serialization.
+
+ETags are a hash of the exact response body, so they are strong and stay
+valid across restarts. Anonymous responses are public and may be cached by
+a CDN for `public_cache_max_age_seconds`; responses for signed-in users carry
+their own bookmark overlay and are private.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+from .database import dialect_insert
+
+settings = get_settings()
+
+REVIEWS = "reviews"
+
+
+class CachedResponse:
+    __slots__ = ("payload", "body", "etag")
+
+    def __init__(self, payload: Any, body: bytes):
+        self.payload = payload
+        self.body = body
+        self.etag = make_etag(body)
+
+
+# key -> (content version, rendered response)
+_entries: "OrderedDict[Hashable, Tuple[int, CachedResponse]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+_lock = threading.Lock()
+
+
+def current_version(db: Session, name: str = REVIEWS) -> int:
+    version = db.execute(
+        select(models.ContentVersion.version).where(models.ContentVersion.name == name)
+    ).scalar_one_or_none()
+    return version or 0
+
+
+def bump(db: Session, name: str = REVIEWS) -> None:
+    """Invalidate cached responses built from `name`; the caller commits."""
+    table = models.ContentVersion.__table__
+    stmt = dialect_insert(db)(table).values(name=name, version=1)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.name], set_={"version": table.c.version + 1}
+    ))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def get(key: Hashable, version: int) -> Optional[CachedResponse]:
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry[0] != version:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+        return entry[1]
+
+
+def put(key: Hashable, version: int, payload: Any, body: bytes) -> CachedResponse:
+    cached = CachedResponse(payload, body)
+    if settings.response_cache_max_entries <= 0:
+        return cached
+    with _lock:
+        _entries[key] = (version, cached)
+        _entries.move_to_end(key)
+        while len(_entries) > settings.response_cache_max_entries:
+            _entries.popitem(last=False)
+    return cached
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        result = dict(_stats, size=len(_entries))
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = result["hits"] / lookups if lookups else 0.0
+    return result
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def respond(request: Request, body: bytes, etag: str, public: bool) -> Response:
+    """200 with `body`, or 304 when the client already holds `etag`."""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.public_cache_max_age_seconds}" if public else "private, no-cache"
+        ),
+        # Signed-in and anonymous responses for the same URL differ
+        "Vary": "Authorization",
+    }
+    if _matches(request.headers.get("if-none-match"), etag):
+        with _lock:
+            _stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
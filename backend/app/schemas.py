@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -59,16 +59,45 @@ class ReviewCreate(ReviewBase):
 
 class ReviewOut(ReviewBase):
     id: int
+    landlord_id: Optional[int] = None
     created_at: datetime
     formatted_address: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    geocode_status: Optional[str] = None
     author_email: Optional[EmailStr] = None
     is_bookmarked: Optional[bool] = False
 
     model_config = {"from_attributes": True}
 
 
+# Slim projections of ReviewOut (`?view=summary` / `?view=map` on list endpoints)
+class ReviewSummaryOut(BaseModel):
+    landlord_name: str
+    overall_rating: float
+    maintenance_rating: Optional[float] = None
+    communication_rating: Optional[float] = None
+    respect_rating: Optional[float] = None
+    rent_value_rating: Optional[float] = None
+    would_rent_again: Optional[bool] = None
+    monthly_rent: Optional[int] = None
+    property_address: Optional[str] = None
+    id: int
+    landlord_id: Optional[int] = None
+    created_at: datetime
+    formatted_address: Optional[str] = None
+    is_bookmarked: Optional[bool] = False
+
+
+class ReviewMapOut(BaseModel):
+    landlord_name: str
+    overall_rating: float
+    id: int
+    landlord_id: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
 # Bookmark schemas
 class BookmarkBase(BaseModel):
     review_id: int
@@ -85,3 +114,117 @@ class BookmarkOut(BookmarkBase):
     review: ReviewOut
 
     model_config = {"from_attributes": True}
+
+
+class LandlordStatsOut(BaseModel):
+    landlord_id: int
+    landlord_name: str
+    review_count: int
+    average_overall_rating: Optional[float] = None
+    average_maintenance_rating: Optional[float] = None
+    average_communication_rating: Optional[float] = None
+    average_respect_rating: Optional[float] = None
+    average_rent_value_rating: Optional[float] = None
+    would_rent_again_ratio: Optional[float] = None
+    rent_min: Optional[int] = None
+    rent_max: Optional[int] = None
+    rent_mean: Optional[float] = None
+
+
+# Cursor-paginated list responses
+class ReviewPage(BaseModel):
+    items: List[ReviewOut]
+    next_cursor: Optional[str] = None
+
+
+class ReviewSummaryPage(BaseModel):
+    items: List[ReviewSummaryOut]
+    next_cursor: Optional[str] = None
+
+
+class ReviewMapPage(BaseModel):
+    items: List[ReviewMapOut]
+    next_cursor: Optional[str] = None
+
+
+class BookmarkPage(BaseModel):
+    items: List[BookmarkOut]
+    next_cursor: Optional[str] = None
+
+
+class ReviewSearchHit(BaseModel):
+    review: ReviewOut
+    relevance: float
+    # HTML: matched terms wrapped in <mark>, everything else escaped
+    snippet: str
+
+
+class ReviewSearchPage(BaseModel):
+    items: List[ReviewSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ReviewGeoHit(BaseModel):
+    review: ReviewOut
+    distance_m: float
+
+
+class ReviewGeoPage(BaseModel):
+    items: List[ReviewGeoHit]
+    next_cursor: Optional[str] = None
+
+
+class Suggestion(BaseModel):
+    kind: str  # "landlord" or "address"
+    text: str
+    review_count: int
+    landlord_id: Optional[int] = None
+
+
+class MapTile(BaseModel):
+    z: int
+    x: int
+    y: int
+    # Column names for each row of `clusters`
+    fields: List[str]
+    clusters: List[Tuple[float, float, int, float]]
+
+
+class SeedRequest(BaseModel):
+    force: bool = False
+    reviews: int = Field(25, ge=0, le=100_000)
+
+
+class SeedJobOut(BaseModel):
+    job_id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    force: bool
+    target_reviews: int
+    inserted: int
+    # Reviews this job inserts; known once it has counted the existing samples
+    total: Optional[int] = None
+    deleted: int
+    message: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class ProfileOut(BaseModel):
+    profile_id: str
+    kind: str  # "request" or "global"
+    label: str
+    status: str  # "running" or "finished"
+    sample_count: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class SlowQueryOut(BaseModel):
+    at: datetime
+    duration_ms: float
+    statement: str
+    # repr of the bound parameters, truncated; None when parameter logging is off
+    parameters: Optional[str] = None
+    executemany: bool
+    plan: Optional[str] = None
@@ -0,0 +1,259 @@
+"""Full-text search over reviews.
+
+`review_text`, `landlord_name` and `formatted_address` are indexed on
+whichever database `DATABASE_URL` selects:
+
+- SQLite: an FTS5 external-content table, `reviews_fts`, that stores only the
+  index and reads text back from `reviews`. Triggers on `reviews` keep it in
+  sync on insert, delete and on updates to the indexed columns (geocoding
+  fills in `formatted_address` after submission). Results are ranked by
+  FTS5's `bm25()`.
+- PostgreSQL: a stored generated `tsvector` column with a GIN index, so the
+  database keeps it in sync on every write. Postgres has no BM25; results are
+  ranked by `ts_rank_cd` over the same weighted columns.
+
+When the index cannot be created (SQLite built without FTS5, a Postgres
+role that may not alter `reviews`), a warning is logged and searches fall
+back to `LIKE` scans of the same columns. They find every review containing
+all the terms (as substrings, without stemming), score by a weighted count
+of matching columns and build snippets in Python, but cost time linear in
+the number of reviews.
+
+Pages are keyset paginated on `(score, id)`. Scores are recomputed per
+request, so a page boundary can shift slightly when reviews are added between
+requests; no row is ever returned twice within one page walk of a fixed index.
+"""
+
+import html
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .database import OptionalIndex
+from .pagination import decode_key, encode_key
+
+# Relative column weights: a landlord-name hit counts more than a passing mention
+LANDLORD_NAME_WEIGHT = 2.0
+SNIPPET_TOKENS = 16
+
+# Private-use markers survive the database round trip and cannot appear in
+# escaped text, so highlights are added only after the snippet is escaped.
+_HIGHLIGHT_START = "\ue000"
+_HIGHLIGHT_END = "\ue001"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        review_text, landlord_name, formatted_address,
+        content='reviews', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts(rowid, review_text, landlord_name, formatted_address)
+        VALUES (new.id, new.review_text, new.landlord_name, new.formatted_address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, review_text, landlord_name, formatted_address)
+        VALUES ('delete', old.id, old.review_text, old.landlord_name, old.formatted_address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_au
+    AFTER UPDATE OF review_text, landlord_name, formatted_address ON reviews BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, review_text, landlord_name, formatted_address)
+        VALUES ('delete', old.id, old.review_text, old.landlord_name, old.formatted_address);
+        INSERT INTO reviews_fts(rowid, review_text, landlord_name, formatted_address)
+        VALUES (new.id, new.review_text, new.landlord_name, new.formatted_address);
+    END
+    """,
+]
+
+_POSTGRES_SCHEMA = [
+    """
+    ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(landlord_name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(review_text, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(formatted_address, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_vector ON reviews USING GIN (search_vector)",
+]
+
+# Each ranking query yields (id, score) with lower scores ranking first
+_SQLITE_RANKED = f"""
+    SELECT rowid AS id, bm25(reviews_fts, 1.0, {LANDLORD_NAME_WEIGHT}, 1.0) AS score
+    FROM reviews_fts WHERE reviews_fts MATCH :query
+"""
+_POSTGRES_RANKED = """
+    SELECT id, -ts_rank_cd(search_vector, plainto_tsquery('english', :query)) AS score
+    FROM reviews WHERE search_vector @@ plainto_tsquery('english', :query)
+"""
+
+_SQLITE_SNIPPETS = f"""
+    SELECT rowid AS id, snippet(reviews_fts, -1, :start, :stop, '…', {SNIPPET_TOKENS}) AS snippet
+    FROM reviews_fts WHERE reviews_fts MATCH :query AND rowid IN :ids
+"""
+_POSTGRES_SNIPPETS = f"""
+    SELECT id, ts_headline(
+        'english',
+        concat_ws(' — ', review_text, landlord_name, formatted_address),
+        plainto_tsquery('english', :query),
+        'StartSel=' || :start || ', StopSel=' || :stop || ', MaxWords={SNIPPET_TOKENS}, MinWords=5'
+    ) AS snippet
+    FROM reviews WHERE id IN :ids
+"""
+
+_SEARCHED_COLUMNS = (("landlord_name", LANDLORD_NAME_WEIGHT), ("review_text", 1.0), ("formatted_address", 1.0))
+
+
+def _create_index(conn: Connection) -> bool:
+    if conn.dialect.name == "sqlite":
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reviews_fts'")
+        ).first()
+        for statement in _SQLITE_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            # Index the reviews written before the table existed
+            conn.execute(text("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')"))
+        return not exists
+    # PostgreSQL: adding the generated column computes it for every existing row
+    for statement in _POSTGRES_SCHEMA:
+        conn.execute(text(statement))
+    return True
+
+
+_index = OptionalIndex("Full-text index", "searching with LIKE scans", _create_index)
+
+
+def ensure_index(conn: Connection) -> bool:
+    """Create the search index and its sync triggers if they are missing.
+
+    Returns True when existing reviews were indexed as part of the call. If
+    the database cannot build the index, this process searches with `LIKE`
+    scans and False is returned.
+    """
+    return _index.ensure(conn)
+
+
+def rebuild_index(engine: Engine) -> None:
+    """Re-index every review (SQLite only; the Postgres column is always current)."""
+    with engine.begin() as conn:
+        if not ensure_index(conn) and _index.available:
+            conn.execute(text("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')"))
+
+
+def query_terms(q: str) -> List[str]:
+    return _TOKEN.findall(q.lower())
+
+
+def _match_expression(terms: List[str], dialect: str) -> str:
+    if dialect == "sqlite":
+        # Quoting every term keeps FTS5 operators in user input literal;
+        # adjacent strings are ANDed.
+        return " ".join(f'"{term}"' for term in terms)
+    return " ".join(terms)
+
+
+def _like_ranked(terms: List[str]) -> Tuple[str, dict]:
+    """Ranking query without an index: every term must appear in some column."""
+    params, matches, scores = {}, [], []
+    for i, term in enumerate(terms):
+        # Terms are word characters, of which only "_" is a LIKE wildcard
+        params[f"term{i}"] = "%" + term.replace("_", "\\_") + "%"
+        hits = [(f"lower(coalesce({column}, '')) LIKE :term{i} ESCAPE '\\'", weight) for column, weight in _SEARCHED_COLUMNS]
+        matches.append("(" + " OR ".join(hit for hit, _ in hits) + ")")
+        scores += [f"CASE WHEN {hit} THEN {weight} ELSE 0 END" for hit, weight in hits]
+    sql = f"SELECT id, -({' + '.join(scores)}) AS score FROM reviews WHERE {' AND '.join(matches)}"
+    return sql, params
+
+
+def _plain_snippet(review_text: Optional[str], terms: List[str]) -> str:
+    """Up to SNIPPET_TOKENS words of `review_text` around the first match, matches marked."""
+    words = (review_text or "").split()
+    wanted = set(terms)
+    first = next((i for i, word in enumerate(words) if wanted & set(query_terms(word))), 0)
+    start = max(0, first - SNIPPET_TOKENS // 4)
+    marked = [
+        f"{_HIGHLIGHT_START}{word}{_HIGHLIGHT_END}" if wanted & set(query_terms(word)) else word
+        for word in words[start:start + SNIPPET_TOKENS]
+    ]
+    return ("…" if start else "") + " ".join(marked) + ("…" if start + SNIPPET_TOKENS < len(words) else "")
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_END, "</mark>")
+
+
+def search(
+    db: Session, q: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Tuple[int, float, str]], Optional[str]]:
+    """Return one page of `(review_id, relevance, snippet)` best match first.
+
+    `relevance` is positive, higher meaning a better match; `snippet` is HTML
+    with matches wrapped in `<mark>` and everything else escaped.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return [], None
+
+    dialect = db.get_bind().dialect.name
+    if not _index.available:
+        ranked, params = _like_ranked(terms)
+    elif dialect == "sqlite":
+        ranked, params = _SQLITE_RANKED, {"query": _match_expression(terms, dialect)}
+    else:
+        ranked, params = _POSTGRES_RANKED, {"query": _match_expression(terms, dialect)}
+    params["limit"] = limit + 1
+    keyset = ""
+    if cursor:
+        try:
+            score, row_id = decode_key(cursor)
+            params.update(score=float(score), id=int(row_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        keyset = "WHERE (score, id) > (:score, :id)"
+
+    rows = db.execute(
+        text(f"SELECT id, score FROM ({ranked}) AS ranked {keyset} ORDER BY score, id LIMIT :limit"),
+        params,
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_key([rows[-1].score, rows[-1].id])
+    if not rows:
+        return [], None
+
+    # Snippets are only worth building for the rows on this page
+    if not _index.available:
+        texts = dict(
+            db.execute(
+                text("SELECT id, review_text FROM reviews WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": [row.id for row in rows]},
+            ).all()
+        )
+        page = [(row.id, -row.score, _highlight(_plain_snippet(texts.get(row.id), terms))) for row in rows]
+        return page, next_cursor
+
+    snippet_sql = _SQLITE_SNIPPETS if dialect == "sqlite" else _POSTGRES_SNIPPETS
+    snippets = dict(
+        db.execute(
+            text(snippet_sql).bindparams(bindparam("ids", expanding=True)),
+            {"query": params["query"], "ids": [row.id for row in rows],
+             "start": _HIGHLIGHT_START, "stop": _HIGHLIGHT_END},
+        ).all()
+    )
+    page = [(row.id, -row.score, _highlight(snippets.get(row.id))) for row in rows]
+    return page, next_cursor
+
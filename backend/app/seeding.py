@@ -0,0 +1,276 @@
+"""Sample data for demos and development.
+
+`seed` inserts sample reviews of curated Philadelphia locations written by a
+handful of sample users. It runs in-process: users and reviews go in with
+bulk `insert()` batches, and every sample user shares one password hash,
+computed once per process, so seeding does no per-user bcrypt work.
+
+`start_job` runs `seed` on a background thread and returns a `SeedJob` whose
+progress can be polled; jobs are kept in memory by the process that ran
+them.
+"""
+
+import logging
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import autocomplete, landlord_stats, landlords, models, response_cache
+from .auth import get_password_hash
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_MARKER = "[Sample Data]"
+SAMPLE_USER_EMAILS = [f"tenant{i+1}@example.com" for i in range(5)]
+DEFAULT_PASSWORD = "password123"
+TARGET_REVIEW_COUNT = 25
+# Upper bound for one seed request
+MAX_REVIEW_COUNT = 100_000
+BATCH_SIZE = 1000
+
+# Curated list of real Philadelphia addresses (apartments and houses)
+# Format: (landlord_name_or_building, full_street_address, category)
+PHILLY_LOCATIONS = [
+    # Apartments / Buildings (Center City, University City, etc.)
+    ("The Franklin Residences", "834 Chestnut St, Philadelphia, PA 19107", "apartment"),
+    ("The Murano", "2101 Market St, Philadelphia, PA 19103", "apartment"),
+    ("The Drake", "1512 Spruce St, Philadelphia, PA 19102", "apartment"),
+    ("Two Liberty Place Residences", "50 S 16th St, Philadelphia, PA 19102", "apartment"),
+    ("2116 Chestnut", "2116 Chestnut St, Philadelphia, PA 19103", "apartment"),
+    ("The Ludlow", "1101 Ludlow St, Philadelphia, PA 19107", "apartment"),
+    ("One Water Street", "250 N Columbus Blvd, Philadelphia, PA 19106", "apartment"),
+    ("3737 Chestnut", "3737 Chestnut St, Philadelphia, PA 19104", "apartment"),
+    ("Domus", "3411 Chestnut St, Philadelphia, PA 19104", "apartment"),
+    ("The Collins", "1125 Sansom St, Philadelphia, PA 19107", "apartment"),
+    ("The Broadridge", "1300 Fairmount Ave, Philadelphia, PA 19123", "apartment"),
+    ("Piazza Alta", "1001 N 2nd St, Philadelphia, PA 19123", "apartment"),
+    ("The Avenir", "42 S 15th St, Philadelphia, PA 19102", "apartment"),
+    ("The Hamilton", "1500 Hamilton St, Philadelphia, PA 19130", "apartment"),
+    ("Park Towne Place", "2200 Benjamin Franklin Pkwy, Philadelphia, PA 19130", "apartment"),
+    # Houses / Rowhomes in various neighborhoods
+    ("Private Owner", "2017 Tasker St, Philadelphia, PA 19145", "house"),
+    ("Private Owner", "1624 Catharine St, Philadelphia, PA 19146", "house"),
+    ("Private Owner", "2231 E Susquehanna Ave, Philadelphia, PA 19125", "house"),
+    ("Private Owner", "808 N 24th St, Philadelphia, PA 19130", "house"),
+    ("Private Owner", "1333 S 17th St, Philadelphia, PA 19146", "house"),
+    ("Private Owner", "611 Carpenter St, Philadelphia, PA 19147", "house"),
+    ("Private Owner", "1927 E York St, Philadelphia, PA 19125", "house"),
+    ("Private Owner", "5017 Hazel Ave, Philadelphia, PA 19143", "house"),
+    ("Private Owner", "1528 N 28th St, Philadelphia, PA 19121", "house"),
+    ("Private Owner", "829 S 8th St, Philadelphia, PA 19147", "house"),
+]
+# A plausible base overall rating per location, to vary the output
+BASE_RATINGS = [4.4, 4.1, 3.6, 4.3, 3.8, 4.0, 3.7, 4.2, 4.0, 3.9, 3.5, 4.1, 3.8, 3.7, 4.2, 3.6, 3.7, 3.9, 3.4, 3.8, 3.6, 3.7, 3.5, 3.9, 3.8]
+
+AMENITIES = [
+    "fast maintenance turnaround",
+    "quiet neighbors",
+    "friendly landlord",
+    "dated appliances",
+    "flexible lease terms",
+    "responsive property manager",
+    "slow deposit return",
+    "excellent sunlight",
+    "secure building",
+    "limited parking",
+]
+
+Progress = Callable[[int, int], None]
+
+
+@lru_cache()
+def sample_password_hash() -> str:
+    return get_password_hash(DEFAULT_PASSWORD)
+
+
+def create_or_get_users(db: Session) -> List[int]:
+    """Ids of the sample users, creating the missing ones."""
+    existing = dict(db.execute(
+        select(models.User.email, models.User.id).where(models.User.email.in_(SAMPLE_USER_EMAILS))
+    ).all())
+    missing = [email for email in SAMPLE_USER_EMAILS if email not in existing]
+    if missing:
+        hashed = sample_password_hash()
+        db.execute(insert(models.User.__table__), [{"email": email, "hashed_password": hashed} for email in missing])
+        existing = dict(db.execute(
+            select(models.User.email, models.User.id).where(models.User.email.in_(SAMPLE_USER_EMAILS))
+        ).all())
+    return [existing[email] for email in SAMPLE_USER_EMAILS]
+
+
+def _sample_filter():
+    return models.Review.review_text.contains(SAMPLE_MARKER)
+
+
+def delete_existing_samples(db: Session) -> int:
+    sample_ids = select(models.Review.id).where(_sample_filter()).scalar_subquery()
+    db.execute(delete(models.Bookmark).where(models.Bookmark.review_id.in_(sample_ids)))
+    result = db.execute(delete(models.Review).where(_sample_filter()))
+    return result.rowcount or 0
+
+
+def _clamp(value: float) -> float:
+    return round(max(0.0, min(5.0, value)), 1)
+
+
+def _sample_review(idx: int, user_ids: List[int], rnd: random.Random) -> dict:
+    landlord_name, address, _category = PHILLY_LOCATIONS[idx % len(PHILLY_LOCATIONS)]
+    overall_rating = BASE_RATINGS[idx % len(BASE_RATINGS)]
+
+    maintenance = overall_rating + rnd.uniform(-1.0, 1.0)
+    communication = overall_rating + rnd.uniform(-1.2, 0.8)
+    respect = overall_rating + rnd.uniform(-0.6, 0.6)
+    rent_value = overall_rating + rnd.uniform(-1.0, 1.0)
+
+    # Move-in dates cycle over six years, so large seeds stay in the past
+    move_in = date(2020, 1, 1) + timedelta(days=90 * (idx % 25))
+    move_out = move_in + timedelta(days=365 + 15 * (idx % 4))
+
+    return {
+        "user_id": user_ids[idx % len(user_ids)],
+        "landlord_name": landlord_name,
+        "property_address": address,
+        "formatted_address": address,
+        "overall_rating": _clamp(overall_rating + rnd.uniform(-0.5, 0.5)),
+        "maintenance_rating": _clamp(maintenance),
+        "communication_rating": _clamp(communication),
+        "respect_rating": _clamp(respect),
+        "rent_value_rating": _clamp(rent_value),
+        "would_rent_again": overall_rating >= 3.5 and idx % 5 != 0,
+        "monthly_rent": 1400 + (idx % 7) * 85,
+        "move_in_date": move_in,
+        "move_out_date": move_out,
+        "is_anonymous": idx % 4 == 0,
+        "review_text": (
+            f"{SAMPLE_MARKER} Lived at {landlord_name} in Philadelphia. "
+            f"We appreciated the {rnd.choice(AMENITIES)}, though there was {rnd.choice(AMENITIES)}. "
+            f"Overall experience was {'positive' if overall_rating >= 3.5 else 'mixed'}."
+        ),
+    }
+
+
+def seed(
+    db: Session, force: bool = False, target: int = TARGET_REVIEW_COUNT, progress: Optional[Progress] = None
+) -> Dict[str, int]:
+    """Top the sample reviews up to `target`; with `force`, replace them.
+
+    Commits as it goes, so progress is visible to other sessions. Returns
+    the numbers of sample reviews deleted and inserted.
+    """
+    deleted = 0
+    if force:
+        deleted = delete_existing_samples(db)
+        db.commit()
+
+    user_ids = create_or_get_users(db)
+    db.commit()
+
+    existing = db.execute(select(func.count()).select_from(models.Review).where(_sample_filter())).scalar_one()
+    missing = max(0, target - existing)
+    rnd = random.Random(42)
+    table = models.Review.__table__
+    inserted = 0
+    if progress:
+        progress(0, missing)
+    for start in range(existing, existing + missing, BATCH_SIZE):
+        batch = [_sample_review(idx, user_ids, rnd) for idx in range(start, min(start + BATCH_SIZE, existing + missing))]
+        db.execute(insert(table), batch)
+        db.commit()
+        inserted += len(batch)
+        if progress:
+            progress(inserted, missing)
+
+    if inserted or deleted:
+        # Reviews are inserted directly, so link landlords and bring the
+        # aggregates back in line
+        landlords.backfill(db)
+        landlord_stats.rebuild(db)
+        # Let running servers drop feed responses cached before the seed
+        response_cache.bump(db)
+        db.commit()
+    return {"deleted": deleted, "inserted": inserted}
+
+
+class SeedJob:
+    """A background `seed` run; `status` is queued, running, succeeded or failed."""
+
+    def __init__(self, force: bool, target: int):
+        self.id = uuid.uuid4().hex
+        self.force = force
+        self.target = target
+        self.status = "queued"
+        self.inserted = 0
+        self.total: Optional[int] = None
+        self.deleted = 0
+        self.message: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def _progress(self, inserted: int, total: int) -> None:
+        self.inserted, self.total = inserted, total
+
+    def run(self) -> None:
+        self.status = "running"
+        db = SessionLocal()
+        try:
+            counts = seed(db, self.force, self.target, self._progress)
+            self.deleted = counts["deleted"]
+            if counts["inserted"]:
+                self.message = f"Inserted {counts['inserted']} sample reviews."
+            else:
+                self.message = "Sample reviews already present; nothing to do."
+            if counts["deleted"]:
+                self.message = f"Removed {counts['deleted']} existing sample reviews. {self.message}"
+            # This process's suggestions; other workers pick new names up as reviews arrive
+            autocomplete.load(db)
+            self.status = "succeeded"
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Seed job %s failed", self.id)
+            self.error = str(exc)
+            self.status = "failed"
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+# Most recent jobs, oldest first
+_jobs: "OrderedDict[str, SeedJob]" = OrderedDict()
+_MAX_JOBS = 20
+_lock = threading.Lock()
+
+
+def start_job(force: bool = False, target: int = TARGET_REVIEW_COUNT) -> Optional[SeedJob]:
+    """Start seeding in the background; None while another job is still running."""
+    with _lock:
+        if any(job.active for job in _jobs.values()):
+            return None
+        job = SeedJob(force, target)
+        _jobs[job.id] = job
+        while len(_jobs) > _MAX_JOBS:
+            _jobs.popitem(last=False)
+    threading.Thread(target=job.run, name=f"seed-{job.id[:8]}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[SeedJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def running_job() -> Optional[SeedJob]:
+    with _lock:
+        return next((job for job in _jobs.values() if job.active), None)
@@ -0,0 +1,32 @@
+"""Link existing reviews to canonical landlord entities.
+
+Clusters the distinct `landlord_name` values of unlinked reviews ("The Drake",
+"the drake ", "The Drake LLC" end up together), creates or reuses one landlord
+per cluster, bulk-updates `reviews.landlord_id`, and rebuilds landlord stats.
+"""
+
+import os
+import sys
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import landlord_stats, landlords, response_cache
+from app.database import Base, SessionLocal, engine
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        linked = landlords.backfill(session)
+        landlord_stats.rebuild(session)
+        response_cache.bump(session)
+        session.commit()
+        print(f"Linked {linked} reviews to landlords.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""Benchmark every API endpoint in-process and record a JSON baseline.
+
+Drives `app.main.app` through httpx's ASGI transport, so no server or
+network is involved, against a database filled by `generate_data.py`
+(a scratch SQLite file unless --database-url is given). Each endpoint gets
+its own timed run of --requests requests from --concurrency clients, and
+its RPS and p50/p95/p99 latency are written to --output.
+
+Pass an earlier baseline with --compare to print the change per endpoint;
+with --max-regression the script exits non-zero when any endpoint's RPS
+drops, or its p95 grows, by more than that percentage. Every route must
+have a scenario here (or be listed in SKIPPED), so new endpoints are not
+silently left out. Requires `httpx` (not an app dependency).
+
+    python scripts/bench_api.py --reviews 200000 --output baseline.json
+    python scripts/bench_api.py --reviews 200000 --compare baseline.json --max-regression 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+parser = argparse.ArgumentParser(description="Benchmark every API endpoint in-process.")
+parser.add_argument("--database-url", help="Database to benchmark (default: a scratch SQLite file).")
+parser.add_argument("--generate", action="store_true", help="Add synthetic data to --database-url first.")
+parser.add_argument("--reviews", type=int, default=100_000, help="Synthetic reviews to generate.")
+parser.add_argument("--users", type=int, default=2000, help="Synthetic users to generate.")
+parser.add_argument("--requests", type=int, default=500, help="Timed requests per endpoint.")
+parser.add_argument("--concurrency", type=int, default=16)
+parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per endpoint first.")
+parser.add_argument("--only", nargs="+", help="Run only scenarios whose name contains one of these.")
+parser.add_argument("--output", default="bench_api.json", help="Where to write the results.")
+parser.add_argument("--compare", help="Baseline JSON to compare against.")
+parser.add_argument("--max-regression", type=float, help="Fail when an endpoint regresses by more than this %%.")
+parser.add_argument("--seed", type=int, default=1)
+args = parser.parse_args()
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.TemporaryDirectory()
+    args.database_url = f"sqlite:///{os.path.join(scratch.name, 'bench_api.db')}"
+    args.generate = True
+# app.database and app.config read these at import time
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DISABLE_RATE_LIMIT"] = "true"
+os.environ["GEOCODE_WORKERS"] = "0"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_data  # noqa: E402
+
+if args.generate:
+    print(f"Generating {args.reviews} reviews...")
+    generate_data.generate(args.reviews, args.users, seed=args.seed)
+
+from fastapi.routing import APIRoute  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app import auth, map_tiles, models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Routes deliberately not benchmarked
+SKIPPED = {
+    ("POST", "/seed-database"): "rewrites the database",
+    ("GET", "/seed-database/{job_id}"): "polls a job started by POST /seed-database",
+    ("POST", "/admin/profiler"): "diagnostics, disabled without ADMIN_TOKEN",
+    ("GET", "/admin/profiles/{profile_id}"): "diagnostics, disabled without ADMIN_TOKEN",
+    ("GET", "/admin/slow-queries"): "diagnostics, disabled without ADMIN_TOKEN",
+}
+
+SEARCH_TERMS = ["mold", "heater", "drafty windows", "quiet neighbors", "deposit", "parking", "mice", "train"]
+PREFIXES = ["the", "mu", "wal", "ches", "pri", "spr", "dra", "ma", "lib", "key"]
+PHILLY = (39.9526, -75.1652)
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # Route path as declared in main.py, for the coverage check
+    route: str
+    # Request number -> keyword arguments for `client.request`
+    build: Callable[[int], dict]
+    auth: bool = False
+    ok: tuple = (200,)
+    # Fraction of --requests to run, for endpoints dominated by bcrypt
+    share: float = 1.0
+
+
+class Context(NamedTuple):
+    user_ids: List[int]
+    emails: List[str]
+    min_review_id: int
+    max_review_id: int
+    landlord_ids: List[int]
+    cursors: List[str]
+    recent_since: str
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _context() -> Context:
+    db = SessionLocal()
+    try:
+        users = db.execute(
+            select(models.User.id, models.User.email)
+            .where(models.User.email.like(generate_data.EMAIL_TEMPLATE.format("%")))
+            .order_by(models.User.id)
+            .limit(500)
+        ).all()
+        if not users:
+            raise SystemExit("No synthetic users found; run with --generate")
+        min_id, max_id = db.execute(select(func.min(models.Review.id), func.max(models.Review.id))).one()
+        landlord_ids = db.execute(select(models.LandlordStats.landlord_id).limit(500)).scalars().all()
+        # Created_at of the review 1000 from the end, so each export streams about 1000 rows
+        since = db.execute(
+            select(models.Review.created_at).order_by(models.Review.created_at.desc()).offset(1000).limit(1)
+        ).scalar_one_or_none()
+    finally:
+        db.close()
+    return Context(
+        user_ids=[user.id for user in users],
+        emails=[user.email for user in users],
+        min_review_id=min_id,
+        max_review_id=max_id,
+        landlord_ids=landlord_ids,
+        cursors=[],
+        recent_since=(since or datetime.utcnow() - timedelta(days=1)).isoformat(),
+    )
+
+
+async def _collect_cursors(client: httpx.AsyncClient, ctx: Context, pages: int = 50) -> None:
+    cursor = None
+    for _ in range(pages):
+        params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+        cursor = (await client.get("/reviews", params=params)).json()["next_cursor"]
+        if not cursor:
+            break
+        ctx.cursors.append(cursor)
+
+
+def _tile(rng: random.Random, z: int) -> str:
+    lat, lng = PHILLY[0] + rng.uniform(-0.03, 0.03), PHILLY[1] + rng.uniform(-0.04, 0.04)
+    # The grid cell at level z is the map tile at zoom z
+    x, y = next((x, y) for level, x, y in map_tiles.cells_for(lat, lng) if level == z)
+    return f"/map/tiles/{z}/{x}/{y}"
+
+
+def scenarios(ctx: Context, rng: random.Random) -> List[Scenario]:
+    def review_id() -> int:
+        return rng.randint(ctx.min_review_id, ctx.max_review_id)
+
+    def point() -> Dict[str, float]:
+        return {"lat": PHILLY[0] + rng.uniform(-0.03, 0.03), "lng": PHILLY[1] + rng.uniform(-0.04, 0.04)}
+
+    def bbox() -> str:
+        lat, lng = point().values()
+        return f"{lng - 0.01},{lat - 0.008},{lng + 0.01},{lat + 0.008}"
+
+    run_id = int(time.time())
+    new_review = {
+        "landlord_name": "Benchmark Landlord", "overall_rating": 4, "review_text": "Synthetic review written by bench_api.",
+        "property_address": "1520 Walnut St, Philadelphia, PA 19102", "move_in_date": None, "move_out_date": None,
+    }
+    return [
+        Scenario("health", "GET", "/health", lambda i: {"url": "/health"}),
+        Scenario("metrics", "GET", "/metrics", lambda i: {"url": "/metrics"}),
+        Scenario("signup", "POST", "/signup", lambda i: {
+            "url": "/signup", "json": {"email": f"bench{run_id}-{i}@example.com", "password": "password123"},
+        }, ok=(201,), share=0.1),
+        Scenario("login", "POST", "/login", lambda i: {
+            "url": "/login", "data": {"username": ctx.emails[i % len(ctx.emails)], "password": generate_data.PASSWORD},
+        }, share=0.1),
+        Scenario("reviews first page", "GET", "/reviews", lambda i: {"url": "/reviews", "params": {"limit": 20}}),
+        Scenario("reviews pages", "GET", "/reviews", lambda i: {
+            "url": "/reviews", "params": {"limit": 20, "cursor": ctx.cursors[i % len(ctx.cursors)]},
+        }),
+        Scenario("reviews pages signed in", "GET", "/reviews", lambda i: {
+            "url": "/reviews", "params": {"limit": 20, "cursor": ctx.cursors[i % len(ctx.cursors)]},
+        }, auth=True),
+        Scenario("reviews summary view", "GET", "/reviews", lambda i: {
+            "url": "/reviews", "params": {"limit": 100, "view": "summary", "cursor": ctx.cursors[i % len(ctx.cursors)]},
+        }),
+        Scenario("reviews search", "GET", "/reviews/search", lambda i: {
+            "url": "/reviews/search", "params": {"q": SEARCH_TERMS[i % len(SEARCH_TERMS)], "limit": 20},
+        }),
+        Scenario("reviews near", "GET", "/reviews/near", lambda i: {
+            "url": "/reviews/near", "params": {**point(), "radius_m": 500, "limit": 20},
+        }),
+        Scenario("reviews within", "GET", "/reviews/within", lambda i: {
+            "url": "/reviews/within", "params": {"bbox": bbox(), "limit": 50},
+        }),
+        Scenario("submit review", "POST", "/reviews", lambda i: {"url": "/reviews", "json": new_review},
+                 auth=True, ok=(201,)),
+        Scenario("autocomplete", "GET", "/autocomplete", lambda i: {
+            "url": "/autocomplete", "params": {"q": PREFIXES[i % len(PREFIXES)], "limit": 10},
+        }),
+        Scenario("bookmark add", "POST", "/bookmarks", lambda i: {"url": "/bookmarks", "json": {"review_id": review_id()}},
+                 auth=True, ok=(201, 400, 404)),
+        Scenario("bookmark remove", "DELETE", "/bookmarks/{review_id}", lambda i: {"url": f"/bookmarks/{review_id()}"},
+                 auth=True, ok=(204, 404)),
+        Scenario("bookmarks", "GET", "/bookmarks", lambda i: {"url": "/bookmarks", "params": {"limit": 20}}, auth=True),
+        Scenario("my reviews", "GET", "/my-reviews", lambda i: {"url": "/my-reviews", "params": {"limit": 20}}, auth=True),
+        Scenario("landlord stats", "GET", "/landlords/{landlord_id}/stats", lambda i: {
+            "url": f"/landlords/{ctx.landlord_ids[i % len(ctx.landlord_ids)]}/stats",
+        }),
+        Scenario("map tiles", "GET", "/map/tiles/{z}/{x}/{y}", lambda i: {"url": _tile(rng, 12 + i % 5)}),
+        Scenario("export recent", "GET", "/export/reviews", lambda i: {
+            "url": "/export/reviews", "params": {"since": ctx.recent_since, "format": "ndjson" if i % 2 else "csv"},
+        }, auth=True, share=0.2),
+    ]
+
+
+def check_coverage(all_scenarios: List[Scenario]) -> None:
+    covered = {(s.method, s.route) for s in all_scenarios} | set(SKIPPED)
+    missing = sorted(
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+    if missing:
+        raise SystemExit("No benchmark scenario for: " + ", ".join(f"{m} {p}" for m, p in missing))
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, headers: List[dict]) -> dict:
+    total = max(1, int(args.requests * scenario.share))
+    # Numbered after the timed requests, so requests that must be unique (sign-ups) stay unique
+    for i in range(total, total + min(args.warmup, total)):
+        await client.request(scenario.method, headers=headers[i % len(headers)] if scenario.auth else None,
+                             **scenario.build(i))
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            kwargs = scenario.build(i)
+            hdrs = headers[i % len(headers)] if scenario.auth else None
+            start = time.perf_counter()
+            response = await client.request(scenario.method, headers=hdrs, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in scenario.ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run() -> Dict[str, dict]:
+    rng = random.Random(args.seed)
+    ctx = _context()
+    # Tokens are minted directly; /login itself is measured as a scenario
+    headers = [{"Authorization": f"Bearer {auth.create_access_token({'sub': str(uid)})}"} for uid in ctx.user_ids[:50]]
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            await _collect_cursors(client, ctx)
+            all_scenarios = scenarios(ctx, rng)
+            check_coverage(all_scenarios)
+            if args.only:
+                all_scenarios = [s for s in all_scenarios if any(part in s.name for part in args.only)]
+
+            results = {}
+            print(f"{'endpoint':<26} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for scenario in all_scenarios:
+                r = results[scenario.name] = await run_scenario(client, scenario, headers)
+                print(f"{scenario.name:<26} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}")
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+def _change(new: float, old: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(results: Dict[str, dict], baseline_path: str) -> List[str]:
+    """Print the change against a baseline; returns the endpoints past --max-regression."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    regressions = []
+    print(f"\n{'endpoint':<26} {'rps':>16} {'p95 ms':>17}")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<26} {'(new)':>16}")
+            continue
+        rps_change = _change(r["rps"], old["rps"])
+        p95_change = _change(r["p95_ms"], old["p95_ms"])
+        print(f"{name:<26} {r['rps']:>8} {rps_change:>+6.1f}% {r['p95_ms']:>9} {p95_change:>+6.1f}%")
+        if args.max_regression is not None and (-rps_change > args.max_regression or p95_change > args.max_regression):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    results = asyncio.run(run())
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": args.database_url.split(":", 1)[0],
+            "reviews": args.reviews if args.generate else None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        if regressions:
+            print(f"Regressed by more than {args.max_regression}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure autocomplete lookup latency and memory at a given number of keys.
+
+Builds a `PrefixIndex` of synthetic addresses (Zipf-distributed review
+counts), then times `suggest` for prefixes of 1-8 characters drawn from the
+indexed keys, and `add` for incremental updates. Memory is reported both as
+the index's own estimate and as measured by tracemalloc.
+
+    python scripts/bench_autocomplete.py --keys 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import List
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.autocomplete import PrefixIndex, address_keys  # noqa: E402
+
+STREETS = [
+    "Walnut St", "Chestnut St", "Spruce St", "Pine St", "Locust St", "Market St", "South St", "Broad St",
+    "Girard Ave", "Baltimore Ave", "Frankford Ave", "Germantown Ave", "Passyunk Ave", "Ridge Ave",
+    "Kensington Ave", "Lancaster Ave", "Oregon Ave", "Snyder Ave", "Washington Ave", "Christian St",
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the autocomplete prefix index.")
+    parser.add_argument("--keys", type=int, default=100_000, help="Distinct addresses to index.")
+    parser.add_argument("--lookups", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    addresses = set()
+    while len(addresses) < args.keys:
+        street = rng.choice(STREETS) if rng.random() < 0.5 else f"{rng.randint(1, 9999)}th St"
+        addresses.add(f"{rng.randint(1, 9999)} {street}, Philadelphia, PA 191{rng.randint(0, 54):02d}, USA")
+    counts = [int(rng.paretovariate(1.2)) for _ in addresses]
+
+    # Rows are built under tracemalloc so the key strings are counted too
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    rows = [(a, a, address_keys(a), count) for a, count in zip(addresses, counts)]
+    index = PrefixIndex("address")
+    index.load(rows)
+    load_seconds = time.perf_counter() - started
+    del rows
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    keys = [key for address in addresses for key in address_keys(address)]
+    prefixes = [key[: rng.randint(1, 8)] for key in rng.choices(keys, k=args.lookups)]
+    for prefix in prefixes[:1000]:
+        index.suggest(prefix, 10)  # warm the cached tops of popular prefixes
+
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix, 10)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+
+    adds = []
+    for address in rng.sample(sorted(addresses), 2000):
+        started = time.perf_counter()
+        index.add(address, address, address_keys(address))
+        adds.append((time.perf_counter() - started) * 1e6)
+    adds.sort()
+
+    print(f"{args.keys} addresses, {len(index)} search keys, loaded in {load_seconds:.2f}s")
+    print(f"memory: {index.memory_bytes() / 2**20:.1f} MiB estimated, {traced / 2**20:.1f} MiB traced")
+    print(
+        f"suggest (us): p50 {_percentile(timings, 50):.1f}  p95 {_percentile(timings, 95):.1f}  "
+        f"p99 {_percentile(timings, 99):.1f}  max {timings[-1]:.1f}"
+    )
+    print(f"add (us):     p50 {_percentile(adds, 50):.1f}  p99 {_percentile(adds, 99):.1f}")
+
+
+if __name__ == "__main__":
+    main()
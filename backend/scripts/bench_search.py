@@ -0,0 +1,148 @@
+"""Measure /reviews/search query latency on a large synthetic review table.
+
+Builds a scratch database (SQLite in a temp dir unless --database-url is
+given), bulk-inserts --reviews synthetic reviews, builds the full-text index
+and times `search.search` for a set of queries of varying selectivity, both
+the first page and the page after it.
+
+    python scripts/bench_search.py --reviews 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+parser = argparse.ArgumentParser(description="Benchmark full-text review search.")
+parser.add_argument("--reviews", type=int, default=1_000_000, help="Synthetic reviews to generate.")
+parser.add_argument("--database-url", help="Database to build in (default: a scratch SQLite file).")
+parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query.")
+parser.add_argument("--limit", type=int, default=20, help="Page size.")
+parser.add_argument("--seed", type=int, default=1)
+args = parser.parse_args()
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.TemporaryDirectory()
+    args.database_url = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = args.database_url
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text  # noqa: E402
+
+from app import models, search  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+LANDLORDS = [
+    "The Drake", "Korman Residential", "Post Brothers", "Greystar", "Private Owner", "Alterra Property Group",
+    "MMPartners", "Odin Properties", "Philly Living", "Mission Green", "Southwark Realty", "Parkway Corp",
+]
+STREETS = [
+    "Walnut St", "Chestnut St", "Spruce St", "Pine St", "Locust St", "Market St", "South St", "Broad St",
+    "Girard Ave", "Baltimore Ave", "Frankford Ave", "Germantown Ave", "Passyunk Ave", "Ridge Ave",
+]
+PHRASES = [
+    "the heater broke every winter", "there was black mold in the bathroom", "maintenance was quick to respond",
+    "the landlord never returned calls", "rent went up every year", "great location near the train",
+    "the kitchen had a leak under the sink", "pest control came monthly for roaches", "security deposit was returned in full",
+    "neighbors were noisy at night", "the laundry room was always broken", "windows were drafty and old",
+    "management was respectful and fair", "water pressure was terrible", "parking was impossible",
+    "the building felt safe", "they ignored the broken lock for weeks", "hot water ran out constantly",
+    "the porch ceiling was falling apart", "move in was smooth", "mice in the walls all winter",
+]
+
+
+def _reviews(count: int, rng: random.Random):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        text_ = ". ".join(rng.sample(PHRASES, 3)) + f". Unit tag u{i}."
+        street = rng.choice(STREETS)
+        yield {
+            "user_id": 1,
+            "landlord_name": rng.choice(LANDLORDS),
+            "overall_rating": rng.randint(1, 5),
+            "review_text": text_,
+            "property_address": f"{rng.randint(100, 4999)} {street}",
+            "formatted_address": f"{rng.randint(100, 4999)} {street}, Philadelphia, PA 191{rng.randint(0, 54):02d}, USA",
+            "geocode_status": "done",
+            "geocode_attempts": 0,
+            "is_anonymous": False,
+            "created_at": start + timedelta(seconds=i * 60),
+        }
+
+
+def _build(count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.seed)
+    table = models.Review.__table__
+    batch: List[dict] = []
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__).values(id=1, email="bench@example.com", hashed_password="x"))
+        for row in _reviews(count, rng):
+            batch.append(row)
+            if len(batch) == 10_000:
+                conn.execute(insert(table), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(table), batch)
+    print(f"inserted {count} reviews in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    # Built after the bulk load, so the rows are indexed in one rebuild pass
+    search.rebuild_index(engine)
+    print(f"built search index in {time.perf_counter() - started:.1f}s")
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _time(fn) -> List[float]:
+    fn()  # warm up
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def main() -> None:
+    _build(args.reviews)
+    queries = ["mold", "leak sink", "drake heater", "walnut", "roaches winter", f"u{args.reviews // 2}", "nonexistentword"]
+    session = SessionLocal()
+    try:
+        dialect = engine.dialect.name
+        print(f"\n{dialect}, {args.reviews} reviews, limit {args.limit}, {args.repeat} runs each (ms)")
+        print(f"{'query':<20} {'matches':>9} {'p50':>8} {'p95':>8} {'p2 p50':>8} {'p2 p95':>8}")
+        for q in queries:
+            expression = search._match_expression(search.query_terms(q), dialect)
+            if dialect == "sqlite":
+                count_sql = "SELECT count(*) FROM reviews_fts WHERE reviews_fts MATCH :query"
+            else:
+                count_sql = "SELECT count(*) FROM reviews WHERE search_vector @@ plainto_tsquery('english', :query)"
+            matches = session.execute(text(count_sql), {"query": expression}).scalar()
+
+            first = _time(lambda: search.search(session, q, args.limit))
+            _, cursor = search.search(session, q, args.limit)
+            second = _time(lambda: search.search(session, q, args.limit, cursor)) if cursor else [0.0]
+            print(
+                f"{q:<20} {matches:>9} {_percentile(first, 50):>8.2f} {_percentile(first, 95):>8.2f} "
+                f"{_percentile(second, 50):>8.2f} {_percentile(second, 95):>8.2f}"
+            )
+    finally:
+        session.close()
+        if scratch is not None:
+            scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
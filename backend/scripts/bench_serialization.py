@@ -0,0 +1,129 @@
+"""Compare list-page throughput of the Pydantic and trusted-output JSON paths.
+
+Fills a scratch SQLite database with reviews, then renders 100-row pages of
+`GET /reviews` to bytes, including the database query, in three ways:
+
+- pydantic: ORM rows -> `ReviewOut` per row -> `ReviewPage` -> FastAPI's
+  `response_model` validation and serialization (how the endpoint used to work)
+- fast_json (stdlib): column rows -> dicts -> `json.dumps`
+- fast_json (orjson): column rows -> dicts -> `orjson.dumps`
+
+    python scripts/bench_serialization.py --pages 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import fast_json, main as api, models, schemas  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.pagination import keyset_page  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def seed(count: int) -> None:
+    start = datetime(2023, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__).values(id=1, email="bench@example.com", hashed_password="x"))
+        conn.execute(insert(models.Review.__table__), [
+            {
+                "user_id": 1,
+                "landlord_name": f"Landlord {i % 50}",
+                "overall_rating": (i % 10) / 2,
+                "maintenance_rating": 3.5,
+                "communication_rating": 4.0 if i % 2 else None,
+                "monthly_rent": 1400 + i % 300,
+                "review_text": "Responsive management, thin walls, fair rent for the area. " * 4,
+                "property_address": f"{100 + i} Walnut St",
+                "formatted_address": f"{100 + i} Walnut St, Philadelphia, PA 19103, USA",
+                "latitude": 39.95,
+                "longitude": -75.17,
+                "geocode_status": "done",
+                "is_anonymous": i % 4 == 0,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(count)
+        ])
+
+
+def _response_field():
+    for route in api.app.routes:
+        if getattr(route, "path", None) == "/reviews" and "GET" in route.methods:
+            return route.secure_cloned_response_field
+    raise RuntimeError("GET /reviews route not found")
+
+
+async def render_pydantic(db, field, cursor):
+    reviews, next_cursor = keyset_page(
+        api._reviews_query(db), models.Review.created_at, models.Review.id, PAGE_SIZE, cursor
+    )
+    page = schemas.ReviewPage(items=api._serialize_reviews(reviews, None, db), next_cursor=next_cursor)
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body, next_cursor
+
+
+def render_fast(db, cursor, dumps):
+    page = api._list_reviews(db, PAGE_SIZE, cursor, None)
+    return dumps(page), page["next_cursor"]
+
+
+def _stdlib_dumps(document) -> bytes:
+    return json.dumps(document, default=fast_json._default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+async def measure(name, render, pages):
+    db = SessionLocal()
+    try:
+        cursor, rendered, size = None, 0, 0
+        started = time.perf_counter()
+        while rendered < pages:
+            result = render(db, cursor)
+            body, cursor = await result if asyncio.iscoroutine(result) else result
+            size += len(body)
+            rendered += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    print(f"{name:<20} {pages / elapsed:>9.1f} pages/s  {elapsed / pages * 1000:>7.2f} ms/page  {size / pages / 1024:>6.1f} KiB/page")
+    return pages / elapsed
+
+
+async def run(pages: int) -> None:
+    field = _response_field()
+    baseline = await measure("pydantic", lambda db, c: render_pydantic(db, field, c), pages)
+    results = {"fast_json (stdlib)": lambda db, c: render_fast(db, c, _stdlib_dumps)}
+    if fast_json.orjson is not None:
+        results["fast_json (orjson)"] = lambda db, c: render_fast(db, c, fast_json.orjson.dumps)
+    for name, render in results.items():
+        speed = await measure(name, render, pages)
+        print(f"{'':<20} {speed / baseline:>9.2f}x pydantic")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list page serialization paths.")
+    parser.add_argument("--pages", type=int, default=300, help="100-row pages rendered per path.")
+    args = parser.parse_args()
+
+    seed(args.pages * PAGE_SIZE + 1)
+    print(f"{args.pages} pages of {PAGE_SIZE} reviews, query included")
+    asyncio.run(run(args.pages))
+
+
+if __name__ == "__main__":
+    main()
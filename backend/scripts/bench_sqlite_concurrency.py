@@ -0,0 +1,217 @@
+"""Mixed read/write throughput on SQLite with and without the engine profile.
+
+Runs the same workload twice, each on a fresh scratch database: once with
+SQLITE_TUNING=false (rollback journal, SQLAlchemy's default pool) and once
+with the tuned profile (WAL, synchronous=NORMAL, mmap, cache size, busy
+timeout and a sized pool). --workers processes, like uvicorn workers, share
+the database, and --clients concurrent clients split between them drive the
+ASGI app in-process for --seconds. Each request is a review submission with
+probability --write-share, otherwise a feed page or a user's own reviews.
+Requires `httpx` (not an app dependency).
+
+    python scripts/bench_sqlite_concurrency.py --workers 4 --clients 32 --write-share 0.2
+    python scripts/bench_sqlite_concurrency.py --async-driver
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+parser = argparse.ArgumentParser(description="Benchmark SQLite under concurrent reads and writes.")
+parser.add_argument("--reviews", type=int, default=20_000, help="Synthetic reviews to start from.")
+parser.add_argument("--users", type=int, default=500)
+parser.add_argument("--workers", type=int, default=4, help="Processes sharing the database.")
+parser.add_argument("--clients", type=int, default=32, help="Concurrent clients across all workers.")
+parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each timed run.")
+parser.add_argument("--write-share", type=float, default=0.2, help="Fraction of requests that submit a review.")
+parser.add_argument("--async-driver", action="store_true", help="Use sqlite+aiosqlite instead of the sync driver.")
+parser.add_argument("--seed", type=int, default=1)
+# Internal: fill the database, or run one worker's load and print its results as JSON
+parser.add_argument("--child", choices=("generate", "load"), help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+PROFILES = {"default": "false", "tuned": "true"}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _summary(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def generate() -> None:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import generate_data
+
+    generate_data.generate(args.reviews, args.users, seed=args.seed)
+
+
+def load(worker: int) -> dict:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import httpx
+    from sqlalchemy import select
+
+    from app import auth, models
+    from app.database import SessionLocal
+    from app.main import app
+
+    db = SessionLocal()
+    try:
+        user_ids = db.execute(select(models.User.id).order_by(models.User.id).limit(200)).scalars().all()
+    finally:
+        db.close()
+    headers = [{"Authorization": f"Bearer {auth.create_access_token({'sub': str(uid)})}"} for uid in user_ids]
+
+    async def run() -> dict:
+        rng = random.Random(args.seed * 1000 + worker)
+        results: Dict[str, List[float]] = {"read": [], "write": []}
+        errors = {"read": 0, "write": 0}
+        statuses: Dict[str, int] = {}
+        await app.router.startup()
+        try:
+            # App exceptions ("database is locked") come back as 500 responses
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                cursors = []
+                cursor = None
+                for _ in range(20):
+                    params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+                    cursor = (await client.get("/reviews", params=params)).json()["next_cursor"]
+                    if not cursor:
+                        break
+                    cursors.append(cursor)
+
+                # Workers start together once all of them have loaded the app
+                await asyncio.sleep(max(0.0, float(os.environ["BENCH_START_AT"]) - time.time()))
+                deadline = time.perf_counter() + args.seconds
+                counter = iter(range(10**9))
+
+                async def client_loop() -> None:
+                    for i in counter:
+                        if time.perf_counter() >= deadline:
+                            return
+                        hdrs = headers[rng.randrange(len(headers))]
+                        if rng.random() < args.write_share:
+                            kind, ok = "write", 201
+                            request = client.post("/reviews", headers=hdrs, json={
+                                "landlord_name": f"Concurrency Landlord {(i * args.workers + worker) % 50}",
+                                "overall_rating": 1 + i % 5,
+                                "review_text": "Synthetic review written by bench_sqlite_concurrency.",
+                                "property_address": f"{100 + i % 900} Walnut St, Philadelphia, PA 19102",
+                                "move_in_date": None,
+                                "move_out_date": None,
+                            })
+                        elif rng.random() < 0.5:
+                            kind, ok = "read", 200
+                            params = {"limit": 20, **({"cursor": rng.choice(cursors)} if cursors else {})}
+                            request = client.get("/reviews", params=params)
+                        else:
+                            kind, ok = "read", 200
+                            request = client.get("/my-reviews", headers=hdrs, params={"limit": 20})
+                        start = time.perf_counter()
+                        response = await request
+                        results[kind].append(time.perf_counter() - start)
+                        if response.status_code != ok:
+                            errors[kind] += 1
+                            key = f"{kind} {response.status_code}"
+                            statuses[key] = statuses.get(key, 0) + 1
+
+                started = time.perf_counter()
+                await asyncio.gather(*(client_loop() for _ in range(max(1, args.clients // args.workers))))
+                elapsed = time.perf_counter() - started
+        finally:
+            await app.router.shutdown()
+        return {"latencies": results, "errors": errors, "failures": statuses, "elapsed": elapsed}
+
+    return asyncio.run(run())
+
+
+def _combine(outputs: List[dict]) -> dict:
+    elapsed = max(output["elapsed"] for output in outputs)
+    failures: Dict[str, int] = {}
+    for output in outputs:
+        for key, count in output["failures"].items():
+            failures[key] = failures.get(key, 0) + count
+    combined = {"failures": failures}
+    for kind in ("read", "write"):
+        latencies = [value for output in outputs for value in output["latencies"][kind]]
+        combined[kind] = _summary(latencies, sum(output["errors"][kind] for output in outputs), elapsed)
+    return combined
+
+
+def parent() -> None:
+    driver = "sqlite+aiosqlite" if args.async_driver else "sqlite"
+    print(
+        f"{args.workers} workers, {args.clients} clients, {args.write_share:.0%} writes, {args.seconds:g}s per profile, "
+        f"{args.reviews} reviews, {driver}"
+    )
+    results = {}
+    for name, tuning in PROFILES.items():
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"{driver}:///{os.path.join(scratch, 'bench.db')}",
+                SQLITE_TUNING=tuning,
+                DISABLE_RATE_LIMIT="true",
+                GEOCODE_WORKERS="0",
+                REQUEST_LOG_ENABLED="false",
+                SLOW_QUERY_MS="0",
+            )
+            command = [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--child"]
+            if subprocess.run([*command, "generate"], env=env, capture_output=True, text=True).returncode:
+                raise SystemExit(f"Generating data for the {name} run failed")
+            start_at = str(time.time() + 10)
+            workers = [
+                subprocess.Popen([*command, "load"], env=dict(env, BENCH_WORKER=str(worker), BENCH_START_AT=start_at),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                for worker in range(args.workers)
+            ]
+            outputs = []
+            for process in workers:
+                stdout, stderr = process.communicate()
+                if process.returncode:
+                    sys.stderr.write(stderr)
+                    raise SystemExit(f"A worker of the {name} run failed")
+                outputs.append(json.loads(stdout.strip().splitlines()[-1]))
+            results[name] = _combine(outputs)
+
+    print(f"\n{'profile':<9} {'kind':<6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in results.items():
+        for kind in ("read", "write"):
+            r = result[kind]
+            print(f"{name:<9} {kind:<6} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}")
+        if result["failures"]:
+            print(f"{'':<9} failures: {result['failures']}")
+    for kind in ("read", "write"):
+        before, after = results["default"][kind]["rps"], results["tuned"][kind]["rps"]
+        if before:
+            print(f"{kind} throughput: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    if args.child == "generate":
+        generate()
+    elif args.child == "load":
+        print(json.dumps(load(int(os.environ["BENCH_WORKER"]))))
+    else:
+        parent()
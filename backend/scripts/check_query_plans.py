@@ -0,0 +1,103 @@
+"""Index advisor: fail if any hot endpoint query falls back to a table scan.
+
+Runs the review/bookmark endpoints against a throwaway SQLite database,
+captures every SELECT they issue, and checks `EXPLAIN QUERY PLAN` for full
+table scans (`SCAN <table>` without an index) or sorts that need a temporary
+b-tree. Exits non-zero when an offender is found, so it can gate CI.
+"""
+
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a scratch database before it is imported
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'plans.db')}"
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+
+from app import export, fast_json, main as api, models, schemas
+from app.database import SessionLocal, engine
+
+_FULL_SCAN = re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)")
+_TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+
+
+def seed(session) -> models.User:
+    users = [models.User(email=f"plan{i}@example.com", hashed_password="x") for i in range(3)]
+    session.add_all(users)
+    session.flush()
+    start = datetime(2024, 1, 1)
+    for i in range(60):
+        session.add(models.Review(
+            user_id=users[i % 3].id,
+            landlord_name=f"Landlord {i % 7}",
+            overall_rating=3.0,
+            review_text="Query plan fixture review text.",
+            created_at=start + timedelta(hours=i),
+        ))
+    session.flush()
+    for i in range(1, 20):
+        session.add(models.Bookmark(user_id=users[0].id, review_id=i))
+    session.commit()
+    # Give the planner real statistics, as a long-lived database would have
+    session.execute(text("ANALYZE"))
+    return users[0]
+
+
+def capture_endpoint_sql(session, user):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        page = api._list_reviews(session, 10, None, user)
+        api._list_reviews(session, 10, page["next_cursor"], user)
+        for fields in (fast_json.PROJECTIONS["summary"], fast_json.PROJECTIONS["map"]):
+            api._list_reviews(session, 10, page["next_cursor"], user, fields)
+        page = api._list_my_reviews(session, 5, None, user, fast_json.FULL)
+        api._list_my_reviews(session, 5, page["next_cursor"], user, fast_json.FULL)
+        page = api._list_bookmarks(session, 5, None, user)
+        api._list_bookmarks(session, 5, page["next_cursor"], user)
+        until = export.watermark(session)
+        for chunk in export.stream("ndjson", until - timedelta(days=1), until, batch_size=50):
+            pass
+        api._create_bookmark(session, schemas.BookmarkCreate(review_id=42), user)
+        api._remove_bookmark(session, 42, user)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return statements
+
+
+def main() -> int:
+    session = SessionLocal()
+    try:
+        user = seed(session)
+        statements = capture_endpoint_sql(session, user)
+        failures = 0
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                details = [row[-1] for row in plan]
+                bad = [d for d in details if _FULL_SCAN.search(d) or _TEMP_SORT.search(d)]
+                if bad:
+                    failures += 1
+                    print("FAIL:", " ".join(statement.split()))
+                    for d in details:
+                        print("   ", d)
+        print(f"Checked {len(statements)} statements, {failures} without a usable index.")
+        return 1 if failures else 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
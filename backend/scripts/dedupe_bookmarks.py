@@ -0,0 +1,49 @@
+"""Remove duplicate bookmarks so the unique (user_id, review_id) index can be built.
+
+Databases created before the index existed may hold the same bookmark more
+than once; the oldest row of each set is kept and the index is then created.
+
+    python scripts/dedupe_bookmarks.py [--apply]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from app import models
+from app.database import SessionLocal, engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Remove duplicate bookmarks.")
+    parser.add_argument("--apply", action="store_true", help="Delete the duplicates (default: only count them).")
+    args = parser.parse_args()
+
+    keep = select(func.min(models.Bookmark.id)).group_by(models.Bookmark.user_id, models.Bookmark.review_id)
+    session = SessionLocal()
+    try:
+        duplicates = session.execute(
+            select(func.count()).select_from(models.Bookmark).where(models.Bookmark.id.not_in(keep))
+        ).scalar_one()
+        if not args.apply:
+            print(f"{duplicates} duplicate bookmarks; run with --apply to delete them.")
+            return
+        session.execute(models.Bookmark.__table__.delete().where(models.Bookmark.id.not_in(keep)))
+        session.commit()
+        print(f"Deleted {duplicates} duplicate bookmarks.")
+    finally:
+        session.close()
+
+    for index in models.Bookmark.__table__.indexes:
+        with engine.begin() as conn:
+            index.create(bind=conn, checkfirst=True)
+    print("Bookmark indexes are in place.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Generate a large synthetic dataset for load and scaling tests.
+
+Grows the demo seeder's model (its curated Philadelphia locations and
+amenities) out to any size: thousands of landlords owning properties around
+those neighbourhoods, thousands of users, millions of reviews spread over
+several years, and bookmarks where a few users save many reviews and a few
+reviews are saved by many users. Rows are written with bulk `insert()`
+executemany batches, then the search and spatial indexes, landlord stats and
+map grids are brought up to date.
+
+Uses `DATABASE_URL` like the app. Generated users share one password hash
+(`PASSWORD`), so logins work without hashing per user.
+
+    DATABASE_URL=sqlite:///./load.db python scripts/generate_data.py --reviews 1000000 --users 5000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import func, insert, select
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import geo, landlord_stats, landlords, map_tiles, response_cache, search  # noqa: E402
+from app.auth import get_password_hash  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Bookmark, Review, User  # noqa: E402
+from app.seeding import AMENITIES, PHILLY_LOCATIONS  # noqa: E402
+
+EMAIL_TEMPLATE = "synthetic{}@example.com"
+PASSWORD = "password123"
+
+# Approximate centres of the ZIP codes used by the curated locations
+ZIP_CENTRES = {
+    "19102": (39.9526, -75.1660), "19103": (39.9529, -75.1745), "19104": (39.9596, -75.1990),
+    "19106": (39.9490, -75.1470), "19107": (39.9510, -75.1590), "19121": (39.9810, -75.1790),
+    "19123": (39.9650, -75.1470), "19125": (39.9760, -75.1250), "19130": (39.9680, -75.1770),
+    "19143": (39.9440, -75.2290), "19145": (39.9230, -75.1850), "19146": (39.9390, -75.1840),
+    "19147": (39.9360, -75.1540),
+}
+# Typical rent by property category
+BASE_RENT = {"apartment": 1900, "house": 1450}
+
+SURNAMES = [
+    "Abbott", "Bennett", "Caruso", "Delgado", "Ellis", "Fitzgerald", "Greco", "Hoffman", "Iverson", "Jacobs",
+    "Kowalski", "Lombardi", "Murphy", "Nguyen", "O'Brien", "Patel", "Quinn", "Rossi", "Sullivan", "Thompson",
+    "Underwood", "Vasquez", "Walsh", "Xavier", "Young", "Zimmerman", "Brennan", "Castillo", "DiNardo", "Kaplan",
+    "McCarthy", "Novak", "Okafor", "Russo", "Schwartz", "Tran", "Washington", "Yoder", "Giordano", "Harper",
+]
+NOUNS = [
+    "Bridge", "Liberty", "Keystone", "Schuylkill", "Delaware", "Rittenhouse", "Fairmount", "Penn", "Franklin",
+    "Walnut", "Chestnut", "Spruce", "Society", "Logan", "Girard", "Kensington", "Fishtown", "Passyunk", "Queen",
+    "Northern", "Southport", "Riverside", "Cobblestone", "Brick", "Lantern", "Harbor", "Summit", "Union",
+    "Independence", "Elfreth",
+]
+SUFFIXES = ["Properties", "Realty", "Management", "Residential", "Homes", "Living", "Group", "LLC"]
+PHRASES = [
+    "The heater broke every winter", "Maintenance was quick to respond", "Rent went up every year",
+    "Great location near the train", "The kitchen had a leak under the sink", "Pest control came monthly",
+    "The security deposit was returned in full", "Neighbors were noisy at night", "Windows were drafty and old",
+    "Management was respectful and fair", "Water pressure was terrible", "The building felt safe",
+    "Hot water ran out constantly", "Move in was smooth", "There were mice in the walls all winter",
+]
+
+
+class Property(NamedTuple):
+    landlord_id: int
+    landlord_name: str
+    address: str
+    latitude: float
+    longitude: float
+    category: str
+    base_rating: float
+    base_rent: int
+
+
+def _skewed_index(rng: random.Random, n: int, power: float = 3.0) -> int:
+    """Index in [0, n) favouring small values: a few items take most of the picks."""
+    return min(n - 1, int(n * rng.random() ** power))
+
+
+def _landlord_names(count: int, rng: random.Random) -> List[str]:
+    names = list(dict.fromkeys(name for name, _, _ in PHILLY_LOCATIONS))
+    combos = [(surname, noun) for surname in SURNAMES for noun in NOUNS]
+    rng.shuffle(combos)
+    for surname, noun in combos[:max(0, count - len(names))]:
+        names.append(f"{surname} {noun} {rng.choice(SUFFIXES)}")
+    return names
+
+
+def create_landlords(session, count: int, rng: random.Random) -> List[Tuple[int, str]]:
+    """`(landlord_id, display name)` for `count` landlords, most of them synthetic."""
+    result = []
+    for name in _landlord_names(count, rng):
+        result.append((landlords.resolve_landlord(session, name), name))
+    session.commit()
+    return result
+
+
+def build_properties(
+    landlord_rows: List[Tuple[int, str]], count: int, rng: random.Random
+) -> List[Property]:
+    """Properties around the curated locations; large landlords own many of them."""
+    anchors = []
+    for _name, address, category in PHILLY_LOCATIONS:
+        street_part, _city, state_zip = (part.strip() for part in address.split(","))
+        anchors.append((street_part.split(" ", 1)[1], state_zip.split()[1], category))
+
+    private_owner = next(row for row in landlord_rows if row[1] == "Private Owner")
+    properties = []
+    for i in range(count):
+        street, zip_code, category = anchors[i % len(anchors)]
+        landlord_id, landlord_name = landlord_rows[_skewed_index(rng, len(landlord_rows), 2.0)]
+        if category == "house" and rng.random() < 0.5:
+            landlord_id, landlord_name = private_owner
+        lat, lng = ZIP_CENTRES[zip_code]
+        properties.append(Property(
+            landlord_id=landlord_id,
+            landlord_name=landlord_name,
+            address=f"{rng.randint(100, 4999)} {street}, Philadelphia, PA {zip_code}",
+            # About 400 m of scatter around the ZIP centre
+            latitude=round(lat + rng.gauss(0, 0.0036), 6),
+            longitude=round(lng + rng.gauss(0, 0.0047), 6),
+            category=category,
+            base_rating=min(5.0, max(0.5, rng.gauss(3.7, 0.7))),
+            base_rent=int(BASE_RENT[category] * rng.uniform(0.7, 1.5)),
+        ))
+    return properties
+
+
+def create_users(session, count: int) -> List[int]:
+    """Ids of `count` synthetic users, creating the missing ones."""
+    hashed = get_password_hash(PASSWORD)
+    emails = [EMAIL_TEMPLATE.format(i) for i in range(count)]
+    synthetic = select(User.email, User.id).where(User.email.like(EMAIL_TEMPLATE.format("%")))
+    existing = dict(session.execute(synthetic).all())
+    missing = [{"email": email, "hashed_password": hashed} for email in emails if email not in existing]
+    for start in range(0, len(missing), 10_000):
+        session.execute(insert(User.__table__), missing[start:start + 10_000])
+    session.commit()
+    by_email = dict(session.execute(synthetic).all()) if missing else existing
+    return [by_email[email] for email in emails]
+
+
+def _rating(rng: random.Random, base: float, spread: float) -> float:
+    return round(max(0.0, min(5.0, base + rng.uniform(-spread, spread))), 1)
+
+
+def _reviews(
+    count: int, properties: List[Property], user_ids: List[int], years: float, rng: random.Random
+) -> Iterator[dict]:
+    end = datetime.utcnow()
+    start = end - timedelta(days=365 * years)
+    step = (end - start) / max(count, 1)
+    for i in range(count):
+        prop = properties[_skewed_index(rng, len(properties), 1.5)]
+        created_at = start + step * i
+        overall = _rating(rng, prop.base_rating, 0.8)
+        move_out = created_at.date() - timedelta(days=rng.randint(0, 60))
+        geocoded = rng.random() > 0.02
+        name = prop.landlord_name if rng.random() > 0.1 else prop.landlord_name.lower()
+        yield {
+            "user_id": user_ids[_skewed_index(rng, len(user_ids), 1.5)],
+            "landlord_name": name,
+            "landlord_id": prop.landlord_id,
+            "property_address": prop.address,
+            "formatted_address": f"{prop.address}, USA" if geocoded else None,
+            "latitude": prop.latitude if geocoded else None,
+            "longitude": prop.longitude if geocoded else None,
+            "geocode_status": "done" if geocoded else "failed",
+            "geocode_attempts": 1,
+            "overall_rating": overall,
+            "maintenance_rating": _rating(rng, overall, 1.0),
+            "communication_rating": _rating(rng, overall, 1.0) if rng.random() > 0.1 else None,
+            "respect_rating": _rating(rng, overall, 0.6) if rng.random() > 0.1 else None,
+            "rent_value_rating": _rating(rng, overall, 1.0) if rng.random() > 0.2 else None,
+            "would_rent_again": overall >= 3.5 and rng.random() > 0.15,
+            "monthly_rent": int(prop.base_rent * rng.uniform(0.9, 1.15)) if rng.random() > 0.1 else None,
+            "move_in_date": move_out - timedelta(days=rng.randint(180, 1100)),
+            "move_out_date": move_out,
+            "is_anonymous": rng.random() < 0.25,
+            "review_text": (
+                f"Lived at {prop.address.split(',')[0]} with {prop.landlord_name}. "
+                f"We appreciated the {rng.choice(AMENITIES)}, though there was {rng.choice(AMENITIES)}. "
+                f"{rng.choice(PHRASES)}. {rng.choice(PHRASES)}. "
+                f"Overall experience was {'positive' if overall >= 3.5 else 'mixed'}."
+            ),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def _insert_batches(session, table, rows: Iterator[dict], batch_size: int, label: str) -> int:
+    batch, total, started = [], 0, time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            session.execute(insert(table), batch)
+            session.commit()
+            total += len(batch)
+            batch.clear()
+            print(f"  {label}: {total} ({total / (time.perf_counter() - started):.0f}/s)", end="\r", flush=True)
+    if batch:
+        session.execute(insert(table), batch)
+        session.commit()
+        total += len(batch)
+    print(f"  {label}: {total} in {time.perf_counter() - started:.1f}s" + " " * 20)
+    return total
+
+
+def _review_ids(session, after_id: int, count: int) -> Sequence[int]:
+    first, last = session.execute(
+        select(func.min(Review.id), func.max(Review.id)).where(Review.id > after_id)
+    ).one()
+    if first is not None and last - first + 1 == count:
+        return range(first, last + 1)
+    return session.execute(select(Review.id).where(Review.id > after_id).order_by(Review.id)).scalars().all()
+
+
+def _bookmarks(
+    user_ids: List[int], review_ids: Sequence[int], per_user: float, rng: random.Random
+) -> Iterator[dict]:
+    now = datetime.utcnow()
+    n = len(review_ids)
+    # Scatter popularity ranks across the table so popular reviews are not all the oldest
+    stride = next((p for p in (1_000_003, 999_983, 104_729) if math.gcd(p, n) == 1), 1)
+    for user_id in user_ids:
+        # Heavy-tailed: most users save a few reviews, some save hundreds
+        wanted = min(max(1, n // 10), int(rng.paretovariate(1.5) * per_user / 3))
+        chosen: Dict[int, None] = {}
+        while len(chosen) < wanted:
+            chosen[review_ids[(_skewed_index(rng, n) * stride) % n]] = None
+        for review_id in chosen:
+            yield {
+                "user_id": user_id,
+                "review_id": review_id,
+                "created_at": now - timedelta(minutes=rng.randint(0, 525_600)),
+            }
+
+
+def generate(
+    reviews: int,
+    users: int,
+    landlord_count: int = 1000,
+    bookmarks_per_user: float = 8.0,
+    years: float = 5.0,
+    batch_size: int = 10_000,
+    seed: int = 1,
+) -> Dict[str, int]:
+    """Add the synthetic dataset to the configured database; returns row counts."""
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        landlord_rows = create_landlords(session, landlord_count, rng)
+        user_ids = create_users(session, users)
+        properties = build_properties(landlord_rows, max(len(PHILLY_LOCATIONS), reviews // 20), rng)
+
+        before = session.execute(select(func.coalesce(func.max(Review.id), 0))).scalar_one()
+        inserted = _insert_batches(
+            session, Review.__table__, _reviews(reviews, properties, user_ids, years, rng), batch_size, "reviews"
+        )
+        review_ids = _review_ids(session, before, inserted)
+        saved = _insert_batches(
+            session, Bookmark.__table__, _bookmarks(user_ids, review_ids, bookmarks_per_user, rng), batch_size, "bookmarks"
+        ) if review_ids else 0
+
+        started = time.perf_counter()
+        # Creates the indexes if missing, indexing every row; otherwise their
+        # triggers already covered the inserts
+        with engine.begin() as conn:
+            search.ensure_index(conn)
+            geo.ensure_index(conn)
+        landlord_stats.rebuild(session)
+        map_tiles.rebuild(session)
+        response_cache.bump(session)
+        session.commit()
+        print(f"  indexes and aggregates: {time.perf_counter() - started:.1f}s")
+    finally:
+        session.close()
+    return {"landlords": len(landlord_rows), "users": len(user_ids), "reviews": inserted, "bookmarks": saved}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset.")
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--landlords", type=int, default=1000, help="At most 1200 plus the curated ones.")
+    parser.add_argument("--bookmarks-per-user", type=float, default=8.0, help="Mean bookmarks per user.")
+    parser.add_argument("--years", type=float, default=5.0, help="Span of review creation dates.")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Generating into {engine.url.render_as_string(hide_password=True)}")
+    counts = generate(
+        args.reviews, args.users, args.landlords, args.bookmarks_per_user, args.years, args.batch_size, args.seed
+    )
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
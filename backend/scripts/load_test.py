@@ -0,0 +1,159 @@
+"""Compare sustained throughput and tail latency of the sync and async DB modes.
+
+For each mode a fresh uvicorn server is started on a scratch SQLite database
+(`sqlite://` for sync, `sqlite+aiosqlite://` for async), seeded with a user
+and some reviews, then driven by concurrent clients issuing a mix of
+anonymous and signed-in reads. Requires `httpx` (not an app dependency).
+
+    python scripts/load_test.py --concurrency 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "sync": "sqlite:///{path}",
+    "async": "sqlite+aiosqlite:///{path}",
+}
+EMAIL = "loadtest@example.com"
+PASSWORD = "password123"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def _seed(client: httpx.AsyncClient, reviews: int) -> Dict[str, str]:
+    await client.post("/signup", json={"email": EMAIL, "password": PASSWORD})
+    token = (await client.post("/login", data={"username": EMAIL, "password": PASSWORD})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(reviews):
+        await client.post("/reviews", headers=headers, json={
+            "landlord_name": f"Load Test Landlord {i % 10}",
+            "overall_rating": 3 + (i % 3),
+            "review_text": "Synthetic review used by the load test harness.",
+            "move_in_date": None,
+            "move_out_date": None,
+        })
+    return headers
+
+
+async def _drive(base_url: str, concurrency: int, duration: float, reviews: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await _wait_ready(client)
+        headers = await _seed(client, reviews)
+        requests_mix = [
+            ("/reviews?limit=20", None),
+            ("/reviews?limit=20", headers),
+            ("/my-reviews?limit=20", headers),
+        ]
+
+        latencies: List[float] = []
+        errors = 0
+        stop_at = time.monotonic() + duration
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.monotonic() < stop_at:
+                path, hdrs = requests_mix[i % len(requests_mix)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=hdrs)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_mode(mode: str, concurrency: int, duration: float, reviews: int) -> dict:
+    db_path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=MODES[mode].format(path=db_path),
+        DISABLE_RATE_LIMIT="true",
+        GEOCODE_WORKERS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        return asyncio.run(_drive(f"http://127.0.0.1:{port}", concurrency, duration, reviews))
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the API in sync and async DB modes.")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode")
+    parser.add_argument("--reviews", type=int, default=200, help="Reviews to seed before measuring")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["sync", "async"])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args.concurrency, args.duration, args.reviews) for mode in args.modes}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Recompute the landlord_stats table from reviews in one streaming pass.
+
+By default only reports drift (rows missing, stale or orphaned) and exits
+non-zero if any is found. Pass --apply to rewrite the drifted rows.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import landlord_stats
+from app.database import Base, SessionLocal, engine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild per-landlord aggregates from reviews.")
+    parser.add_argument("--apply", action="store_true", help="Rewrite drifted rows instead of only reporting them.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per round trip while streaming.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        drifted = landlord_stats.rebuild(session, apply=args.apply, batch_size=args.batch_size)
+        for key in drifted:
+            print(f"drift: {key}")
+        if args.apply:
+            session.commit()
+            print(f"Rebuilt {len(drifted)} landlord rows.")
+            return 0
+        print(f"{len(drifted)} landlord rows out of sync.")
+        return 1 if drifted else 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Recompute the map clustering grids (map_cells) from review coordinates.
+
+Cells are updated incrementally as reviews are geocoded; run this after
+changing coordinates outside the app, or after changing the grid levels.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import map_tiles, response_cache
+from app.database import Base, SessionLocal, engine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild map tile clusters from reviews.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per round trip while streaming and inserting.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        cells = map_tiles.rebuild(session, batch_size=args.batch_size)
+        response_cache.bump(session)
+        session.commit()
+        print(f"Rebuilt {cells} map cells.")
+        return 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""List fuzzy landlord merges, or undo one.
+
+Without arguments, prints every alias: a name key that was linked to an
+existing landlord because the names were similar. `--alias ID` gives that key
+its own landlord, moves its reviews there and rebuilds landlord stats.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the Python path to import from app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app import landlord_stats, landlords, models, response_cache
+from app.database import Base, SessionLocal, engine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List or undo fuzzy landlord merges.")
+    parser.add_argument("--alias", type=int, help="Id of the alias to split back out.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        if args.alias is None:
+            rows = session.execute(
+                select(models.LandlordAlias, models.Landlord.name)
+                .join(models.Landlord, models.Landlord.id == models.LandlordAlias.landlord_id)
+                .order_by(models.LandlordAlias.similarity)
+            ).all()
+            for alias, name in rows:
+                print(f"{alias.id}: {alias.normalized_key!r} -> {name!r} (landlord {alias.landlord_id}, similarity {alias.similarity:.2f})")
+            print(f"{len(rows)} merges.")
+            return 0
+
+        try:
+            landlord_id, moved = landlords.unmerge(session, args.alias)
+        except LookupError as exc:
+            print(exc)
+            return 1
+        landlord_stats.rebuild(session)
+        response_cache.bump(session)
+        session.commit()
+        print(f"Moved {moved} reviews to landlord {landlord_id}.")
+        return 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Shared fixtures: the app on a scratch SQLite database.
+
+The environment is set before `app` is imported, because `app.config` and
+`app.database` read it at import time.
+"""
+
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ.setdefault("APP_ENV", "dev")
+os.environ.setdefault("GEOCODE_WORKERS", "0")
+os.environ.setdefault("REQUEST_LOG_ENABLED", "false")
+# Keep signups cheap; the cost factor is not under test
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app import auth, models, response_cache  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Insert a user with a unique email; returns (user_id, auth headers)."""
+    def make():
+        email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+        user_id = db.execute(
+            insert(models.User).values(email=email, hashed_password="x").returning(models.User.id)
+        ).scalar_one()
+        db.commit()
+        token = auth.create_access_token({"sub": str(user_id)})
+        return user_id, {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def make_reviews(db):
+    """Insert `count` reviews by `user_id`; returns their ids."""
+    def make(user_id, count, **values):
+        rows = [
+            {
+                "user_id": user_id,
+                "landlord_name": f"Test Landlord {i}",
+                "overall_rating": 4.0,
+                "review_text": "Quiet building, responsive manager.",
+                "property_address": f"{100 + i} Walnut St, Philadelphia, PA 19103",
+                "geocode_status": "done",
+                **values,
+            }
+            for i in range(count)
+        ]
+        ids = db.execute(insert(models.Review).returning(models.Review.id), rows).scalars().all()
+        # Cached feeds are keyed by content version
+        response_cache.bump(db)
+        db.commit()
+        return ids
+    return make
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run on the sync engine inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def query_counter():
+    return count_queries
@@ -0,0 +1,69 @@
+"""The app end to end on the async engine (aiosqlite).
+
+The engine is chosen when `app.database` is imported, and this test session
+already uses the sync one, so the flow runs in a fresh interpreter.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+FLOW = textwrap.dedent('''
+    from fastapi.testclient import TestClient
+
+    from app import database
+    from app.main import app
+
+    assert database.is_async and database.async_engine is not None
+
+    with TestClient(app) as client:
+        credentials = {"email": "async@example.com", "password": "correct horse"}
+        assert client.post("/signup", json=credentials).status_code == 201
+        login = client.post("/login", json=credentials)
+        assert login.status_code == 200, login.text
+        headers = {"Authorization": "Bearer " + login.json()["access_token"]}
+
+        review = {
+            "landlord_name": "Async Property Group",
+            "overall_rating": 4,
+            "monthly_rent": 1300,
+            "review_text": "Quick repairs and a landlord who answers the phone.",
+            "move_in_date": None,
+            "move_out_date": None,
+        }
+        created = client.post("/reviews", json=review, headers=headers)
+        assert created.status_code == 201, created.text
+        review_id, landlord_id = created.json()["id"], created.json()["landlord_id"]
+
+        assert client.post("/bookmarks", json={"review_id": review_id}, headers=headers).status_code == 201
+        page = client.get("/reviews", headers=headers).json()
+        assert [(item["id"], item["is_bookmarked"]) for item in page["items"]] == [(review_id, True)]
+        assert client.get("/bookmarks", headers=headers).json()["items"][0]["review"]["id"] == review_id
+        assert [item["id"] for item in client.get("/my-reviews", headers=headers).json()["items"]] == [review_id]
+        assert client.get(f"/landlords/{landlord_id}/stats").json()["rent_mean"] == 1300
+        hits = client.get("/reviews/search", params={"q": "repairs"}).json()["items"]
+        assert [hit["review"]["id"] for hit in hits] == [review_id]
+        assert client.get("/autocomplete", params={"q": "async"}).json()[0]["landlord_id"] == landlord_id
+        assert client.delete(f"/bookmarks/{review_id}", headers=headers).status_code == 204
+    print("async flow ok")
+''')
+
+
+def test_async_engine_serves_the_api(tmp_path):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'async.db'}",
+        APP_ENV="dev",
+        GEOCODE_WORKERS="0",
+        REQUEST_LOG_ENABLED="false",
+        BCRYPT_ROUNDS="4",
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", FLOW], cwd=BACKEND, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-4000:]
+    assert "async flow ok" in result.stdout
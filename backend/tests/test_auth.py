@@ -0,0 +1,72 @@
+"""Password hashing runs on a bounded pool and upgrades outdated hashes."""
+
+import asyncio
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app import auth, models
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _limit():
+    return auth.settings.password_hash_workers + auth.settings.password_hash_max_queue
+
+
+@pytest.mark.anyio
+async def test_saturated_pool_sheds_with_503():
+    release = threading.Event()
+    # Every worker busy and every queue slot taken
+    jobs = [asyncio.ensure_future(auth._run_hash_job(release.wait, 5)) for _ in range(_limit())]
+    await asyncio.sleep(0)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            await auth.hash_password("correct horse battery staple")
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        await asyncio.gather(*jobs)
+
+    # Capacity comes back once the jobs finish
+    assert auth.verify_password("pw", await auth.hash_password("pw"))
+
+
+def _user(db, password, hashed_password=None):
+    email = f"user-{uuid.uuid4().hex[:8]}@example.com"
+    user = models.User(email=email, hashed_password=hashed_password or auth.get_password_hash(password))
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_login_returns_503_when_saturated(client, db, monkeypatch):
+    user = _user(db, "whatever")
+    monkeypatch.setattr(auth, "_hash_jobs_in_flight", _limit())
+    response = client.post("/login", json={"email": user.email, "password": "whatever"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_an_outdated_cost(client, db):
+    password = "correct horse battery staple"
+    old_hash = bcrypt.using(rounds=auth.settings.bcrypt_rounds + 1).hash(password)
+    user = _user(db, password, old_hash)
+    email = user.email
+
+    assert client.post("/login", json={"email": email, "password": password}).status_code == 200
+
+    db.expire_all()
+    new_hash = db.get(models.User, user.id).hashed_password
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${auth.settings.bcrypt_rounds:02d}$")
+    assert auth.verify_password(password, new_hash)
+    # And the upgraded hash still signs in
+    assert client.post("/login", json={"email": email, "password": password}).status_code == 200
@@ -0,0 +1,74 @@
+"""Prefix suggestions: matching, top-k order, and updates from submissions."""
+
+import uuid
+from datetime import datetime, timedelta
+
+from app import autocomplete, geocode_queue
+from app.autocomplete import PrefixIndex, address_keys, landlord_keys
+
+
+def _texts(entries):
+    return [entry.text for entry in entries]
+
+
+def test_prefix_matching_and_ranking():
+    index = PrefixIndex("address")
+    index.load(
+        (text, text, address_keys(text), count)
+        for text, count in [
+            ("1520 Walnut St", 3), ("15 Walnut Ln", 3), ("200 Wallace St", 7), ("9 Pine St", 50),
+        ]
+    )
+
+    # Most reviewed first, ties alphabetical; the house number is optional
+    assert _texts(index.suggest("wal", 10)) == ["200 Wallace St", "15 Walnut Ln", "1520 Walnut St"]
+    assert _texts(index.suggest("  WALNUT   s", 10)) == ["1520 Walnut St"]
+    assert _texts(index.suggest("152", 10)) == ["1520 Walnut St"]
+    assert _texts(index.suggest("wal", 1)) == ["200 Wallace St"]
+    assert index.suggest("walk", 10) == [] and index.suggest(" ", 10) == []
+
+
+def test_popular_prefix_top_k_stays_current():
+    index = PrefixIndex("landlord")
+    count = autocomplete.SCAN_LIMIT + 50
+    index.load((i, f"Oak {i:04d}", landlord_keys(f"Oak {i:04d}"), i % 7) for i in range(count))
+
+    def brute_force(limit):
+        entries = sorted(index._entries.values(), key=lambda entry: entry.rank())
+        return _texts(entries[:limit])
+
+    assert _texts(index.suggest("oak", 5)) == brute_force(5)
+    # Counts change after the prefix's top list was cached
+    for _ in range(10):
+        index.add(3, "Oak 0003", landlord_keys("Oak 0003"))
+    index.add(count, "Oak New", landlord_keys("Oak New"), delta=8)
+    assert _texts(index.suggest("oak", 5))[:2] == ["Oak 0003", "Oak New"]
+    assert _texts(index.suggest("oak", autocomplete.MAX_SUGGESTIONS)) == brute_force(autocomplete.MAX_SUGGESTIONS)
+
+
+def test_submitted_landlord_and_geocoded_address_are_suggested(client, make_user, make_reviews):
+    tag = uuid.uuid4().hex[:8]
+    _, headers = make_user()
+    review = {
+        "landlord_name": f"Zephyr {tag} Properties",
+        "overall_rating": 4,
+        "review_text": "Heating works, rent is fair, lease was clear.",
+        "move_in_date": None,
+        "move_out_date": None,
+    }
+    for _ in range(2):
+        landlord_id = client.post("/reviews", json=review, headers=headers).json()["landlord_id"]
+
+    suggestions = client.get("/autocomplete", params={"q": f"zephyr {tag}", "kind": "landlord"}).json()
+    assert suggestions == [{
+        "kind": "landlord", "text": f"Zephyr {tag} Properties", "review_count": 2, "landlord_id": landlord_id,
+    }]
+
+    user_id, _ = make_user()
+    make_reviews(user_id, 1, geocode_status="pending", geocode_next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+    address = f"77 {tag} Ave, Philadelphia, PA 19104"
+    geocode_queue.drain(lambda raw: {"formatted_address": address, "latitude": 39.95, "longitude": -75.19})
+
+    suggestions = client.get("/autocomplete", params={"q": f"{tag} av"}).json()
+    assert suggestions == [{"kind": "address", "text": address, "review_count": 1, "landlord_id": None}]
+    assert client.get("/autocomplete", params={"q": "x", "kind": "street"}).status_code == 400
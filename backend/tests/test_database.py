@@ -0,0 +1,24 @@
+"""Engine setup: the SQLite connection profile."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.database import engine, settings
+
+
+def test_new_connections_get_the_sqlite_profile():
+    with engine.connect() as conn:
+        pragma = conn.exec_driver_sql
+        assert pragma("PRAGMA journal_mode").scalar() == settings.sqlite_journal_mode == "wal"
+        # 1 is NORMAL
+        assert pragma("PRAGMA synchronous").scalar() == 1
+        assert pragma("PRAGMA busy_timeout").scalar() == settings.sqlite_busy_timeout_ms
+        assert pragma("PRAGMA cache_size").scalar() == -settings.sqlite_cache_size_mb * 1024
+
+
+def test_unknown_pragma_keywords_are_rejected():
+    with pytest.raises(ValidationError):
+        Settings(sqlite_journal_mode="wall")
+    with pytest.raises(ValidationError):
+        Settings(sqlite_synchronous="normal; PRAGMA foreign_keys=off")
@@ -0,0 +1,57 @@
+"""Incremental exports never skip a review, even one committed late."""
+
+import json
+from datetime import datetime, timedelta
+
+from app import export
+
+
+def _exported_ids(client, headers, since):
+    response = client.get("/export/reviews", params={"since": since}, headers=headers)
+    assert response.status_code == 200
+    ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+    return ids, response.headers["X-Export-Watermark"]
+
+
+def test_chained_exports_include_late_and_tied_reviews(client, make_user, make_reviews, monkeypatch):
+    user_id, headers = make_user()
+    now = datetime.utcnow()
+    start = (now - timedelta(minutes=10)).isoformat()
+    tied = make_reviews(user_id, 2, created_at=now - timedelta(minutes=5))
+    # Stamped before the export starts but, in a real race, committed after it
+    (late,) = make_reviews(user_id, 1, created_at=now - timedelta(seconds=5))
+
+    first, mark = _exported_ids(client, headers, start)
+    assert set(tied) <= set(first) and late not in first
+    assert datetime.fromisoformat(mark) < now - timedelta(seconds=5)
+
+    monkeypatch.setattr(export.settings, "export_safety_lag_seconds", 0)
+    second, _ = _exported_ids(client, headers, mark)
+    assert late in second and not set(tied) & set(second)
+
+
+def test_accept_encoding_parsing():
+    assert export.accepts_gzip("gzip")
+    assert export.accepts_gzip("br, GZIP;q=0.5")
+    assert export.accepts_gzip("*")
+    assert not export.accepts_gzip("")
+    assert not export.accepts_gzip("gzip;q=0")
+    assert not export.accepts_gzip("gzip; q=0.0, *")
+    assert not export.accepts_gzip("x-gzip, deflate")
+    assert not export.accepts_gzip("*;q=0")
+    assert not export.accepts_gzip("gzip;q=bogus")
+
+
+def test_gzip_only_when_accepted(client, make_user, make_reviews):
+    user_id, headers = make_user()
+    make_reviews(user_id, 1, created_at=datetime.utcnow() - timedelta(minutes=5))
+
+    refused = client.get("/export/reviews", headers={**headers, "Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in refused.headers
+    assert refused.headers["Vary"] == "Accept-Encoding"
+    json.loads(refused.text.splitlines()[0])
+
+    compressed = client.get("/export/reviews", headers={**headers, "Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert compressed.text == refused.text
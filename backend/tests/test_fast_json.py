@@ -0,0 +1,95 @@
+"""The row serializer matches the Pydantic output it replaces."""
+
+from datetime import date, datetime
+
+import pytest
+
+from app import fast_json, models
+from app import main as api
+
+ROWS = [
+    # Every optional field set, a datetime with microseconds, non-ASCII text
+    dict(
+        landlord_name="Łódź Property Management — Zoë & Søn",
+        overall_rating=4.5, maintenance_rating=3.0, communication_rating=5.0, respect_rating=4.0,
+        rent_value_rating=2.5, would_rent_again=True, monthly_rent=1450,
+        review_text="Radiators hiss 🔥 all winter; the super speaks 日本語 and fixes things fast.",
+        property_address="12 Rue de l’Église, Apt 3", move_in_date=date(2021, 9, 1), move_out_date=date(2023, 8, 31),
+        formatted_address="12 Rue de l’Église, Montréal, QC", latitude=45.5017, longitude=-73.5673,
+        created_at=datetime(2024, 2, 29, 23, 59, 59, 123456), geocode_status="done",
+    ),
+    # Every optional field None, a whole-second datetime
+    dict(
+        landlord_name="Plain Landlord", overall_rating=3.0, maintenance_rating=None, communication_rating=None,
+        respect_rating=None, rent_value_rating=None, would_rent_again=False, monthly_rent=None,
+        review_text="Nothing remarkable, rent went up every year.", property_address=None,
+        move_in_date=None, move_out_date=None, formatted_address=None, latitude=None, longitude=None,
+        created_at=datetime(2024, 1, 1, 0, 0, 0), geocode_status="none",
+    ),
+    # Anonymous, so the author email is hidden
+    dict(
+        landlord_name="Quiet Holdings", overall_rating=1.0, is_anonymous=True,
+        review_text="Would not recommend; deposit never returned.", created_at=datetime(2023, 6, 15, 8, 30, 0, 5),
+    ),
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    return request.param
+
+
+def test_documents_match_review_out(db, make_user, make_reviews, encoder):
+    user_id, _ = make_user()
+    ids = [make_reviews(user_id, 1, **row)[0] for row in ROWS]
+
+    rows = api._review_rows(db).filter(models.Review.id.in_(ids)).order_by(models.Review.id).all()
+    reviews = api._reviews_query(db).filter(models.Review.id.in_(ids)).order_by(models.Review.id).all()
+    assert len(rows) == len(reviews) == len(ROWS)
+
+    for row, review in zip(rows, reviews):
+        for bookmarked in (False, True):
+            expected = api._serialize_review(review, bookmarked).model_dump_json().encode()
+            assert fast_json.dumps(fast_json.review_document(row, is_bookmarked=bookmarked)) == expected
+
+
+@pytest.mark.parametrize("view", ["summary", "map"])
+def test_views_return_only_their_fields(client, make_user, make_reviews, query_counter, view):
+    user_id, headers = make_user()
+    make_reviews(user_id, 2)
+    expected = list(fast_json.PROJECTIONS[view])
+
+    for path in ("/reviews", "/my-reviews"):
+        with query_counter() as statements:
+            response = client.get(path, params={"view": view, "limit": 2}, headers=headers)
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert items and all(list(item) == expected for item in items)
+        # The text column is not even read
+        assert not [s for s in statements if "review_text" in s]
+
+
+def test_fields_list_keeps_output_order_and_adds_id(client, make_user, make_reviews):
+    user_id, _ = make_user()
+    make_reviews(user_id, 1)
+
+    response = client.get("/reviews", params={"fields": " latitude,landlord_name , latitude", "limit": 1})
+    assert response.status_code == 200
+    assert list(response.json()["items"][0]) == ["landlord_name", "id", "latitude"]
+    # Equivalent lists share one cache key
+    assert fast_json.parse_fields(fields="latitude,landlord_name") == fast_json.parse_fields(fields="landlord_name,latitude")
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"fields": "landlord_name,password_hash"}, "Unknown fields: password_hash"),
+    ({"fields": ""}, "fields must name at least one"),
+    ({"fields": " , "}, "fields must name at least one"),
+    ({"view": "everything"}, "view must be one of"),
+    ({"view": "map", "fields": "id"}, "either view or fields"),
+])
+def test_bad_projection_is_rejected(client, params, detail):
+    response = client.get("/reviews", params=params)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
@@ -0,0 +1,40 @@
+"""Local address lookups, with and without commas and ZIP codes."""
+
+import pytest
+
+from app.gazetteer import Gazetteer, parse_address
+
+POINTS = """house_number,street,zip_code,latitude,longitude
+1200,Market St,19107,39.9510,-75.1600
+1300,Market St,19107,39.9520,-75.1620
+1235,Market St,19103,39.9530,-75.1640
+"""
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "points.csv"
+    path.write_text(POINTS)
+    return Gazetteer.from_csv(str(path))
+
+
+@pytest.mark.parametrize("address", [
+    "1234 Market St, Philadelphia, PA 19107",
+    "1234 Market St Philadelphia PA 19107",
+    "1234 Market Street Phila PA 19107-1234 USA",
+])
+def test_parse_address_strips_city_state_and_zip(address):
+    assert parse_address(address) == (1234, "market st", "19107")
+
+
+def test_lookup_without_commas(gazetteer):
+    location = gazetteer.lookup("1250 Market St Philadelphia PA 19107")
+    assert location["formatted_address"] == "1250 Market St, Philadelphia, PA 19107"
+    assert location["latitude"] == pytest.approx(39.9515)
+
+
+def test_lookup_falls_back_when_zip_has_no_points_on_that_side(gazetteer):
+    # 19103 only has an odd-numbered point; the even side comes from the whole street
+    location = gazetteer.lookup("1250 Market St Philadelphia PA 19103")
+    assert location is not None
+    assert location["latitude"] == pytest.approx(39.9515)
@@ -0,0 +1,24 @@
+"""Spatial queries fall back to a plain scan when the index cannot be built."""
+
+from app import geo
+from app.database import engine
+
+
+def test_missing_rtree_module_falls_back_to_scan(client, make_user, make_reviews, monkeypatch, caplog):
+    monkeypatch.setattr(geo._index, "available", True)
+    monkeypatch.setattr(geo, "_SQLITE_SCHEMA", ["CREATE VIRTUAL TABLE reviews_rtree_probe USING no_such_module()"])
+    with engine.begin() as conn:
+        assert geo.ensure_index(conn) is False
+    assert not geo._index.available
+    assert "Spatial index unavailable" in caplog.text
+
+    user_id, _ = make_user()
+    # Off the Philadelphia map, so other tests' reviews are not in range
+    near, far = make_reviews(user_id, 2, latitude=-41.2865, longitude=174.7762)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE reviews SET latitude = -41.30 WHERE id = ?", (far,))
+
+    body = client.get("/reviews/near", params={"lat": -41.2865, "lng": 174.7762, "radius_m": 5000}).json()
+    assert [item["review"]["id"] for item in body["items"]] == [near, far]
+    body = client.get("/reviews/within", params={"bbox": "174.7,-41.29,174.8,-41.28"}).json()
+    assert [item["review"]["id"] for item in body["items"]] == [near]
@@ -0,0 +1,186 @@
+"""The geocode cache: what it stores, when it writes, and how it counts."""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import google_maps, models
+from app.database import SessionLocal
+
+RESULT = {"formatted_address": "1 Market St, Philadelphia, PA", "latitude": 39.95, "longitude": -75.16}
+
+
+def _key():
+    return f"{uuid.uuid4().hex} market st"
+
+
+def test_hit_touches_last_used_at_at_most_hourly(db, query_counter):
+    key = _key()
+    google_maps._cache_put(db, key, RESULT)
+
+    with query_counter() as statements:
+        assert google_maps._cache_get(db, key) == (True, RESULT)
+    assert not [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+
+    stale = datetime.utcnow() - timedelta(hours=2)
+    db.get(models.GeocodeCacheEntry, key).last_used_at = stale
+    db.commit()
+    google_maps._cache_get(db, key)
+    db.expire_all()
+    assert db.get(models.GeocodeCacheEntry, key).last_used_at > stale
+
+
+def test_put_racing_another_writer_returns_the_stored_row(db, monkeypatch):
+    key = _key()
+    other = SessionLocal()
+    try:
+        google_maps._cache_put(other, key, RESULT)
+    finally:
+        other.close()
+
+    # Our writer looked the key up before the other one committed
+    real_get = db.get
+    calls = []
+
+    def get(model, ident):
+        calls.append(ident)
+        return None if len(calls) == 1 else real_get(model, ident)
+
+    monkeypatch.setattr(db, "get", get)
+    assert google_maps._cache_put(db, key, None) == RESULT
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def _ok_payload():
+    return {
+        "status": "OK",
+        "results": [{
+            "formatted_address": RESULT["formatted_address"],
+            "geometry": {"location": {"lat": RESULT["latitude"], "lng": RESULT["longitude"]}},
+        }],
+    }
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route upstream calls to `upstream.payload`; `upstream.calls` counts them."""
+    stub = SimpleNamespace(payload=_ok_payload(), calls=0, gate=None)
+
+    def http_get(url, params, timeout):
+        stub.calls += 1
+        if stub.gate is not None:
+            stub.gate.wait(5)
+        return _Response(stub.payload)
+
+    monkeypatch.setattr(google_maps, "GOOGLE_MAPS_API_KEY", "test-key")
+    monkeypatch.setattr(google_maps, "http_get", http_get)
+    return stub
+
+
+def _delta(before):
+    after = google_maps.cache_stats()
+    return {name: after[name] - before[name] for name in before if name != "hit_rate"}
+
+
+def test_hit_and_miss_counters(upstream):
+    address = f"{uuid.uuid4().hex} Market St"
+    before = google_maps.cache_stats()
+
+    assert google_maps.geocode_address(address) == RESULT
+    assert google_maps.geocode_address(address.upper()) == RESULT
+    assert _delta(before) == {"hits": 1, "misses": 1, "upstream_calls": 1, "coalesced": 0, "evictions": 0}
+
+
+def test_zero_results_is_cached_as_a_miss(db, upstream):
+    address = f"{uuid.uuid4().hex} Nowhere Ln"
+    upstream.payload = {"status": "ZERO_RESULTS", "results": []}
+
+    assert google_maps.geocode_address(address) is None
+    assert google_maps.geocode_address(address) is None
+    assert upstream.calls == 1
+    assert db.get(models.GeocodeCacheEntry, google_maps.normalize_address(address)).found is False
+
+
+@pytest.mark.parametrize("status", ["OVER_QUERY_LIMIT", "REQUEST_DENIED", "INVALID_REQUEST", "UNKNOWN_ERROR"])
+def test_upstream_errors_are_not_cached(db, upstream, status):
+    address = f"{uuid.uuid4().hex} Market St"
+    upstream.payload = {"status": status, "error_message": "nope"}
+
+    assert google_maps.geocode_address(address) is None
+    assert db.get(models.GeocodeCacheEntry, google_maps.normalize_address(address)) is None
+
+    # Once the API recovers the address resolves instead of replaying a cached miss
+    upstream.payload = _ok_payload()
+    assert google_maps.geocode_address(address) == RESULT
+    assert upstream.calls == 2
+
+
+def test_expired_entry_is_looked_up_again(db, upstream):
+    address = f"{uuid.uuid4().hex} Market St"
+    google_maps.geocode_address(address)
+
+    entry = db.get(models.GeocodeCacheEntry, google_maps.normalize_address(address))
+    entry.created_at -= timedelta(seconds=google_maps.settings.geocode_cache_ttl_seconds + 1)
+    db.commit()
+
+    assert google_maps._cache_get(db, entry.address_key) == (False, None)
+    assert google_maps.geocode_address(address) == RESULT
+    assert upstream.calls == 2
+
+
+def test_concurrent_lookups_share_one_upstream_call(upstream):
+    address = f"{uuid.uuid4().hex} Market St"
+    key = google_maps.normalize_address(address)
+    upstream.gate = threading.Event()
+    before = google_maps.cache_stats()
+    results = []
+
+    def lookup():
+        results.append(google_maps.geocode_address(address))
+
+    leader = threading.Thread(target=lookup)
+    leader.start()
+    _wait_for(lambda: key in google_maps._inflight)
+    follower = threading.Thread(target=lookup)
+    follower.start()
+    _wait_for(lambda: _delta(before)["coalesced"] == 1)
+    upstream.gate.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [RESULT, RESULT]
+    assert upstream.calls == 1
+
+
+def test_eviction_drops_the_least_recently_used(db, monkeypatch):
+    monkeypatch.setattr(google_maps, "_EVICT_EVERY", 1)
+    monkeypatch.setattr(google_maps.settings, "geocode_cache_max_entries", 1)
+    older, newer = _key(), _key()
+    before = google_maps.cache_stats()
+
+    google_maps._cache_put(db, older, RESULT)
+    google_maps._cache_put(db, newer, RESULT)
+
+    assert _delta(before)["evictions"] >= 1
+    assert db.query(models.GeocodeCacheEntry.address_key).all() == [(newer,)]
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
@@ -0,0 +1,118 @@
+"""The background geocoding queue: retries, leases, and cache invalidation."""
+
+from datetime import datetime, timedelta
+
+from app import geocode_queue, google_maps, models, response_cache
+from app.database import SessionLocal
+
+
+def _pending(make_user, make_reviews):
+    user_id, _ = make_user()
+    (review_id,) = make_reviews(
+        user_id, 1, geocode_status="pending", geocode_next_attempt_at=datetime.utcnow() - timedelta(seconds=1)
+    )
+    return review_id
+
+
+def test_rescheduled_retry_keeps_the_cache(db, make_user, make_reviews):
+    _pending(make_user, make_reviews)
+    before = response_cache.current_version(db)
+    assert geocode_queue.process_batch(lambda address: None) == 1
+    assert response_cache.current_version(db) == before
+
+
+def test_resolved_review_bumps_the_cache(db, make_user, make_reviews):
+    _pending(make_user, make_reviews)
+    before = response_cache.current_version(db)
+    location = {"formatted_address": "100 Walnut St, Philadelphia, PA 19103", "latitude": 39.95, "longitude": -75.16}
+    assert geocode_queue.process_batch(lambda address: location) == 1
+    assert response_cache.current_version(db) == before + 1
+
+
+def _review(db, review_id):
+    db.expire_all()
+    return db.get(models.Review, review_id)
+
+
+def _at(moment):
+    """A `datetime` whose utcnow() is `moment`, for the queue's clock."""
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return moment
+    return Clock
+
+
+def test_failures_back_off_exponentially_then_fail(db, make_user, make_reviews, monkeypatch):
+    review_id = _pending(make_user, make_reviews)
+    base = timedelta(seconds=geocode_queue.settings.geocode_retry_base_seconds)
+    now = datetime.utcnow()
+
+    for attempt in range(1, geocode_queue.settings.geocode_max_attempts):
+        monkeypatch.setattr(geocode_queue, "datetime", _at(now))
+        geocode_queue.drain(lambda address: None)
+        review = _review(db, review_id)
+        assert (review.geocode_status, review.geocode_attempts) == ("pending", attempt)
+        assert review.geocode_next_attempt_at == now + base * 2 ** (attempt - 1)
+        now = review.geocode_next_attempt_at
+
+    monkeypatch.setattr(geocode_queue, "datetime", _at(now))
+    geocode_queue.drain(lambda address: None)
+    review = _review(db, review_id)
+    assert review.geocode_status == "failed"
+    assert review.geocode_attempts == geocode_queue.settings.geocode_max_attempts
+    assert review.geocode_next_attempt_at is None
+
+
+def test_geocoder_exceptions_count_as_failed_attempts(db, make_user, make_reviews):
+    review_id = _pending(make_user, make_reviews)
+
+    def broken(address):
+        raise RuntimeError("upstream exploded")
+
+    geocode_queue.drain(broken)
+    assert _review(db, review_id).geocode_attempts == 1
+
+
+def test_crashed_worker_lease_expires(db, make_user, make_reviews, monkeypatch):
+    review_id = _pending(make_user, make_reviews)
+    now = datetime.utcnow()
+    # A worker claims the row and dies before geocoding it
+    claimer = SessionLocal()
+    try:
+        assert review_id in [review.id for review in geocode_queue._claim_batch(claimer, now)]
+    finally:
+        claimer.close()
+
+    location = {"formatted_address": "1 Lease Way", "latitude": 39.9, "longitude": -75.1}
+    geocode_queue.drain(lambda address: location)
+    assert _review(db, review_id).geocode_attempts == 0
+
+    lease = timedelta(seconds=geocode_queue.settings.geocode_lease_seconds)
+    monkeypatch.setattr(geocode_queue, "datetime", _at(now + lease + timedelta(seconds=1)))
+    geocode_queue.drain(lambda address: location)
+    review = _review(db, review_id)
+    assert (review.geocode_status, review.geocode_attempts) == ("done", 1)
+
+
+def test_without_a_geocoder_addresses_are_not_queued(client, db, make_user, make_reviews, monkeypatch):
+    monkeypatch.setattr(google_maps, "GOOGLE_MAPS_API_KEY", None)
+    monkeypatch.setattr(geocode_queue.settings, "geocoder_backend", "google")
+    _, headers = make_user()
+    review = {
+        "landlord_name": "Unmapped Landlord",
+        "overall_rating": 3,
+        "review_text": "Address given, but nothing to geocode it with.",
+        "property_address": "5 Nowhere St",
+        "move_in_date": None,
+        "move_out_date": None,
+    }
+    response = client.post("/reviews", json=review, headers=headers)
+    assert response.json()["geocode_status"] == "none"
+
+    # Rows queued earlier wait, without spending attempts, until one is configured
+    review_id = _pending(make_user, make_reviews)
+    assert geocode_queue.process_batch() == 0
+    assert _review(db, review_id).geocode_attempts == 0
+    geocode_queue.start_workers(count=1)
+    assert not geocode_queue._threads
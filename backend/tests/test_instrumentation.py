@@ -0,0 +1,65 @@
+"""Server-Timing on responses and the Prometheus text at /metrics."""
+
+import re
+import sys
+
+from app import autocomplete, instrumentation, main
+
+
+def _families(text):
+    """Metric name -> declared TYPE."""
+    return dict(re.findall(r"^# TYPE (\S+) (\S+)$", text, re.MULTILINE))
+
+
+def test_server_timing_reports_sql_and_total(client, make_user, make_reviews):
+    user_id, _ = make_user()
+    make_reviews(user_id, 1)
+
+    header = client.get("/reviews").headers["Server-Timing"]
+    assert re.match(r'db;dur=[\d.]+;desc="\d+ queries", ', header)
+    assert re.search(r"total;dur=[\d.]+$", header)
+
+
+def test_metrics_types_and_help(client):
+    client.get("/reviews")
+    text = client.get("/metrics").text
+    types = _families(text)
+
+    assert types["http_request_duration_seconds"] == "histogram"
+    assert 'http_requests_total{method="GET",route="/reviews",status="200"}' in text
+    for stat in ("hits", "misses", "not_modified", "upstream_calls", "coalesced", "evictions", "invalidations"):
+        assert types[f"cache_{stat}_total"] == "counter"
+        assert f"cache_{stat}" not in types
+    assert types["cache_size"] == "gauge"
+    assert types["autocomplete_index_memory_bytes"] == "gauge"
+    assert re.search(r'^cache_hits_total\{cache="response"\} \d+$', text, re.MULTILINE)
+    # Every family is documented
+    assert set(types) == set(re.findall(r"^# HELP (\S+) ", text, re.MULTILINE))
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(instrumentation, "render_metrics", lambda: "")
+    monkeypatch.setattr(main.settings, "metrics_token", "scrape")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape"}).status_code == 200
+
+
+def _walk(index):
+    """What `memory_bytes` approximates, by visiting every object."""
+    objects = [index._keys, index._targets, index._entries, index._top, *index._keys]
+    for entry in index._entries.values():
+        objects += [entry, entry.ref, entry.text, entry.keys]
+    unique = {id(obj): obj for obj in objects}
+    return sum(sys.getsizeof(obj) for obj in unique.values())
+
+
+def test_autocomplete_memory_is_tracked_as_entries_change():
+    index = autocomplete.PrefixIndex("address")
+    rows = [(text, text, autocomplete.address_keys(text), 1) for text in ("12 Pine St", "40 Spruce St")]
+    index.load(rows)
+    assert index.memory_bytes() == _walk(index)
+
+    index.add("7 Locust St", "7 Locust St", autocomplete.address_keys("7 Locust St"))
+    index.add("12 Pine St", "12 Pine St", autocomplete.address_keys("12 Pine St"))
+    assert index.memory_bytes() == _walk(index)
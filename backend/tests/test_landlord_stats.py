@@ -0,0 +1,58 @@
+"""Incremental landlord aggregates never drift from a full rebuild."""
+
+import uuid
+
+from app import landlord_stats, models
+
+
+def _submit(client, headers, landlord, **values):
+    review = {
+        "landlord_name": landlord,
+        "overall_rating": 4,
+        "review_text": "Responsive manager, thin walls, fair rent.",
+        "move_in_date": None,
+        "move_out_date": None,
+        **values,
+    }
+    response = client.post("/reviews", json=review, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_incremental_updates_match_rebuild(client, db, make_user):
+    _, headers = make_user()
+    tag = uuid.uuid4().hex[:8]
+    a1 = _submit(client, headers, f"Aster {tag} Realty", monthly_rent=1000, maintenance_rating=2)
+    a2 = _submit(client, headers, f"Aster {tag} Realty", monthly_rent=2000, overall_rating=5, would_rent_again=False)
+    a3 = _submit(client, headers, f"Aster {tag} Realty", respect_rating=3.5)
+    b1 = _submit(client, headers, f"Birch {tag} Homes", monthly_rent=900)
+    c1 = _submit(client, headers, f"Cedar {tag} Rentals", monthly_rent=1200)
+    reviews = {review_id: db.get(models.Review, review_id) for review_id in (a1, a2, a3, b1, c1)}
+    landlords = {reviews[a1].landlord_id, reviews[b1].landlord_id, reviews[c1].landlord_id}
+    assert len(landlords) == 3
+    assert not set(landlord_stats.rebuild(db, apply=False)) & landlords
+
+    # Edit the highest rent down and the ratings
+    landlord_stats.remove_review(db, reviews[a2])
+    reviews[a2].monthly_rent, reviews[a2].overall_rating, reviews[a2].communication_rating = 1500, 2.0, 4.0
+    db.flush()
+    landlord_stats.apply_review(db, reviews[a2])
+    # Move the lowest rent to another landlord
+    landlord_stats.remove_review(db, reviews[a1])
+    reviews[a1].landlord_id = reviews[b1].landlord_id
+    db.flush()
+    landlord_stats.apply_review(db, reviews[a1])
+    # Delete a review, and a landlord's only review
+    for review_id in (a3, c1):
+        landlord_stats.remove_review(db, reviews[review_id])
+        db.delete(reviews[review_id])
+    db.commit()
+
+    assert not set(landlord_stats.rebuild(db, apply=False)) & landlords
+    aster = db.get(models.LandlordStats, reviews[a2].landlord_id)
+    assert (aster.review_count, aster.rent_min, aster.rent_max) == (1, 1500, 1500)
+    assert db.get(models.LandlordStats, reviews[b1].landlord_id).rent_min == 900
+    assert db.get(models.LandlordStats, reviews[b1].landlord_id).review_count == 2
+
+    stats = client.get(f"/landlords/{reviews[b1].landlord_id}/stats").json()
+    assert stats["review_count"] == 2 and stats["rent_min"] == 900 and stats["rent_max"] == 1000
@@ -0,0 +1,63 @@
+"""Landlord name resolution: what merges, what stays apart, and undoing a merge."""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app import landlords, models
+from app.landlords import normalize_landlord_name
+
+
+@pytest.mark.parametrize("first, second", [
+    ("ABC Management", "ABC Realty"),
+    ("Philly Homes", "Philly Living"),
+    ("Smith Properties", "Smith Realty LLC"),
+    ("The Drake", "Drake"),
+])
+def test_distinct_landlords_stay_apart(db, first, second):
+    tag = uuid.uuid4().hex[:8]
+    assert landlords.resolve_landlord(db, f"{first} {tag}") != landlords.resolve_landlord(db, f"{second} {tag}")
+    db.rollback()
+
+
+def test_normalization_only_strips_trailing_legal_suffixes():
+    assert normalize_landlord_name("The Drake, LLC") == "the drake"
+    assert normalize_landlord_name("Smith Realty Inc.") == "smith realty"
+    assert normalize_landlord_name("Drake LLC") == "drake llc"
+    assert normalize_landlord_name("  ...  ") == ""
+
+
+def test_punctuation_only_name_is_rejected(client, make_user):
+    _, headers = make_user()
+    response = client.post("/reviews", headers=headers, json={
+        "landlord_name": "-- ?? --",
+        "overall_rating": 3,
+        "review_text": "Punctuation is not a landlord name.",
+        "move_in_date": None,
+        "move_out_date": None,
+    })
+    assert response.status_code == 400
+
+
+def test_fuzzy_merge_is_recorded_and_can_be_undone(db, make_user, make_reviews):
+    tag = uuid.uuid4().hex[:8]
+    original = landlords.resolve_landlord(db, f"Greenfield {tag} Properties")
+    merged = landlords.resolve_landlord(db, f"Greenfeild {tag} Properties")
+    assert merged == original
+    alias = db.execute(
+        select(models.LandlordAlias).where(models.LandlordAlias.normalized_key == f"greenfeild {tag} properties")
+    ).scalar_one()
+    assert alias.landlord_id == original
+    db.commit()
+
+    user_id, _ = make_user()
+    make_reviews(user_id, 1, landlord_name=f"Greenfield {tag} Properties", landlord_id=original)
+    (typo_review,) = make_reviews(user_id, 1, landlord_name=f"Greenfeild {tag} Properties", landlord_id=original)
+
+    landlord_id, moved = landlords.unmerge(db, alias.id)
+    db.commit()
+    assert moved == 1 and landlord_id != original
+    assert db.get(models.Review, typo_review).landlord_id == landlord_id
+    # The split key now resolves to its own landlord
+    assert landlords.resolve_landlord(db, f"Greenfeild {tag} Properties") == landlord_id
@@ -0,0 +1,67 @@
+"""Map clustering grids: incremental updates and tiles across cell boundaries."""
+
+from app import map_tiles, models
+
+# In Iceland, away from the other tests' reviews and from each other
+LAT = 64.13
+NORTH_LAT = 65.68
+
+
+def _tile_of(lat, lng, z):
+    x, y = map_tiles._world_position(lat, lng)
+    return int(x * (1 << z)), int(y * (1 << z))
+
+
+def _cell(db, level, lat, lng):
+    _, cell_x, cell_y = map_tiles.cells_for(lat, lng)[level - map_tiles.CELL_BITS]
+    return db.get(models.MapCell, (level, cell_x, cell_y))
+
+
+def test_moving_a_review_moves_its_count(db):
+    old, new = (LAT, -21.95), (LAT, -21.94)
+    assert _cell(db, map_tiles.MAX_LEVEL, *old) is None
+    map_tiles.apply_location(db, *old, 4.0)
+    db.commit()
+
+    map_tiles.remove_location(db, *old, 4.0)
+    map_tiles.apply_location(db, *new, 4.0)
+    db.commit()
+    db.expire_all()
+
+    assert _cell(db, map_tiles.MAX_LEVEL, *old).review_count == 0
+    assert _cell(db, map_tiles.MAX_LEVEL, *new).review_count == 1
+    # A coarse cell holding both points keeps its count; its centroid moves
+    shared = _cell(db, 8, *old)
+    assert shared is _cell(db, 8, *new)
+    assert shared.review_count == 1
+    assert abs(shared.longitude_sum - new[1]) < 1e-9
+
+    z, (x, y) = map_tiles.MAX_LEVEL - map_tiles.CELL_BITS, _tile_of(*old, map_tiles.MAX_LEVEL - map_tiles.CELL_BITS)
+    assert map_tiles.tile(db, z, x, y) == []
+
+
+def test_tiles_across_a_cell_boundary(db):
+    # A boundary between two zoom-10 tiles, with one review either side of it
+    tx, _ = _tile_of(NORTH_LAT, -18.1, 10)
+    boundary = (tx + 1) / 1024 * 360 - 180
+    west, east = (NORTH_LAT, boundary - 1e-4), (NORTH_LAT, boundary + 1e-4)
+    map_tiles.apply_location(db, *west, 2.0)
+    map_tiles.apply_location(db, *east, 4.0)
+    db.commit()
+
+    # Each zoom-10 tile holds only its own side
+    assert _tile_of(*west, 10)[0] == tx and _tile_of(*east, 10)[0] == tx + 1
+    ty = _tile_of(*west, 10)[1]
+    assert [cluster[2:] for cluster in map_tiles.tile(db, 10, tx, ty)] == [(1, 2.0)]
+    assert [cluster[2:] for cluster in map_tiles.tile(db, 10, tx + 1, ty)] == [(1, 4.0)]
+
+    # One zoom-9 tile spans the boundary; its level-12 grid still separates them
+    x9, y9 = _tile_of(*west, 9)
+    assert _tile_of(*east, 9) == (x9, y9)
+    assert sorted(cluster[2:] for cluster in map_tiles.tile(db, 9, x9, y9)) == [(1, 2.0), (1, 4.0)]
+
+    # At zoom 5 both fall in one level-8 cell: a single cluster at their centroid
+    x5, y5 = _tile_of(*west, 5)
+    (cluster,) = [c for c in map_tiles.tile(db, 5, x5, y5) if abs(c[1] - boundary) < 0.01]
+    assert cluster[2:] == (2, 3.0)
+    assert abs(cluster[1] - boundary) < 1e-6
@@ -0,0 +1,44 @@
+"""Cached principals are dropped when the user changes under them."""
+
+import re
+
+from app import models, principal_cache
+
+
+def _cached(client, headers):
+    """Authenticate once so the token is cached; returns the raw token."""
+    assert client.get("/bookmarks", headers=headers).status_code == 200
+    token = headers["Authorization"].split()[1]
+    assert principal_cache.get(token) is not None
+    return token
+
+
+def test_password_change_drops_cached_tokens(client, db, make_user):
+    user_id, headers = make_user()
+    token = _cached(client, headers)
+
+    db.get(models.User, user_id).hashed_password = "changed"
+    db.commit()
+
+    assert principal_cache.get(token) is None
+
+
+def test_deleted_user_stops_resolving(client, db, make_user):
+    user_id, headers = make_user()
+    token = _cached(client, headers)
+
+    db.delete(db.get(models.User, user_id))
+    db.commit()
+
+    assert principal_cache.get(token) is None
+    assert client.get("/bookmarks", headers=headers).status_code == 401
+
+
+def test_hits_and_misses_are_counters(client, make_user):
+    _, headers = make_user()
+    _cached(client, headers)
+    text = client.get("/metrics").text
+
+    for stat in ("hits", "misses", "invalidations"):
+        assert f"# TYPE cache_{stat}_total counter" in text
+        assert re.search(rf'^cache_{stat}_total\{{cache="principal"\}} \d+$', text, re.MULTILINE)
@@ -0,0 +1,19 @@
+"""Admin profiler input checks."""
+
+import pytest
+
+from app import auth, profiler
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(auth.settings, "admin_token", "s3cret")
+
+
+@pytest.mark.parametrize("seconds", ["nan", "inf", "-inf", "0", "-1"])
+def test_profiler_rejects_non_positive_or_non_finite_durations(client, seconds):
+    response = client.post("/admin/profiler", params={"seconds": seconds}, headers=ADMIN)
+    assert response.status_code == 400
+    assert profiler.running_global() is None
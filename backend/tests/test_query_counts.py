@@ -0,0 +1,57 @@
+"""List endpoints must run a fixed number of queries, whatever the page size."""
+
+from app import models
+
+
+def _bookmark(db, user_id, review_ids):
+    db.add_all(models.Bookmark(user_id=user_id, review_id=review_id) for review_id in review_ids)
+    db.commit()
+
+
+def _queries(client, query_counter, url, **kwargs):
+    with query_counter() as statements:
+        response = client.get(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def test_reviews_page_queries_do_not_grow_with_rows(client, db, make_user, make_reviews, query_counter):
+    user_id, headers = make_user()
+    author_id, _ = make_user()
+    review_ids = make_reviews(author_id, 25)
+    _bookmark(db, user_id, review_ids[::2])
+    # Warm the principal cache so both requests do the same auth work
+    client.get("/reviews", params={"limit": 1}, headers=headers)
+
+    small = _queries(client, query_counter, "/reviews", params={"limit": 5}, headers=headers)
+    large = _queries(client, query_counter, "/reviews", params={"limit": 25}, headers=headers)
+    assert small == large
+    assert large <= 4
+
+
+def test_bookmarks_page_queries_do_not_grow_with_rows(client, db, make_user, make_reviews, query_counter):
+    user_id, headers = make_user()
+    author_id, _ = make_user()
+    _bookmark(db, user_id, make_reviews(author_id, 25))
+    client.get("/bookmarks", params={"limit": 1}, headers=headers)
+
+    small = _queries(client, query_counter, "/bookmarks", params={"limit": 5}, headers=headers)
+    large = _queries(client, query_counter, "/bookmarks", params={"limit": 25}, headers=headers)
+    assert small == large
+    assert large <= 2
+
+
+def test_search_results_are_serialized_without_per_row_queries(client, db, make_user, make_reviews, query_counter):
+    user_id, headers = make_user()
+    # One author per review, so lazily loaded authors would each cost a query
+    review_ids = [
+        review_id
+        for _ in range(25)
+        for review_id in make_reviews(make_user()[0], 1, review_text="Drafty windows but a wonderful gazebo.")
+    ]
+    _bookmark(db, user_id, review_ids[::3])
+    client.get("/reviews/search", params={"q": "gazebo", "limit": 1}, headers=headers)
+
+    small = _queries(client, query_counter, "/reviews/search", params={"q": "gazebo", "limit": 5}, headers=headers)
+    large = _queries(client, query_counter, "/reviews/search", params={"q": "gazebo", "limit": 25}, headers=headers)
+    assert small == large
@@ -0,0 +1,109 @@
+"""Hot review and bookmark queries must be served by indexes."""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app import export, fast_json, main as api, models, schemas
+from app.database import engine
+
+_FULL_SCAN = re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)")
+_TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+
+
+def _seed(db, make_user):
+    user_ids = [make_user()[0] for _ in range(3)]
+    start = datetime(2024, 1, 1)
+    db.add_all(
+        models.Review(
+            user_id=user_ids[i % 3],
+            landlord_name=f"Landlord {i % 7}",
+            overall_rating=3.0,
+            review_text="Query plan fixture review text.",
+            created_at=start + timedelta(hours=i),
+        )
+        for i in range(60)
+    )
+    db.flush()
+    review_ids = db.execute(select(models.Review.id).order_by(models.Review.id.desc()).limit(20)).scalars().all()
+    db.add_all(models.Bookmark(user_id=user_ids[0], review_id=review_id) for review_id in review_ids[1:])
+    db.commit()
+    # Give the planner real statistics, as a long-lived database would have
+    db.execute(text("ANALYZE"))
+    return db.get(models.User, user_ids[0]), review_ids[0]
+
+
+def _endpoint_statements(db, user, review_id):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        page = api._list_reviews(db, 10, None, user)
+        api._list_reviews(db, 10, page["next_cursor"], user)
+        for fields in (fast_json.PROJECTIONS["summary"], fast_json.PROJECTIONS["map"]):
+            api._list_reviews(db, 10, page["next_cursor"], user, fields)
+        page = api._list_my_reviews(db, 5, None, user, fast_json.FULL)
+        api._list_my_reviews(db, 5, page["next_cursor"], user, fast_json.FULL)
+        page = api._list_bookmarks(db, 5, None, user)
+        api._list_bookmarks(db, 5, page["next_cursor"], user)
+        until = export.watermark(db)
+        for _chunk in export.stream("ndjson", until - timedelta(days=1), until, batch_size=50):
+            pass
+        api._create_bookmark(db, schemas.BookmarkCreate(review_id=review_id), user)
+        api._remove_bookmark(db, review_id, user)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def test_endpoint_queries_use_indexes(db, make_user):
+    user, review_id = _seed(db, make_user)
+    statements = _endpoint_statements(db, user, review_id)
+    assert statements
+
+    offenders = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            details = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            if any(_FULL_SCAN.search(d) or _TEMP_SORT.search(d) for d in details):
+                offenders.append((" ".join(statement.split()), details))
+    assert not offenders
+
+
+def test_duplicate_bookmark_is_rejected(client, db, make_user, make_reviews):
+    user_id, headers = make_user()
+    (review_id,) = make_reviews(make_user()[0], 1)
+    assert client.post("/bookmarks", json={"review_id": review_id}, headers=headers).status_code == 201
+    assert client.post("/bookmarks", json={"review_id": review_id}, headers=headers).status_code == 400
+
+    db.add(models.Bookmark(user_id=user_id, review_id=review_id))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+
+def test_startup_keeps_duplicate_bookmarks(db, make_user, make_reviews):
+    user_id, _ = make_user()
+    (review_id,) = make_reviews(make_user()[0], 1)
+    db.execute(text("DROP INDEX uq_bookmarks_user_id_review_id"))
+    try:
+        db.execute(models.Bookmark.__table__.insert(), [{"user_id": user_id, "review_id": review_id}] * 2)
+        db.commit()
+
+        api._ensure_indexes()
+
+        count = select(func.count()).select_from(models.Bookmark).where(models.Bookmark.user_id == user_id)
+        assert db.execute(count).scalar_one() == 2
+    finally:
+        db.execute(models.Bookmark.__table__.delete().where(models.Bookmark.user_id == user_id))
+        db.commit()
+        api._ensure_indexes()
+    indexes = {row[1] for row in db.execute(text("PRAGMA index_list(bookmarks)"))}
+    assert "uq_bookmarks_user_id_review_id" in indexes
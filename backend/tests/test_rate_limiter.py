@@ -0,0 +1,185 @@
+"""Rate limiter policies, the RESP client against a fake server, and failure handling."""
+
+import socketserver
+import threading
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app import main as api, rate_limiter
+from app.config import Settings
+from app.rate_limiter import MemoryStore, RateLimiter, RedisStore, SlidingWindow, TokenBucket
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    """Enough of the Redis protocol for RedisStore: AUTH, SELECT, GET, SET PX and optimistic transactions."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeRedisHandler)
+        self.data = {}
+        self.versions = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://:secret@{host}:{port}/2"
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        watched, queued = {}, None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = [self._read_bulk() for _ in range(int(line[1:]))]
+            name = args[0].upper()
+            server = self.server
+            with server.lock:
+                server.commands.append(name)
+                if queued is not None and name != "EXEC":
+                    queued.append(args)
+                    reply = b"+QUEUED\r\n"
+                elif name in ("AUTH", "SELECT", "UNWATCH"):
+                    watched = {} if name == "UNWATCH" else watched
+                    reply = b"+OK\r\n"
+                elif name == "WATCH":
+                    watched[args[1]] = server.versions.get(args[1], 0)
+                    reply = b"+OK\r\n"
+                elif name == "GET":
+                    value = server.data.get(args[1])
+                    reply = b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value.encode())
+                elif name == "MULTI":
+                    queued = []
+                    reply = b"+OK\r\n"
+                elif name == "EXEC":
+                    if any(server.versions.get(key, 0) != version for key, version in watched.items()):
+                        reply = b"*-1\r\n"
+                    else:
+                        for _set, key, value, *_px in queued:
+                            server.data[key] = value
+                            server.versions[key] = server.versions.get(key, 0) + 1
+                        reply = b"*%d\r\n" % len(queued) + b"+OK\r\n" * len(queued)
+                    watched, queued = {}, None
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+    def _read_bulk(self):
+        length = int(self.rfile.readline()[1:])
+        return self.rfile.read(length + 2)[:-2].decode()
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def enforced(monkeypatch):
+    """Turn limits on; the test environment runs with APP_ENV=dev, which disables them."""
+    monkeypatch.setattr(rate_limiter.settings, "app_env", "prod")
+
+
+def test_policies_reject_non_positive_rates():
+    with pytest.raises(ValueError):
+        TokenBucket(capacity=1, rate=0)
+    with pytest.raises(ValueError):
+        SlidingWindow(limit=0, window=60)
+    with pytest.raises(ValidationError):
+        Settings(login_rate_limit_per_minute=0)
+    with pytest.raises(ValidationError):
+        Settings(signup_rate_limit_per_hour=-1)
+
+
+@pytest.mark.anyio
+async def test_redis_store_limits_across_connections(enforced, fake_redis):
+    first = RateLimiter("t", TokenBucket(capacity=2, rate=0.001), RedisStore(fake_redis.url))
+    second = RateLimiter("t", TokenBucket(capacity=2, rate=0.001), RedisStore(fake_redis.url))
+
+    await first.hit("1.2.3.4")
+    await second.hit("1.2.3.4")
+    with pytest.raises(HTTPException) as exc:
+        await first.hit("1.2.3.4")
+    assert exc.value.status_code == 429
+    assert "rl:t:1.2.3.4" in fake_redis.data
+    assert fake_redis.commands[:2] == ["AUTH", "SELECT"]
+
+
+def test_redis_store_retries_when_the_watched_key_changes(fake_redis):
+    store, other = RedisStore(fake_redis.url), RedisStore(fake_redis.url)
+    raced = []
+
+    def increment(state):
+        if not raced:
+            # Another worker writes between our GET and EXEC
+            raced.append(True)
+            other.update("counter", lambda s: ((s or 0) + 1, None), 60)
+        return (state or 0) + 1, None
+
+    store.update("counter", increment, 60)
+    assert fake_redis.data["counter"] == "2"
+    assert fake_redis.commands.count("EXEC") == 3
+
+
+@pytest.mark.anyio
+async def test_unreachable_store_fails_open(enforced, fake_redis, caplog):
+    host, port = fake_redis.server_address
+    fake_redis.shutdown()
+    fake_redis.server_close()
+    limiter = RateLimiter("t", TokenBucket(capacity=1, rate=0.001), RedisStore(f"redis://{host}:{port}/0", timeout=0.5))
+
+    await limiter.hit("1.2.3.4")
+    await limiter.hit("1.2.3.4")
+    assert "allowing the request" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_refund_returns_the_unit(enforced):
+    for policy in (TokenBucket(capacity=1, rate=0.001), SlidingWindow(limit=1, window=3600)):
+        limiter = RateLimiter("t", policy, MemoryStore())
+        await limiter.hit("user")
+        await limiter.refund("user")
+        await limiter.hit("user")
+        with pytest.raises(HTTPException):
+            await limiter.hit("user")
+
+
+def test_failed_submission_does_not_use_the_slot(client, enforced, make_user, monkeypatch):
+    _, headers = make_user()
+    review = {
+        "landlord_name": "Refund Landlord",
+        "overall_rating": 4,
+        "review_text": "Fine building, slow repairs.",
+        "move_in_date": None,
+        "move_out_date": None,
+    }
+
+    def fail(*args):
+        raise HTTPException(status_code=400, detail="rejected")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(api, "_submit_review", fail)
+        assert client.post("/reviews", json=review, headers=headers).status_code == 400
+        assert client.post("/reviews", json=review, headers=headers).status_code == 400
+
+    assert client.post("/reviews", json=review, headers=headers).status_code == 201
+    response = client.post("/reviews", json=review, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
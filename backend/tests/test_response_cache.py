@@ -0,0 +1,67 @@
+"""ETags, conditional GET and per-user bookmark overlays on the cached feed."""
+
+from app import response_cache
+
+PAGE = "/reviews?limit=5"
+
+
+def _bookmarked(response):
+    return {item["id"]: item["is_bookmarked"] for item in response.json()["items"]}
+
+
+def test_anonymous_page_is_public_and_revalidates(client, make_user, make_reviews):
+    user_id, _ = make_user()
+    make_reviews(user_id, 2)
+
+    first = client.get(PAGE)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == f"public, max-age={response_cache.settings.public_cache_max_age_seconds}"
+    assert first.headers["Vary"] == "Authorization"
+
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        not_modified = client.get(PAGE, headers={"If-None-Match": header})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+    assert client.get(PAGE, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_content_version_bump_changes_the_etag(client, make_user, make_reviews):
+    user_id, _ = make_user()
+    make_reviews(user_id, 1)
+    etag = client.get(PAGE).headers["ETag"]
+    assert client.get(PAGE, headers={"If-None-Match": etag}).status_code == 304
+
+    (new_id,) = make_reviews(user_id, 1)
+
+    fresh = client.get(PAGE, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.json()["items"][0]["id"] == new_id
+
+
+def test_bookmark_overlay_is_per_user(client, make_user, make_reviews):
+    author_id, _ = make_user()
+    first_id, second_id = make_reviews(author_id, 2)
+    _, alice = make_user()
+    _, bob = make_user()
+    assert client.post("/bookmarks", json={"review_id": first_id}, headers=alice).status_code == 201
+    assert client.post("/bookmarks", json={"review_id": second_id}, headers=bob).status_code == 201
+
+    anonymous = client.get(PAGE)
+    as_alice = client.get(PAGE, headers=alice)
+    as_bob = client.get(PAGE, headers=bob)
+
+    assert {first_id: True, second_id: False}.items() <= _bookmarked(as_alice).items()
+    assert {first_id: False, second_id: True}.items() <= _bookmarked(as_bob).items()
+    assert not any(_bookmarked(anonymous).values())
+    assert as_alice.headers["Cache-Control"] == "private, no-cache"
+    assert len({anonymous.headers["ETag"], as_alice.headers["ETag"], as_bob.headers["ETag"]}) == 3
+
+    # The overlays did not leak into the cached anonymous page or each other
+    assert client.get(PAGE).content == anonymous.content
+    assert client.get(PAGE, headers=alice).content == as_alice.content
+    assert client.get(PAGE, headers=bob).headers["ETag"] == as_bob.headers["ETag"]
+    assert client.get(PAGE, headers={**alice, "If-None-Match": as_bob.headers["ETag"]}).status_code == 200
+    assert client.get(PAGE, headers={**alice, "If-None-Match": as_alice.headers["ETag"]}).status_code == 304
@@ -0,0 +1,27 @@
+"""Search falls back to LIKE scans when the full-text index cannot be built."""
+
+import uuid
+
+from app import search
+from app.database import engine
+
+
+def test_missing_fts_module_falls_back_to_like(client, make_user, make_reviews, monkeypatch, caplog):
+    monkeypatch.setattr(search._index, "available", True)
+    monkeypatch.setattr(search, "_SQLITE_SCHEMA", ["CREATE VIRTUAL TABLE reviews_fts_probe USING no_such_module()"])
+    with engine.begin() as conn:
+        assert search.ensure_index(conn) is False
+    assert not search._index.available
+    assert "LIKE scans" in caplog.text
+
+    word = f"zq{uuid.uuid4().hex[:8]}"
+    user_id, _ = make_user()
+    make_reviews(user_id, 1, review_text=f"The radiator & the {word} both failed in January.")
+    make_reviews(user_id, 1, review_text=f"Nothing about {word} here", landlord_name=f"{word} Holdings")
+
+    body = client.get("/reviews/search", params={"q": word}).json()
+    assert [hit["review"]["landlord_name"] for hit in body["items"]][0] == f"{word} Holdings"
+    assert len(body["items"]) == 2
+    snippet = body["items"][1]["snippet"]
+    assert f"<mark>{word}</mark>" in snippet and "&amp;" in snippet
+
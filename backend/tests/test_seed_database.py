@@ -0,0 +1,25 @@
+"""The seeding endpoints are open in development and admin-only elsewhere."""
+
+import pytest
+
+from app import auth
+
+
+@pytest.fixture
+def production(monkeypatch):
+    monkeypatch.setattr(auth.settings, "app_env", "prod")
+    monkeypatch.setattr(auth.settings, "admin_token", None)
+
+
+def test_seeding_is_hidden_without_an_admin_token(client, production):
+    assert client.post("/seed-database", json={"force": True}).status_code == 404
+    assert client.get("/seed-database/some-job").status_code == 404
+
+
+def test_seeding_needs_the_admin_token(client, production, monkeypatch):
+    monkeypatch.setattr(auth.settings, "admin_token", "s3cret")
+    assert client.post("/seed-database", json={"force": True}).status_code == 401
+    assert client.post("/seed-database", json={"force": True}, headers={"X-Admin-Token": "wrong"}).status_code == 401
+    response = client.get("/seed-database/some-job", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Seed job not found"
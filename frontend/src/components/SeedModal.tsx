@@ -17,30 +17,50 @@ export function SeedModal({ isOpen, onClose }: SeedModalProps) {
     error?: string;
   } | null>(null);
   const [forceMode, setForceMode] = useState(false);
+  // Needed when the API is not running in a dev environment
+  const [adminToken, setAdminToken] = useState("");
 
   const handleSeed = async () => {
     setIsLoading(true);
     setResult(null);
 
+    const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+    const authHeaders: Record<string, string> = adminToken ? { "X-Admin-Token": adminToken } : {};
+
     try {
-      const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/seed-database`, {
+      const response = await fetch(`${apiUrl}/seed-database`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          ...authHeaders,
         },
         body: JSON.stringify({ force: forceMode })
       });
 
-      const data = await response.json();
+      let job = await response.json();
 
       if (!response.ok) {
-        throw new Error(data.detail || "Failed to seed database");
+        throw new Error(job.detail || "Failed to seed database");
+      }
+
+      // Seeding runs in the background; poll the job until it finishes
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 500));
+        const poll = await fetch(`${apiUrl}/seed-database/${job.job_id}`, { headers: authHeaders });
+        job = await poll.json();
+        if (!poll.ok) {
+          throw new Error(job.detail || "Lost track of the seed job");
+        }
+      }
+
+      if (job.status === "failed") {
+        throw new Error(job.error || "Seeding failed");
       }
 
       setResult({
         success: true,
-        message: data.message,
-        output: data.output
+        message: "Database seeded successfully",
+        output: job.message
       });
     } catch (error) {
       setResult({
@@ -56,6 +76,7 @@ export function SeedModal({ isOpen, onClose }: SeedModalProps) {
   const handleClose = () => {
     setResult(null);
     setForceMode(false);
+    setAdminToken("");
     onClose();
   };
 
@@ -91,6 +112,21 @@ export function SeedModal({ isOpen, onClose }: SeedModalProps) {
             </label>
           </div>
 
+          <div className="mb-4">
+            <label className="block text-sm text-gray-700 mb-1" htmlFor="seed-admin-token">
+              Admin token (not needed in development)
+            </label>
+            <input
+              id="seed-admin-token"
+              type="password"
+              value={adminToken}
+              onChange={(e) => setAdminToken(e.target.value)}
+              className="w-full rounded-md border border-gray-300 px-3 py-2 text-sm text-black focus:outline-none focus:ring-2 focus:ring-green-500"
+              disabled={isLoading}
+              autoComplete="off"
+            />
+          </div>
+
           {result && (
             <div className={`mb-4 p-4 rounded-lg border ${
               result.success 
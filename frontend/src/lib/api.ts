@@ -69,6 +69,16 @@ export interface Bookmark {
   review: Review;
 }
 
+export interface Page<T> {
+  items: T[];
+  next_cursor?: string | null;
+}
+
+export interface GeoHit {
+  review: Review;
+  distance_m: number;
+}
+
 export interface BookmarkCreate {
   review_id: number;
 }
@@ -206,9 +216,43 @@ export const authAPI = {
   },
 };
 
+// Largest page the API serves
+const MAX_PAGE_SIZE = 100;
+
+// Every item of a cursor-paginated endpoint
+async function allPages<T>(path: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const page: Page<T> = await apiRequest<Page<T>>(`${path}?limit=${MAX_PAGE_SIZE}${query}`);
+    items.push(...page.items);
+    cursor = page.next_cursor ?? null;
+  } while (cursor);
+  return items;
+}
+
 export const reviewsAPI = {
   list: async (limit: number = 20): Promise<Review[]> => {
-    return apiRequest<Review[]>(`/reviews?limit=${limit}`);
+    return (await reviewsAPI.page(limit)).items;
+  },
+
+  // Fetch one page; pass the previous page's next_cursor to continue
+  page: async (limit: number = 20, cursor?: string | null): Promise<Page<Review>> => {
+    const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    return apiRequest<Page<Review>>(`/reviews?limit=${limit}${query}`);
+  },
+
+  // Geocoded reviews within radiusM meters of a point, nearest first
+  near: async (lat: number, lng: number, radiusM: number = 1000, limit: number = 20): Promise<GeoHit[]> => {
+    return (await apiRequest<Page<GeoHit>>(
+      `/reviews/near?lat=${lat}&lng=${lng}&radius_m=${radiusM}&limit=${limit}`
+    )).items;
+  },
+
+  // Geocoded reviews inside a [minLng, minLat, maxLng, maxLat] box, e.g. the visible map
+  within: async (bbox: [number, number, number, number], limit: number = 100): Promise<GeoHit[]> => {
+    return (await apiRequest<Page<GeoHit>>(`/reviews/within?bbox=${bbox.join(',')}&limit=${limit}`)).items;
   },
 
   create: async (reviewData: ReviewCreate): Promise<Review> => {
@@ -218,16 +262,16 @@ export const reviewsAPI = {
     });
   },
 
-  // Get user's own reviews
+  // Get all of the user's own reviews, following next_cursor page by page
   myReviews: async (): Promise<Review[]> => {
-    return apiRequest<Review[]>('/my-reviews');
+    return allPages<Review>('/my-reviews');
   },
 };
 
 export const bookmarksAPI = {
-  // Get user's bookmarks
+  // Get all of the user's bookmarks, following next_cursor page by page
   list: async (): Promise<Bookmark[]> => {
-    return apiRequest<Bookmark[]>('/bookmarks');
+    return allPages<Bookmark>('/bookmarks');
   },
 
   // Add bookmark